@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 01:34:51 2026
+
+An inverted index from the bids of a system to the hands of a deal corpus.
+
+Every bid is mapped to the zlib compressed bitmap of the corpus hands its
+condition accepts (see CorpusEvaluator), so questions such as "a board where
+South opens 2d" or "where North responds 2n to 1s" are answered by
+intersecting bitmaps rather than evaluating conditions.
+
+Bitmaps are stored by a fingerprint of the condition, so rebuilding the
+index after the XML changes only evaluates conditions which are new.
+"""
+
+__author__ = "Andrew I McClement"
+
+import hashlib
+import itertools
+import json
+import struct
+import zlib
+
+from practice_bidding.analysis.deal_corpus import iter_bits, seat_deals
+from practice_bidding.xml_parsing.conditions import AndCondition, Condition
+from practice_bidding.xml_parsing.conditions import EvaluationCondition
+from practice_bidding.xml_parsing.conditions import NotCondition, OrCondition
+from practice_bidding.xml_parsing.conditions import ShapeCondition
+from practice_bidding.xml_parsing.reachability import bid_sequence
+
+MAGIC = b"PBBI"
+VERSION = 1
+_HEADER = struct.Struct("<4sII")
+_PARTNERS = {"N": "S", "E": "W", "S": "N", "W": "E"}
+# Decompressed bitmaps are kept for the most recently used bids.
+CACHE_SIZE = 64
+
+
+def condition_fingerprint(condition, fingerprints=None) -> str:
+    """
+    A digest of what a condition tests, the same in every process.
+
+    fingerprints, if given, is a cache of id(condition) -> fingerprint.
+    """
+    if fingerprints is None:
+        fingerprints = {}
+
+    try:
+        return fingerprints[id(condition)][1]
+    except KeyError:
+        pass
+
+    if isinstance(condition, (AndCondition, Condition, OrCondition)):
+        operator = "or" if isinstance(condition, OrCondition) else "and"
+        text = f"{operator}(" + ",".join(
+            condition_fingerprint(child, fingerprints)
+            for child in condition.conditions) + ")"
+    elif isinstance(condition, NotCondition):
+        child = condition_fingerprint(condition.condition, fingerprints)
+        text = f"not({child})"
+    elif isinstance(condition, ShapeCondition):
+        text = f"shape({condition.shape_mask():x})"
+    elif isinstance(condition, EvaluationCondition):
+        name = condition.name or repr(condition.evaluation_method)
+        text = f"{name}({condition.minimum!r},{condition.maximum!r})"
+    else:
+        text = f"{type(condition).__name__}({condition.info})"
+
+    fingerprint = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    # Keep the condition alive so its id is not reused.
+    fingerprints[id(condition)] = (condition, fingerprint)
+    return fingerprint
+
+
+def system_fingerprint(formulas) -> str:
+    """ A digest of the evaluation methods of a system (FormulaMethods). """
+    digest = hashlib.sha1(
+        json.dumps(formulas.attributes, sort_keys=True).encode("utf-8"))
+    if formulas.formula_module_path is not None:
+        with open(formulas.formula_module_path, "rb") as file:
+            digest.update(file.read())
+
+    return digest.hexdigest()
+
+
+def corpus_fingerprint(corpus) -> str:
+    """ A digest of the deals of a corpus. """
+    return hashlib.sha1(corpus.column("cards")).hexdigest()
+
+
+def _subtrees(bids):
+    for bid in bids:
+        yield bid
+        yield from _subtrees(bid.children.values())
+
+
+class BidIndex:
+    """ Bid sequence, e.g. "1s 2n" -> the corpus hands accepted. """
+
+    def __init__(self, deal_count, corpus, system, sequences, bitmaps):
+        self.deal_count = deal_count
+        self.corpus = corpus
+        self.system = system
+        # Bid sequence -> fingerprint of its condition.
+        self.sequences = sequences
+        # Fingerprint -> compressed bitmap.
+        self._bitmaps = bitmaps
+        self._cache = {}
+        # How many conditions were evaluated to build this index.
+        self.evaluated = 0
+
+    @classmethod
+    def build(cls, opening_bids, evaluator, formulas, previous=None):
+        """
+        Index every bid of a system against evaluator.corpus.
+
+        Bitmaps of unchanged conditions are taken from previous, if it was
+        built for the same corpus and evaluation methods.
+        """
+        corpus = corpus_fingerprint(evaluator.corpus)
+        system = system_fingerprint(formulas)
+        bitmaps = {}
+        if (previous is not None and previous.corpus == corpus
+                and previous.system == system):
+            bitmaps.update(previous._bitmaps)
+
+        hand_bytes = (evaluator.corpus.hand_count + 7) // 8
+        index = cls(len(evaluator.corpus), corpus, system, {}, {})
+        fingerprints = {}
+        for bid in _subtrees(opening_bids.values()):
+            fingerprint = condition_fingerprint(bid.condition, fingerprints)
+            index.sequences[bid_sequence(bid)] = fingerprint
+            if fingerprint in index._bitmaps:
+                continue
+
+            try:
+                index._bitmaps[fingerprint] = bitmaps[fingerprint]
+            except KeyError:
+                bitmap = evaluator.accepted(bid.condition)
+                index._bitmaps[fingerprint] = zlib.compress(
+                    bitmap.to_bytes(hand_bytes, "little"))
+                index.evaluated += 1
+
+        return index
+
+    def update(self, result, evaluator, formulas):
+        """
+        Reindex the bids changed by a reload of the system (a ReloadResult
+        from SystemWatcher). Only new conditions are evaluated.
+        """
+        self.evaluated = 0
+        system = system_fingerprint(formulas)
+        if system != self.system:
+            self.system = system
+            self._bitmaps.clear()
+            self._cache.clear()
+
+        for bid in _subtrees(result.removed):
+            self.sequences.pop(bid_sequence(bid), None)
+
+        hand_bytes = (evaluator.corpus.hand_count + 7) // 8
+        fingerprints = {}
+        for bid in itertools.chain(result.changed,
+                                   _subtrees(result.added)):
+            fingerprint = condition_fingerprint(bid.condition, fingerprints)
+            self.sequences[bid_sequence(bid)] = fingerprint
+            if fingerprint not in self._bitmaps:
+                bitmap = evaluator.accepted(bid.condition)
+                self._bitmaps[fingerprint] = zlib.compress(
+                    bitmap.to_bytes(hand_bytes, "little"))
+                self.evaluated += 1
+
+        # Drop the bitmaps no bid uses any more.
+        used = set(self.sequences.values())
+        for fingerprint in list(self._bitmaps):
+            if fingerprint not in used:
+                del self._bitmaps[fingerprint]
+                self._cache.pop(fingerprint, None)
+
+    def save(self, filepath):
+        """ Write the index to a file. """
+        table = {}
+        offset = 0
+        for fingerprint, data in self._bitmaps.items():
+            table[fingerprint] = (offset, len(data))
+            offset += len(data)
+
+        metadata = json.dumps({"deal_count": self.deal_count,
+                               "corpus": self.corpus,
+                               "system": self.system,
+                               "sequences": self.sequences,
+                               "bitmaps": table}).encode("utf-8")
+        with open(filepath, "wb") as file:
+            file.write(_HEADER.pack(MAGIC, VERSION, len(metadata)))
+            file.write(metadata)
+            for data in self._bitmaps.values():
+                file.write(data)
+
+    @classmethod
+    def load(cls, filepath):
+        """ Read an index written by save. """
+        with open(filepath, "rb") as file:
+            data = file.read()
+
+        magic, version, metadata_length = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a version {VERSION} bid index.")
+
+        start = _HEADER.size + metadata_length
+        metadata = json.loads(data[_HEADER.size:start].decode("utf-8"))
+        bitmaps = {fingerprint: data[start + offset:start + offset + length]
+                   for fingerprint, (offset, length)
+                   in metadata["bitmaps"].items()}
+        return cls(metadata["deal_count"], metadata["corpus"],
+                   metadata["system"], metadata["sequences"], bitmaps)
+
+    def hands(self, sequence) -> int:
+        """
+        The bitmap of the hands accepted by the last bid of a sequence such
+        as "1s 2n", in the order of CorpusEvaluator.
+        """
+        fingerprint = self.sequences[sequence]
+        try:
+            bitmap = self._cache.pop(fingerprint)
+        except KeyError:
+            bitmap = int.from_bytes(zlib.decompress(
+                self._bitmaps[fingerprint]), "little")
+            if len(self._cache) >= CACHE_SIZE:
+                del self._cache[next(iter(self._cache))]
+
+        # Most recently used last.
+        self._cache[fingerprint] = bitmap
+        return bitmap
+
+    def deals(self, sequence, seat="S") -> int:
+        """
+        The bitmap of the deals where seat can make the last call of an
+        uncontested sequence, and seat and partner all the calls before it.
+
+        e.g. deals("1s 2n", "N") for North responding 2n to South's 1s.
+        """
+        calls = sequence.split()
+        result = (1 << self.deal_count) - 1
+        for length in range(len(calls), 0, -1):
+            result &= seat_deals(self.hands(" ".join(calls[:length])), seat,
+                                 self.deal_count)
+            seat = _PARTNERS[seat]
+
+        return result
+
+    def dealer(self, corpus, sequence, seat="S"):
+        """
+        A deal generator, for BiddingProgram, dealing only the deals where
+        seat can make the last call of the sequence.
+        """
+        deal_indices = list(iter_bits(self.deals(sequence, seat)))
+        if not deal_indices:
+            raise ValueError(f"No deal in the corpus fits {sequence}.")
+
+        position = [0]
+
+        def deal():
+            index = deal_indices[position[0] % len(deal_indices)]
+            position[0] += 1
+            return corpus.deal(index)
+
+        return deal
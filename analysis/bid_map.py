@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 20:52:40 2026
+
+What would this hand bid at each point of the system?
+
+BidMapper.accepted_bids walks the bid tree once for a hand and returns the
+accepted children of every node. Every evaluation method used by the system
+is called at most once per hand, and every shape test at most once per shape:
+shape results are remembered for each shape seen, so later hands of the same
+shape repeat none of them. Leaves are still only evaluated when the
+short-circuiting conditions need them.
+
+BidMapper.accept evaluates a single bid the same way. The values of a hand
+are kept for the current board (see memoization.py), so the systems of both
+sides of a competitive auction share one extraction of the features of each
+hand of the deal.
+"""
+
+__author__ = "Andrew I McClement"
+
+from collections.abc import Mapping
+
+from practice_bidding.memoization import HandMemo, is_impure
+from practice_bidding.xml_parsing.compiled_conditions import compile_condition
+from practice_bidding.xml_parsing.compiled_conditions import ConditionCompiler
+from practice_bidding.xml_parsing.conditions import ShapeCondition
+
+
+class _LazyResults(dict):
+    """ Results of leaves, each computed when first needed. """
+
+    __slots__ = ("_hand", "_leaves")
+
+    def __init__(self, hand, leaves):
+        super().__init__()
+        self._hand = hand
+        self._leaves = leaves
+
+    def __missing__(self, index):
+        result = self[index] = self._leaves[index](self._hand)
+        return result
+
+
+class _SharedLeafCompiler(ConditionCompiler):
+    """ Compiles conditions to read their leaves from precomputed results. """
+
+    arguments = ("hand", "shapes", "values")
+
+    def __init__(self, mapper):
+        super().__init__()
+        self._mapper = mapper
+
+    def evaluation_expression(self, condition):
+        if is_impure(condition.evaluation_method):
+            # Must be called afresh every time.
+            return super().evaluation_expression(condition)
+
+        lower, upper = condition.bounds
+        index = self._mapper.function_index(condition)
+        return (f"({self.name('c', lower)} <= values[{index}]"
+                f" <= {self.name('c', upper)})")
+
+    def formula_expression(self, condition):
+        def value_source(method):
+            if is_impure(method):
+                return f"{self.name('f', method)}(hand)"
+
+            return f"values[{self._mapper.method_index(method)}]"
+
+        return condition.source(value_source)
+
+    def simple_expression(self, condition):
+        if isinstance(condition, ShapeCondition):
+            return f"shapes[{self._mapper.shape_index(condition)}]"
+
+        return super().simple_expression(condition)
+
+
+class BidMapper:
+    """ Evaluates a whole bid tree for one hand at a time. """
+
+    def __init__(self, opening_bids):
+        self.opening_bids = opening_bids
+        self._functions = []
+        self._function_indices = {}
+        self._shape_functions = []
+        self._shape_indices = {}
+        # Shape -> results of the shape conditions tested so far.
+        self._shape_results = {}
+        # id(condition) -> (condition, compiled function). Bids sharing a
+        # condition share its function, and a bid whose condition is
+        # replaced by a reload is compiled afresh when next evaluated.
+        self._compiled = {}
+        self._features = HandMemo(self._extract_features)
+        self._compile(opening_bids.values())
+
+    def _compile(self, bids, descendants=True):
+        stack = list(bids)
+        while stack:
+            bid = stack.pop()
+            if descendants:
+                stack.extend(bid.children.values())
+
+            self._function(bid)
+
+    def _function(self, bid):
+        """ The compiled function of a bid, or None if it has none. """
+        try:
+            condition = bid.condition
+        except AttributeError:
+            # e.g. a FlatBid, which evaluates its own shared features.
+            return None
+
+        try:
+            return self._compiled[id(condition)][1]
+        except KeyError:
+            function = compile_condition(condition, _SharedLeafCompiler(self))
+            self._compiled[id(condition)] = (condition, function)
+            return function
+
+    def update(self, result):
+        """
+        Recompile the bids changed by a reload of the system (a ReloadResult
+        from SystemWatcher), keeping everything else.
+        """
+        if result.full:
+            self.__init__(self.opening_bids)
+            return
+
+        stack = list(result.removed)
+        while stack:
+            bid = stack.pop()
+            stack.extend(bid.children.values())
+            self._compiled.pop(id(getattr(bid, "condition", None)), None)
+
+        self._compile(result.changed, descendants=False)
+        self._compile(result.added)
+
+    def function_index(self, condition) -> int:
+        """ The index of an evaluation condition's value for a hand. """
+        # Conditions on the same method share one evaluation function. That
+        # of a table evaluator gives its scaled value.
+        method = condition.evaluation_method
+        return self._value_index((id(method), condition.integral),
+                                 condition.evaluation_function)
+
+    def method_index(self, method) -> int:
+        """ The index of an evaluation method's value for a hand. """
+        return self._value_index((id(method), False), method)
+
+    def _value_index(self, key, function):
+        try:
+            return self._function_indices[key]
+        except KeyError:
+            self._functions.append(function)
+            index = self._function_indices[key] = len(self._functions) - 1
+            return index
+
+    def shape_index(self, condition) -> int:
+        """ The index of a shape condition in the shape results. """
+        # Shape conditions such as "balanced" share one accept function.
+        key = id(condition.accept_function)
+        try:
+            return self._shape_indices[key]
+        except KeyError:
+            self._shape_functions.append(condition.accept)
+            index = self._shape_indices[key] = len(self._shape_functions) - 1
+            return index
+
+    def _extract_features(self, hand):
+        return self._shapes(hand), _LazyResults(hand, self._functions)
+
+    def accept(self, bid, hand) -> bool:
+        """ bid.accept(hand), from the features shared for the board. """
+        function = self._function(bid)
+        if function is None:
+            return bid.accept(hand)
+
+        shapes, values = self._features(hand)
+        return function(hand, shapes, values)
+
+    def _shapes(self, hand):
+        shape = tuple(hand.shape)
+        try:
+            return self._shape_results[shape]
+        except KeyError:
+            results = self._shape_results[shape] = _LazyResults(
+                hand, self._shape_functions)
+            return results
+
+    def accepted_bids(self, hand, start=None, max_depth=None):
+        """
+        The accepted children of every node below start, in one walk.
+
+        start is a Bid, or a mapping of bids which defaults to the opening
+        bids. Returns {node: [accepted children of node]}, where the key for
+        a mapping of bids is None. Only max_depth levels below start are
+        evaluated.
+        """
+        shapes, values = self._features(hand)
+        function = self._function
+
+        def accept(bid):
+            compiled = function(bid)
+            if compiled is None:
+                return bid.accept(hand)
+
+            return compiled(hand, shapes, values)
+
+        if start is None:
+            start = self.opening_bids
+
+        if isinstance(start, Mapping):
+            level = [(None, start)]
+        else:
+            level = [(start, start.children)]
+
+        result = {}
+        depth = 0
+        while level and (max_depth is None or depth < max_depth):
+            next_level = []
+            for node, children in level:
+                children = children.values()
+                result[node] = [child for child in children if accept(child)]
+                next_level.extend((child, child.children)
+                                  for child in children)
+            level = next_level
+            depth += 1
+
+        return result
+
+
+class CountingBidMapper(BidMapper):
+    """ A BidMapper which counts the bids it is asked to evaluate. """
+
+    def __init__(self, opening_bids=None):
+        super().__init__(opening_bids or {})
+        self.evaluations = 0
+
+    def accept(self, bid, hand) -> bool:
+        self.evaluations += 1
+        return super().accept(bid, hand)
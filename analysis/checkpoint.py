@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 08:47:32 2026
+
+Checkpoints, so that a long run which is interrupted can carry on.
+
+A run is divided into shards, each dealt from its own random substream
+(seeded from the run's seed and the shard number), which complete in
+order. A checkpoint records the arguments of the run, its seed, how many
+shards are complete and whatever partial results are needed to carry on,
+such as the size of the output so far and running totals. Restarting with
+the same arguments skips the completed shards and continues from the
+saved state, giving the same results as a run which was never stopped.
+
+Checkpoints are small JSON files, replaced atomically, so a run killed
+while saving one still has the previous checkpoint.
+"""
+
+__author__ = "Andrew I McClement"
+
+from contextlib import contextmanager
+import json
+import os
+import random
+
+
+@contextmanager
+def seeded_random(seed):
+    """
+    Seed the random module for the duration of the block, then restore the
+    caller's random state.
+
+    The dealer and the robot draw from the random module itself, so a
+    substream cannot be a random.Random of its own. seed=None seeds from
+    the operating system, e.g. so that forked workers differ.
+    """
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        yield
+    finally:
+        random.setstate(state)
+
+
+class Checkpoint:
+    """ The saved progress of a run. """
+
+    def __init__(self, path, arguments, seed=None):
+        self.path = path
+        # JSON values which must match when the run is resumed.
+        self.arguments = arguments
+        # A run without a seed is given one, so it can be resumed.
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.shards = 0
+        self.state = {}
+
+    @classmethod
+    def resume(cls, path, arguments, seed=None):
+        """
+        The checkpoint at path, or a new one if there is none. Raises
+        ValueError if it was saved by a run with different arguments.
+        """
+        checkpoint = cls(path, arguments, seed)
+        if not os.path.exists(path):
+            return checkpoint
+
+        with open(path, encoding="utf-8") as file:
+            saved = json.load(file)
+
+        if (saved["arguments"] != json.loads(json.dumps(arguments))
+                or seed is not None and saved["seed"] != seed):
+            raise ValueError(f"{path} is a checkpoint of a different run.")
+
+        checkpoint.seed = saved["seed"]
+        checkpoint.shards = saved["shards"]
+        checkpoint.state = saved["state"]
+        return checkpoint
+
+    def save(self, shards, **state):
+        """ Record that the first shards are complete, with their state. """
+        self.shards = shards
+        self.state = state
+        temporary_path = self.path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump({"arguments": self.arguments, "seed": self.seed,
+                       "shards": shards, "state": state}, file)
+
+        os.replace(temporary_path, self.path)
+
+    def remove(self):
+        """ Delete the checkpoint once the run is complete. """
+        if os.path.exists(self.path):
+            os.remove(self.path)
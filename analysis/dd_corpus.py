@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 02:58:44 2026
+
+Double dummy tables for a deal corpus, solved once and read many times.
+
+The tables are kept in a sidecar file beside the corpus (by default
+<corpus>.dd): a header then 20 trick counts per deal, indexed as in
+scoring.table_index. Unsolved deals hold UNSOLVED, so a build which is
+interrupted carries on from where it stopped when run again.
+
+A practice session drawing its boards from DDCorpus.dealer never calls
+the solver: the double dummy result and par of each board are read from
+its table.
+
+Build the sidecar with:
+    python -m practice_bidding.analysis.dd_corpus <corpus> [processes]
+"""
+
+__author__ = "Andrew I McClement"
+
+import mmap
+import multiprocessing
+import os
+import struct
+import sys
+
+from practice_bidding.analysis.deal_corpus import DealCorpus
+from practice_bidding import scoring
+from practice_bidding.scoring import TABLE_SIZE, dd_table
+
+MAGIC = b"PBDD"
+VERSION = 1
+_HEADER = struct.Struct("<4sIQ")
+UNSOLVED = 0xFF
+# Deals solved per task: the file is flushed after each, so at most this
+# many solutions per process are lost if a build is interrupted.
+CHUNK_SIZE = 64
+
+# The corpus of a worker process of build_dd_tables.
+_corpus = None
+
+
+def dd_path_for(corpus_path):
+    """ The default sidecar path of a corpus. """
+    return corpus_path + ".dd"
+
+
+def _create_sidecar(dd_path, deal_count):
+    with open(dd_path, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, deal_count))
+        file.write(bytes([UNSOLVED]) * (TABLE_SIZE * deal_count))
+
+
+def _load_corpus(corpus_path):
+    global _corpus
+    _corpus = DealCorpus.load(corpus_path)
+
+
+def _solve(deal_indices):
+    return [(i, dd_table(_corpus.deal(i))) for i in deal_indices]
+
+
+def build_dd_tables(corpus_path, dd_path=None, processes=None,
+                    chunk_size=CHUNK_SIZE) -> int:
+    """
+    Solve every deal of a corpus not yet in its sidecar, creating the
+    sidecar if need be. Returns how many deals were solved.
+
+    With processes=0 everything runs in this process.
+    """
+    dd_path = dd_path or dd_path_for(corpus_path)
+    deal_count = len(DealCorpus.load(corpus_path))
+    if not os.path.exists(dd_path):
+        _create_sidecar(dd_path, deal_count)
+
+    with open(dd_path, "r+b") as file:
+        with mmap.mmap(file.fileno(), 0) as buffer:
+            magic, version, sidecar_count = _HEADER.unpack_from(buffer, 0)
+            if (magic, version, sidecar_count) != (MAGIC, VERSION,
+                                                   deal_count):
+                raise ValueError(f"{dd_path} is not a double dummy file for "
+                                 f"{corpus_path}.")
+
+            missing = [i for i in range(deal_count)
+                       if buffer[_HEADER.size + TABLE_SIZE * i] == UNSOLVED]
+            chunks = [missing[start:start + chunk_size]
+                      for start in range(0, len(missing), chunk_size)]
+            if processes == 0:
+                _load_corpus(corpus_path)
+                results = map(_solve, chunks)
+                pool = None
+            else:
+                pool = multiprocessing.Pool(processes, _load_corpus,
+                                            (corpus_path,))
+                results = pool.imap_unordered(_solve, chunks)
+
+            try:
+                for solved in results:
+                    for i, table in solved:
+                        start = _HEADER.size + TABLE_SIZE * i
+                        buffer[start:start + TABLE_SIZE] = table
+
+                    buffer.flush()
+            finally:
+                if pool is not None:
+                    pool.terminate()
+                    pool.join()
+
+    return len(missing)
+
+
+class PrecomputedDeal:
+    """
+    A redeal Deal whose double dummy results are read from a table.
+
+    Everything else is delegated to the deal.
+    """
+
+    __slots__ = ("_deal", "dd_table")
+
+    def __init__(self, deal, table):
+        self._deal = deal
+        # 20 trick counts, indexed by scoring.table_index.
+        self.dd_table = table
+
+    def __getattr__(self, name):
+        return getattr(self._deal, name)
+
+    def __iter__(self):
+        return iter(self._deal)
+
+    def __getitem__(self, index):
+        return self._deal[index]
+
+    def __len__(self):
+        return len(self._deal)
+
+    def __str__(self):
+        return str(self._deal)
+
+    def dd_tricks(self, contract):
+        """ Tricks for a contract such as "3NS", as Deal.dd_tricks. """
+        return self.dd_table[scoring.table_index(contract[1], contract[-1])]
+
+    def dd_score(self, contract, vulnerable=False):
+        """ Score for declarer of a contract, as Deal.dd_score. """
+        return scoring.dd_score(self.dd_table, contract, vulnerable)
+
+
+class DDCorpus:
+    """ A deal corpus with the double dummy table of each deal. """
+
+    def __init__(self, buffer, corpus):
+        # Keep the buffer (e.g. an mmap) alive as long as the view.
+        self._buffer = buffer
+        magic, version, self.deal_count = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a version {VERSION} double dummy file.")
+
+        self._tables = memoryview(buffer)[_HEADER.size:_HEADER.size
+                                          + TABLE_SIZE * self.deal_count]
+        self.corpus = corpus
+        if corpus is not None and len(corpus) != self.deal_count:
+            raise ValueError("Double dummy file is for another corpus.")
+
+    @classmethod
+    def load(cls, corpus_path, dd_path=None):
+        """ Map a corpus and its sidecar into memory, read only. """
+        with open(dd_path or dd_path_for(corpus_path), "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return cls(buffer, DealCorpus.load(corpus_path))
+
+    def __len__(self):
+        return self.deal_count
+
+    def solved(self, deal_index) -> bool:
+        """ Whether the table of a deal has been solved. """
+        return self._tables[TABLE_SIZE * deal_index] != UNSOLVED
+
+    def table(self, deal_index) -> bytes:
+        """ The double dummy table of a deal, see scoring.table_index. """
+        if not self.solved(deal_index):
+            raise ValueError(f"Deal {deal_index} has not been solved.")
+
+        start = TABLE_SIZE * deal_index
+        return bytes(self._tables[start:start + TABLE_SIZE])
+
+    def deal(self, deal_index) -> PrecomputedDeal:
+        """ A deal of the corpus, with its double dummy table. """
+        return PrecomputedDeal(self.corpus.deal(deal_index),
+                               self.table(deal_index))
+
+    def dealer(self, start=0):
+        """
+        A function returning the solved deals in order, for use in place of
+        Deal.prepare({}), e.g. BiddingProgram(dd_corpus.dealer()). It
+        starts again from the first deal after the last.
+        """
+        deal_indices = [i for i in range(self.deal_count) if self.solved(i)]
+        if not deal_indices:
+            raise ValueError("No deal of the corpus has been solved.")
+
+        position = [start]
+
+        def deal():
+            index = deal_indices[position[0] % len(deal_indices)]
+            position[0] += 1
+            return self.deal(index)
+
+        return deal
+
+
+def load_corpus(corpus_path):
+    """
+    A corpus as a DDCorpus if its sidecar exists, else as a DealCorpus.
+    """
+    if os.path.exists(dd_path_for(corpus_path)):
+        return DDCorpus.load(corpus_path)
+
+    return DealCorpus.load(corpus_path)
+
+
+def board_deal(corpus, board):
+    """
+    The deal of a board, counting from 1 and starting again from the first
+    deal after the last. Deals without a solved table are solved as usual.
+    """
+    deal_index = (board - 1) % len(corpus)
+    if isinstance(corpus, DDCorpus) and not corpus.solved(deal_index):
+        return corpus.corpus.deal(deal_index)
+
+    return corpus.deal(deal_index)
+
+
+def main():
+    """ Solve the double dummy tables of a corpus. """
+    corpus_path = sys.argv[1]
+    try:
+        processes = int(sys.argv[2])
+    except IndexError:
+        processes = None
+
+    solved = build_dd_tables(corpus_path, processes=processes)
+    print(f"{solved} deals solved.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 00:12:26 2026
+
+Deal once, analyse many times: a memory-mapped corpus of deals.
+
+The file holds a header, JSON metadata and one column per feature, each 8
+byte aligned. Columns are read through memoryviews of a read-only mmap, so
+opening a corpus of any size copies nothing and every process shares the
+same pages. numpy users can wrap a column with numpy.frombuffer, again
+without copying.
+
+Columns (per deal, seats in the order N, E, S, W):
+    cards         uint8 x 13  the seat holding each card, 2 bits per card,
+                              spades to clubs and ace to two.
+    shape         uint16 x 4  index into SHAPES.
+    hcp           uint8 x 4   4-3-2-1 high card points.
+    chimaera_hcp  uint8 x 4   4.5-3-1.5-0.75-0.25 points, times 4.
+    freakness     uint8 x 4   redeal's freakness.
+    tricks        uint8 x 4   playing tricks, times 2.
+
+Hands are numbered 4 * deal + seat. CorpusEvaluator evaluates a condition
+for every hand of the corpus at once, as a bitmap with one bit per hand.
+Bitmaps are ordered by seat, then deal, so the bits of one seat are a
+bitmap over deals.
+"""
+
+__author__ = "Andrew I McClement"
+
+from array import array
+import json
+import mmap
+import struct
+import sys
+
+from practice_bidding.analysis.checkpoint import Checkpoint, seeded_random
+from practice_bidding.redeal.redeal import Deal, Hand
+from practice_bidding.standard_formulas import HCP
+from practice_bidding import standard_formulas
+from practice_bidding.suit_tables import hand_masks, playing_tricks
+from practice_bidding.xml_parsing.conditions import AndCondition, Condition
+from practice_bidding.xml_parsing.conditions import EvaluationCondition
+from practice_bidding.xml_parsing.conditions import NotCondition, OrCondition
+from practice_bidding.xml_parsing.conditions import ShapeCondition
+from practice_bidding.xml_parsing.flat_tree import SHAPE_IDS
+from practice_bidding.xml_parsing.xml_parser import CHIMAERA_HCP
+
+MAGIC = b"PBDC"
+VERSION = 1
+SEATS = "NESW"
+_HEADER = struct.Struct("<4sIQI")
+_RANKS = "AKQJT98765432"
+CARD_BYTES = 13
+# Name, array typecode, values per deal, scale.
+COLUMNS = (("cards", "B", CARD_BYTES, 1),
+           ("shape", "H", 4, 1),
+           ("hcp", "B", 4, HCP.scale),
+           ("chimaera_hcp", "B", 4, CHIMAERA_HCP.scale),
+           ("freakness", "B", 4, 1),
+           ("tricks", "B", 4, 2))
+# Evaluation methods which may be read from a column instead of computed.
+METHOD_COLUMNS = {id(HCP): "hcp", id(CHIMAERA_HCP): "chimaera_hcp",
+                  id(playing_tricks): "tricks",
+                  id(standard_formulas.tricks): "tricks"}
+
+
+def _pack_cards(deal):
+    """ 13 bytes giving the seat of each card. """
+    packed = bytearray(CARD_BYTES)
+    for seat, hand in enumerate(deal):
+        for suit, mask in enumerate(hand_masks(hand)):
+            for rank in range(13):
+                # Bit 12 of a mask is the ace, which comes first.
+                if mask >> (12 - rank) & 1:
+                    card = 13 * suit + rank
+                    packed[card >> 2] |= seat << 2 * (card & 3)
+
+    return packed
+
+
+def hand_features(hand):
+    """ The feature columns of a hand, in the order of COLUMNS[1:]. """
+    return (SHAPE_IDS[tuple(hand.shape)], HCP.scaled(hand),
+            CHIMAERA_HCP.scaled(hand), hand.freakness,
+            round(2 * playing_tricks(hand)))
+
+
+def _column_layout(deal_count):
+    columns = []
+    offset = 0
+    for name, typecode, width, scale in COLUMNS:
+        offset += -offset % 8
+        columns.append({"name": name, "typecode": typecode, "width": width,
+                        "scale": scale, "offset": offset})
+        offset += deal_count * width * array(typecode).itemsize
+
+    return columns
+
+
+def _deal_chunk(dealer, count, columns):
+    """ The packed cards, and the feature columns, of count deals. """
+    cards = bytearray()
+    features = [array(column["typecode"]) for column in columns[1:]]
+    for _ in range(count):
+        deal = dealer()
+        cards.extend(_pack_cards(deal))
+        for hand in deal:
+            for values, value in zip(features, hand_features(hand)):
+                values.append(value)
+
+    return cards, features
+
+
+def write_corpus(filepath, deal_count, dealer=None, chunk_size=10000,
+                 seed=None, checkpoint_path=None):
+    """
+    Deal deal_count deals with dealer (by default any deal) and write them.
+
+    Deals are written chunk_size at a time, so memory use does not grow
+    with the size of the corpus. With a seed, chunk k is dealt from its own
+    random substream, so the corpus is the same however it is written.
+
+    Given checkpoint_path, progress is saved there after each chunk, and a
+    call with the same arguments (and dealer) carries on from the last
+    checkpoint, writing the same corpus as a call which was never stopped.
+    The checkpoint is removed once the corpus is complete.
+    """
+    dealer = dealer or Deal.prepare({})
+    columns = _column_layout(deal_count)
+    metadata = json.dumps({"columns": columns,
+                           "byteorder": sys.byteorder}).encode("utf-8")
+    data_start = _HEADER.size + len(metadata)
+    data_start += -data_start % 8
+    checkpoint = None
+    first_chunk = 0
+    if checkpoint_path is not None:
+        checkpoint = Checkpoint.resume(
+            checkpoint_path, {"filepath": filepath, "deal_count": deal_count,
+                              "chunk_size": chunk_size}, seed)
+        seed = checkpoint.seed
+        first_chunk = checkpoint.shards
+
+    with open(filepath, "r+b" if first_chunk else "wb") as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, deal_count, len(metadata)))
+        file.write(metadata)
+        for chunk, start in enumerate(range(0, deal_count, chunk_size)):
+            if chunk < first_chunk:
+                continue
+
+            count = min(chunk_size, deal_count - start)
+            if seed is None:
+                cards, features = _deal_chunk(dealer, count, columns)
+            else:
+                with seeded_random(f"{seed}:{chunk}"):
+                    cards, features = _deal_chunk(dealer, count, columns)
+
+            for column, values in zip(columns, [cards] + features):
+                itemsize = array(column["typecode"]).itemsize
+                file.seek(data_start + column["offset"]
+                          + start * column["width"] * itemsize)
+                file.write(values)
+
+            if checkpoint is not None:
+                file.flush()
+                checkpoint.save(chunk + 1)
+
+    if checkpoint is not None:
+        checkpoint.remove()
+
+
+class DealCorpus:
+    """ A corpus of deals read without copying. """
+
+    def __init__(self, buffer):
+        # Keep the buffer (e.g. an mmap) alive as long as the views.
+        self._buffer = buffer
+        magic, version, self.deal_count, metadata_length = \
+            _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a version {VERSION} deal corpus.")
+
+        metadata = json.loads(bytes(buffer[_HEADER.size:_HEADER.size
+                                           + metadata_length]))
+        if metadata["byteorder"] != sys.byteorder:  # pragma: no cover
+            raise ValueError("Deal corpus written with another byte order.")
+
+        data_start = _HEADER.size + metadata_length
+        data_start += -data_start % 8
+        view = memoryview(buffer)
+        self._columns = {}
+        self.scales = {}
+        for column in metadata["columns"]:
+            start = data_start + column["offset"]
+            length = (self.deal_count * column["width"]
+                      * array(column["typecode"]).itemsize)
+            self._columns[column["name"]] = view[start:start + length].cast(
+                column["typecode"])
+            self.scales[column["name"]] = column["scale"]
+
+    @classmethod
+    def load(cls, filepath):
+        """ Map a corpus file into memory, read only. """
+        with open(filepath, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return cls(buffer)
+
+    def __len__(self):
+        return self.deal_count
+
+    @property
+    def hand_count(self):
+        return 4 * self.deal_count
+
+    def column(self, name):
+        """
+        A flat memoryview of a column. The value of a feature for a deal and
+        seat is at 4 * deal + seat, in units of 1 / self.scales[name].
+        """
+        return self._columns[name]
+
+    def feature(self, name, hand_id):
+        """ The value of a feature for hand 4 * deal + seat. """
+        return self._columns[name][hand_id] / self.scales[name]
+
+    def _hand_strings(self, deal_index):
+        cards = self._columns["cards"][CARD_BYTES * deal_index:
+                                       CARD_BYTES * (deal_index + 1)]
+        suits = [[[] for _ in range(4)] for _ in SEATS]
+        for card in range(52):
+            seat = cards[card >> 2] >> 2 * (card & 3) & 3
+            suits[seat][card // 13].append(_RANKS[card % 13])
+
+        return [" ".join("".join(suit) or "-" for suit in hand)
+                for hand in suits]
+
+    def hand(self, hand_id) -> Hand:
+        """ Hand 4 * deal + seat. """
+        deal_index, seat = divmod(hand_id, 4)
+        return Hand.from_str(self._hand_strings(deal_index)[seat])
+
+    def deal(self, deal_index) -> Deal:
+        """ A redeal Deal of the given deal. """
+        return Deal.prepare(dict(zip(SEATS,
+                                     self._hand_strings(deal_index))))()
+
+    def dealer(self, start=0):
+        """
+        A function returning the deals in order, for use in place of
+        Deal.prepare({}), e.g. BiddingProgram(corpus.dealer()). It starts
+        again from the first deal after the last.
+        """
+        next_deal = [start]
+
+        def deal():
+            index = next_deal[0] % self.deal_count
+            next_deal[0] = index + 1
+            return self.deal(index)
+
+        return deal
+
+
+def iter_bits(bitmap):
+    """ The indices of the set bits of a bitmap, in increasing order. """
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+    for i, byte in enumerate(data):
+        while byte:
+            low = byte & -byte
+            yield 8 * i + low.bit_length() - 1
+            byte ^= low
+
+
+def seat_deals(bitmap, seat, deal_count):
+    """
+    The bitmap over deals of the hands of one seat (e.g. "S") in a bitmap
+    ordered as in CorpusEvaluator.
+    """
+    return bitmap >> SEATS.index(seat) * deal_count & ((1 << deal_count) - 1)
+
+
+def _bitmap(indices, size):
+    data = bytearray((size + 7) // 8)
+    for i in indices:
+        data[i >> 3] |= 1 << (i & 7)
+
+    return int.from_bytes(data, "little")
+
+
+class CorpusEvaluator:
+    """
+    Evaluates conditions for every hand of a corpus at once.
+
+    Leaves are read from the columns where possible: the hands of each
+    shape and of each column value are grouped once, and a leaf is then the
+    union of the groups it accepts. Other evaluation methods are computed
+    once per hand, from the cards.
+    """
+
+    def __init__(self, corpus, method_columns=None):
+        self.corpus = corpus
+        self._method_columns = dict(METHOD_COLUMNS)
+        self._method_columns.update(
+            (id(method), name)
+            for method, name in (method_columns or {}).items())
+        self.all_hands = (1 << corpus.hand_count) - 1
+        # Column name (or id of a method) -> {value: bitmap of hands}.
+        self._groups = {}
+        # Methods must outlive the groups keyed by their ids.
+        self._methods = []
+        # id(condition) -> (condition, bitmap).
+        self._results = {}
+
+    def bit(self, hand_id) -> int:
+        """ The bit of hand 4 * deal + seat in a bitmap. """
+        deal_index, seat = divmod(hand_id, 4)
+        return seat * self.corpus.deal_count + deal_index
+
+    def hand_id(self, bit) -> int:
+        """ The hand (4 * deal + seat) of a bit in a bitmap. """
+        seat, deal_index = divmod(bit, self.corpus.deal_count)
+        return 4 * deal_index + seat
+
+    def seat_hands(self, seat):
+        """ The bitmap of the hands of one seat, e.g. "S". """
+        deal_count = self.corpus.deal_count
+        return ((1 << deal_count) - 1) << SEATS.index(seat) * deal_count
+
+    def seat_deals(self, bitmap, seat):
+        """ The bitmap over deals of the hands of one seat in bitmap. """
+        return seat_deals(bitmap, seat, self.corpus.deal_count)
+
+    def _grouped(self, key, values):
+        try:
+            return self._groups[key]
+        except KeyError:
+            pass
+
+        indices = {}
+        deal_count = self.corpus.deal_count
+        for i, value in enumerate(values):
+            bit = (i & 3) * deal_count + (i >> 2)
+            try:
+                indices[value].append(bit)
+            except KeyError:
+                indices[value] = array("I", [bit])
+
+        size = self.corpus.hand_count
+        groups = self._groups[key] = {
+            value: _bitmap(hand_ids, size)
+            for value, hand_ids in indices.items()}
+        return groups
+
+    def _evaluation_groups(self, condition):
+        """ (groups, (lower, upper)) in the units of the groups. """
+        method = condition.evaluation_method
+        lower, upper = condition.bounds
+        try:
+            name = self._method_columns[id(method)]
+        except KeyError:
+            self._methods.append(method)
+            function = condition.evaluation_function
+            values = (function(self.corpus.hand(i))
+                      for i in range(self.corpus.hand_count))
+            return self._grouped(id(method), values), (lower, upper)
+
+        if getattr(method, "scale", None) is None:
+            # Bounds are in the units of the method, not of the column.
+            scale = self.corpus.scales[name]
+            lower, upper = lower * scale, upper * scale
+
+        return self._grouped(name, self.corpus.column(name)), (lower, upper)
+
+    def accepted(self, condition) -> int:
+        """ The bitmap of the hands accepted by a condition. """
+        try:
+            return self._results[id(condition)][1]
+        except KeyError:
+            pass
+
+        result = self._accepted(condition)
+        self._results[id(condition)] = (condition, result)
+        return result
+
+    def _accepted(self, condition):
+        if isinstance(condition, (AndCondition, Condition)):
+            result = self.all_hands
+            for child in condition.conditions:
+                result &= self.accepted(child)
+            return result
+        elif isinstance(condition, OrCondition):
+            result = 0
+            for child in condition.conditions:
+                result |= self.accepted(child)
+            return result
+        elif isinstance(condition, NotCondition):
+            return self.all_hands & ~self.accepted(condition.condition)
+        elif isinstance(condition, ShapeCondition):
+            groups = self._grouped("shape", self.corpus.column("shape"))
+            mask = condition.shape_mask()
+            result = 0
+            for shape_id, hands in groups.items():
+                if mask >> shape_id & 1:
+                    result |= hands
+            return result
+        elif isinstance(condition, EvaluationCondition):
+            groups, (lower, upper) = self._evaluation_groups(condition)
+            result = 0
+            for value, hands in groups.items():
+                if lower <= value <= upper:
+                    result |= hands
+            return result
+
+        return _bitmap((self.bit(i) for i in range(self.corpus.hand_count)
+                        if condition.accept(self.corpus.hand(i))),
+                       self.corpus.hand_count)
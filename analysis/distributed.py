@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 09:38:15 2026
+
+Simulations shared between machines over TCP.
+
+A coordinator splits a simulation into seeded shards (see simulation.py)
+and hands them out, one at a time, to the workers which connect to it.
+Each worker loads the system once, from XML or a binary system (see
+binary_system.py), then simulates each shard it is given and sends back
+its totals (a SimulationTotals), not its records. The coordinator merges
+the totals in shard order, so the result does not depend on the number of
+workers or on which worker simulated which shard.
+
+If a worker disconnects, or takes longer than shard_timeout over a shard,
+its shard is handed to another worker. Every shard is seeded, so a shard
+simulated again gives the same totals.
+
+Paths in the job (the system, the opponents' system and the corpus) are
+opened by the workers, so must be valid on every machine. Run one worker
+per core.
+
+Messages are JSON objects, each preceded by its length as a 4 byte big
+endian integer:
+    worker:       {"type": "hello"}
+    coordinator:  {"type": "job", "xml_source": ..., "corpus_path": ...,
+                   "east_west_source": ..., "boards": ...,
+                   "shard_size": ..., "seed": ...}
+    coordinator:  {"type": "shard", "shard": k}
+    worker:       {"type": "totals", "shard": k, "totals": {...}}
+    coordinator:  {"type": "done"}
+
+Usage:
+    python -m practice_bidding.analysis.distributed coordinator
+        system.xml boards [port] [corpus] [east_west.xml]
+    python -m practice_bidding.analysis.distributed worker host:port
+"""
+
+__author__ = "Andrew I McClement"
+
+from collections import deque
+import json
+import random
+import socket
+import struct
+import sys
+import threading
+
+from practice_bidding.analysis.simulation import load_simulation
+from practice_bidding.analysis.simulation import shard_count, simulate_shard
+from practice_bidding.analysis.simulation import SHARD_SIZE
+from practice_bidding.analysis.simulation import SimulationTotals
+
+PORT = 7345
+_LENGTH = struct.Struct("!I")
+# Largest message accepted.
+MAX_MESSAGE = 1 << 20
+
+
+def send_message(connection, message):
+    """ Send a JSON object. """
+    data = json.dumps(message).encode("utf-8")
+    connection.sendall(_LENGTH.pack(len(data)) + data)
+
+
+def _receive_exactly(connection, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            return None
+        data.extend(chunk)
+
+    return bytes(data)
+
+
+def receive_message(connection):
+    """ Receive a JSON object, or None if the connection was closed. """
+    header = _receive_exactly(connection, _LENGTH.size)
+    if header is None:
+        return None
+
+    length, = _LENGTH.unpack(header)
+    if length > MAX_MESSAGE:
+        raise ValueError(f"Message of {length} bytes is too long.")
+
+    data = _receive_exactly(connection, length)
+    if data is None:
+        return None
+
+    return json.loads(data.decode("utf-8"))
+
+
+class Coordinator:
+    """
+    Hands out the shards of a simulation to workers and merges their
+    totals.
+    """
+
+    def __init__(self, xml_source, boards, corpus_path=None,
+                 east_west_source=None, shard_size=SHARD_SIZE, seed=None,
+                 host="", port=PORT, shard_timeout=None):
+        # Every shard must be seeded, so that it may be simulated again.
+        seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.job = {"type": "job", "xml_source": xml_source,
+                    "corpus_path": corpus_path,
+                    "east_west_source": east_west_source, "boards": boards,
+                    "shard_size": shard_size, "seed": seed}
+        self.shard_count = shard_count(boards, shard_size)
+        self.shard_timeout = shard_timeout
+        # Shard -> SimulationTotals.
+        self.results = {}
+        # Shards handed out again after their worker was lost.
+        self.reissued = 0
+        self._pending = deque(range(self.shard_count))
+        self._condition = threading.Condition()
+        # socket.create_server needs Python 3.8.
+        self._server = socket.socket()
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind((host, port))
+        self._server.listen()
+        self.address = self._server.getsockname()[:2]
+
+    @property
+    def _finished(self):
+        return len(self.results) == self.shard_count
+
+    def run(self, timeout=None) -> SimulationTotals:
+        """
+        Serve workers until every shard is simulated, then return the
+        merged totals. Raises TimeoutError after timeout seconds.
+        """
+        accepter = threading.Thread(target=self._accept, daemon=True)
+        accepter.start()
+        try:
+            with self._condition:
+                if not self._condition.wait_for(lambda: self._finished,
+                                                timeout):
+                    raise TimeoutError(
+                        f"{len(self.results)} of {self.shard_count} shards "
+                        f"simulated.")
+        finally:
+            self._server.close()
+
+        totals = SimulationTotals()
+        for shard in range(self.shard_count):
+            totals.merge(self.results[shard])
+
+        return totals
+
+    def _accept(self):
+        while True:
+            try:
+                connection, _ = self._server.accept()
+            except OSError:
+                # The server was closed.
+                return
+
+            connection.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            threading.Thread(target=self._serve, args=(connection,),
+                             daemon=True).start()
+
+    def _next_shard(self):
+        with self._condition:
+            while not self._pending and not self._finished:
+                self._condition.wait()
+
+            return self._pending.popleft() if self._pending else None
+
+    def _serve(self, connection):
+        shard = None
+        try:
+            with connection:
+                connection.settimeout(self.shard_timeout)
+                hello = receive_message(connection)
+                if hello is None or hello.get("type") != "hello":
+                    return
+
+                send_message(connection, self.job)
+                while True:
+                    shard = self._next_shard()
+                    if shard is None:
+                        send_message(connection, {"type": "done"})
+                        return
+
+                    send_message(connection, {"type": "shard",
+                                              "shard": shard})
+                    reply = receive_message(connection)
+                    if reply is None or reply.get("shard") != shard:
+                        return
+
+                    with self._condition:
+                        self.results.setdefault(
+                            shard, SimulationTotals(**reply["totals"]))
+                        self._condition.notify_all()
+                    shard = None
+        except (OSError, ValueError):
+            # The worker was lost: socket.timeout is an OSError.
+            pass
+        finally:
+            if shard is not None:
+                with self._condition:
+                    if shard not in self.results:
+                        self._pending.appendleft(shard)
+                        self.reissued += 1
+                        self._condition.notify_all()
+
+
+def run_worker(host, port=PORT) -> int:
+    """
+    Simulate shards for the coordinator at (host, port) until it has no
+    more. Returns the number of shards simulated.
+    """
+    shards = 0
+    with socket.create_connection((host, port)) as connection:
+        send_message(connection, {"type": "hello"})
+        job = receive_message(connection)
+        if job is None:
+            return shards
+
+        load_simulation(job["xml_source"], job["corpus_path"],
+                        job["east_west_source"])
+        while True:
+            message = receive_message(connection)
+            if message is None or message["type"] == "done":
+                return shards
+
+            totals = SimulationTotals()
+            for record in simulate_shard(message["shard"], job["boards"],
+                                         job["shard_size"], job["seed"]):
+                totals.add(record)
+
+            send_message(connection, {"type": "totals",
+                                      "shard": message["shard"],
+                                      "totals": totals.as_dict()})
+            shards += 1
+
+
+def main():
+    """ Run a coordinator or a worker, as given on the command line. """
+    role = sys.argv[1]
+    if role == "worker":
+        host, _, port = sys.argv[2].rpartition(":")
+        shards = run_worker(host, int(port))
+        print(f"{shards} shards simulated.")
+        return
+
+    xml_source, boards = sys.argv[2:4]
+    kwargs = {}
+    for argument in sys.argv[4:]:
+        if argument.lower().endswith(".xml"):
+            kwargs["east_west_source"] = argument
+        elif argument.isdigit():
+            kwargs["port"] = int(argument)
+        else:
+            kwargs["corpus_path"] = argument
+
+    coordinator = Coordinator(xml_source, int(boards), **kwargs)
+    print(f"Waiting for workers on port {coordinator.address[1]}.")
+    totals = coordinator.run()
+    print(f"{totals.boards} boards: {totals.passed_out} passed out, mean "
+          f"score {totals.score / max(totals.boards, 1):+.1f} to "
+          f"North-South, {totals.nodes / max(totals.boards, 1):.1f} "
+          f"conditions evaluated per board. {coordinator.reissued} shards "
+          f"reissued.")
+
+
+if __name__ == "__main__":
+    main()
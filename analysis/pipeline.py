@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 08:03:27 2026
+
+A pipeline of stages, each run by its own worker processes.
+
+Items flow from a source through the stages in order, e.g. deal -> auction
+-> double dummy -> score, and the results are yielded in source order.
+Each stage reads from a bounded queue, so a fast stage blocks rather than
+running ahead of a slow one, and the number of items in the pipeline at
+once is limited, so memory does not grow with the length of the source.
+Give the slowest stage the most workers.
+
+A stage's initializer is called once in each of its worker processes, as
+for multiprocessing.Pool. If every stage has workers=0, the stages are
+applied one item at a time in this process.
+"""
+
+__author__ = "Andrew I McClement"
+
+from collections import namedtuple
+from contextlib import contextmanager
+import multiprocessing
+import queue
+import threading
+import traceback
+
+# Items waiting for each stage.
+QUEUE_SIZE = 4
+# Seconds between checks that the workers are alive, while waiting for a
+# result.
+POLL_INTERVAL = 1
+
+Stage = namedtuple("Stage", ["name", "function", "workers", "initializer",
+                             "initargs"])
+Stage.__new__.__defaults__ = (1, None, ())
+
+
+class PipelineError(Exception):
+    """
+    The source or a stage raised an exception, or a worker process died.
+    """
+
+
+class _Failure:
+    """ Passed on in place of the result of an item which failed. """
+
+    def __init__(self, stage, formatted):
+        self.stage = stage
+        self.formatted = formatted
+
+
+def _stage_worker(stage, inbox, outbox):
+    if stage.initializer is not None:
+        stage.initializer(*stage.initargs)
+
+    while True:
+        task = inbox.get()
+        if task is None:
+            return
+
+        index, item = task
+        if not isinstance(item, _Failure):
+            try:
+                item = stage.function(item)
+            except Exception:
+                item = _Failure(stage.name, traceback.format_exc())
+
+        outbox.put((index, item))
+
+
+def _run_in_process(source, stages):
+    for stage in stages:
+        if stage.initializer is not None:
+            with _failure_of(stage.name):
+                stage.initializer(*stage.initargs)
+
+    items = iter(source)
+    while True:
+        with _failure_of("source"):
+            item = next(items, _Failure)
+        if item is _Failure:
+            return
+
+        for stage in stages:
+            with _failure_of(stage.name):
+                item = stage.function(item)
+        yield item
+
+
+@contextmanager
+def _failure_of(name):
+    """ Raise an exception of the source or a stage as a PipelineError. """
+    try:
+        yield
+    except Exception as error:
+        raise PipelineError(f"Stage {name} failed:\n"
+                            f"{traceback.format_exc()}") from error
+
+
+def run_pipeline(source, stages, queue_size=QUEUE_SIZE, max_pending=None):
+    """
+    Yield the result of passing each item of source through the stages, in
+    order.
+
+    At most max_pending items (by default, enough to keep every worker and
+    queue busy) are in the pipeline at once. Raises PipelineError if the
+    source or a stage raises, or if a worker process dies.
+    """
+    if all(stage.workers == 0 for stage in stages):
+        yield from _run_in_process(source, stages)
+        return
+
+    if max_pending is None:
+        max_pending = sum(max(stage.workers, 1) + queue_size
+                          for stage in stages)
+
+    context = multiprocessing.get_context()
+    queues = [context.Queue(queue_size) for _ in stages]
+    # The results of the last stage are read as soon as they arrive.
+    queues.append(context.Queue())
+    workers = [[context.Process(target=_stage_worker,
+                                args=(stage, queues[i], queues[i + 1]),
+                                daemon=True)
+                for _ in range(max(stage.workers, 1))]
+               for i, stage in enumerate(stages)]
+    for stage_workers in workers:
+        for worker in stage_workers:
+            worker.start()
+
+    pending = threading.Semaphore(max_pending)
+    stopping = threading.Event()
+
+    def feed():
+        try:
+            for index, item in enumerate(source):
+                pending.acquire()
+                if stopping.is_set():
+                    return
+                queues[0].put((index, item))
+
+            # Each stage ends once everything before it has ended.
+            for i, stage_workers in enumerate(workers):
+                for _ in stage_workers:
+                    queues[i].put(None)
+                for worker in stage_workers:
+                    worker.join()
+
+            queues[-1].put(None)
+        except Exception:
+            queues[-1].put((None, _Failure("source",
+                                           traceback.format_exc())))
+
+    def check_workers():
+        for stage, stage_workers in zip(stages, workers):
+            for worker in stage_workers:
+                if worker.exitcode:
+                    raise PipelineError(
+                        f"A worker of stage {stage.name} exited with code "
+                        f"{worker.exitcode}.")
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    finished = {}
+    next_index = 0
+    try:
+        while True:
+            try:
+                result = queues[-1].get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                # A worker killed, e.g. for lack of memory, takes its item
+                # with it.
+                check_workers()
+                continue
+
+            if result is None:
+                # Every worker has ended, but one may have died early.
+                check_workers()
+                break
+
+            index, item = result
+            if isinstance(item, _Failure):
+                raise PipelineError(f"Stage {item.stage} failed:\n"
+                                    f"{item.formatted}")
+
+            finished[index] = item
+            while next_index in finished:
+                yield finished.pop(next_index)
+                next_index += 1
+                pending.release()
+    finally:
+        stopping.set()
+        # Let the feeder see that it must stop.
+        pending.release()
+        for stage_workers in workers:
+            for worker in stage_workers:
+                if worker.is_alive():
+                    worker.terminate()
+        # Do not wait at exit for items nobody will read.
+        for stage_queue in queues:
+            stage_queue.cancel_join_thread()
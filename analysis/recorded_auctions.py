@@ -0,0 +1,392 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 13:21:48 2026
+
+Compare the robot's bidding with auctions recorded at the table.
+
+PBN and LIN files are read as a stream of raw records, so memory does not
+grow with the size of the file. Parsing a record, dealing it and bidding it
+happen in worker processes, each of which loads the bidding system once.
+
+The robot bids for North-South over the auction made at the table: the
+recorded calls of East-West are replayed, and the comparison stops at the
+first call of North-South which differs from the recorded one.
+
+Usage:
+    python -m practice_bidding.analysis.recorded_auctions system.xml
+        deals.pbn [processes]
+"""
+
+__author__ = "Andrew I McClement"
+
+from collections import deque, namedtuple
+import multiprocessing
+import os
+import re
+import sys
+
+from practice_bidding.calls import call_code, call_value
+from practice_bidding.redeal.redeal import Deal
+from practice_bidding.robot_bidding import BiddingProgram
+from practice_bidding.xml_parsing.xml_parser import XmlReaderForFile
+
+SEATS = "NESW"
+_RANKS = "AKQJT98765432"
+# Suit order in both PBN and LIN hands, and in redeal's Hand.from_str.
+_SUITS = "SHDC"
+# LIN numbers the dealer from South.
+_LIN_DEALERS = {"1": "S", "2": "W", "3": "N", "4": "E"}
+_LIN_VULNERABILITY = {"o": "None", "0": "None", "n": "NS", "e": "EW",
+                      "b": "All"}
+_PBN_VULNERABILITY = {"none": "None", "love": "None", "-": "None",
+                      "ns": "NS", "ew": "EW", "all": "All", "both": "All"}
+_PBN_TAG = re.compile(r'^\[(\w+)\s+"(.*)"\]\s*$')
+_PBN_COMMENT = re.compile(r"\{[^}]*\}|;.*$")
+_CALL = re.compile(r"^([1-7])(C|D|H|S|NT?)$", re.I)
+
+RecordedBoard = namedtuple("RecordedBoard", ["board", "dealer",
+                                             "vulnerability", "hands",
+                                             "auction"])
+Comparison = namedtuple("Comparison", ["board", "recorded", "robot",
+                                       "divergence"])
+
+
+def normalise_call(call):
+    """
+    Convert a call to the form used by the XML systems ("1n", "P", "X").
+
+    Returns None for annotations which are not calls.
+    """
+    call = call.strip().rstrip("!")
+    upper_call = call.upper()
+    if upper_call in {"P", "PASS"}:
+        return "P"
+    elif upper_call in {"X", "D", "DBL"}:
+        return "X"
+    elif upper_call in {"XX", "R", "RDBL"}:
+        return "XX"
+
+    match = _CALL.match(call)
+    if not match:
+        return None
+
+    return f"{match.group(1)}{match.group(2)[0].lower()}"
+
+
+def _complete_passes(auction):
+    """ Append the passes implied by "all pass". """
+    auction = list(auction)
+    if not any(call != "P" for call in auction):
+        return auction + ["P"] * (4 - len(auction))
+
+    while auction[-3:] != ["P"] * 3:
+        auction.append("P")
+
+    return auction
+
+
+def iter_pbn_records(lines):
+    """ Split the lines of a PBN file into raw records (lists of lines). """
+    record = []
+    for line in lines:
+        line = line.rstrip("\n")
+        if line.startswith("%"):
+            # Escape line.
+            continue
+
+        if not line.strip():
+            if record:
+                yield record
+                record = []
+            continue
+
+        record.append(line)
+
+    if record:
+        yield record
+
+
+def parse_pbn_record(lines) -> RecordedBoard:
+    """ Parse a raw PBN record. Returns None if it has no deal. """
+    tags = {}
+    auction = []
+    in_auction = False
+    for line in lines:
+        match = _PBN_TAG.match(line)
+        if match:
+            tag, value = match.groups()
+            tags[tag] = value
+            in_auction = tag == "Auction"
+            continue
+
+        if not in_auction:
+            continue
+
+        for token in _PBN_COMMENT.sub(" ", line).split():
+            if token.upper() == "AP":
+                auction = _complete_passes(auction)
+                continue
+
+            call = normalise_call(token)
+            if call is not None:
+                auction.append(call)
+
+    try:
+        first_seat, deal = tags["Deal"].split(":")
+    except (KeyError, ValueError):
+        return None
+
+    hands = {}
+    start = SEATS.index(first_seat.upper())
+    for i, hand in enumerate(deal.split()):
+        seat = SEATS[(start + i) % 4]
+        hands[seat] = " ".join(suit or "-" for suit in hand.split("."))
+
+    dealer = tags.get("Dealer", "N").upper()[:1] or "N"
+    vulnerability = _PBN_VULNERABILITY.get(
+        tags.get("Vulnerable", "None").lower(), "None")
+    board = int(tags["Board"]) if tags.get("Board", "").isdigit() else None
+
+    return RecordedBoard(board, dealer, vulnerability, _complete_hands(hands),
+                         tuple(auction))
+
+
+def iter_lin_records(lines):
+    """
+    Split the lines of a LIN file into raw records (lists of (key, value)).
+
+    A new record starts at each "qx" key, or at an "md" key if the current
+    record already has a deal.
+    """
+    record = []
+    has_deal = False
+    for line in lines:
+        tokens = line.strip().split("|")
+        for key, value in zip(tokens[::2], tokens[1::2]):
+            key = key.strip().lower()
+            if (key == "qx" or (key == "md" and has_deal)) and record:
+                yield record
+                record = []
+                has_deal = False
+
+            has_deal = has_deal or key == "md"
+            record.append((key, value))
+
+    if record:
+        yield record
+
+
+def _lin_hand(hand):
+    suits = dict.fromkeys(_SUITS, "")
+    suit = None
+    for character in hand.upper().replace("10", "T"):
+        if character in _SUITS:
+            suit = character
+        elif suit is not None:
+            suits[suit] += character
+
+    return " ".join(suits[suit] or "-" for suit in _SUITS)
+
+
+def parse_lin_record(record) -> RecordedBoard:
+    """ Parse a raw LIN record. Returns None if it has no deal. """
+    values = {}
+    auction = []
+    for key, value in record:
+        if key == "mb":
+            call = normalise_call(value)
+            if call is not None:
+                auction.append(call)
+        else:
+            values.setdefault(key, value)
+
+    try:
+        deal = values["md"]
+        dealer = _LIN_DEALERS[deal[0]]
+    except (KeyError, IndexError):
+        return None
+
+    hands = {}
+    # Hands are listed from South, clockwise. East may be omitted.
+    for seat, hand in zip("SWNE", deal[1:].split(",")):
+        if hand.strip():
+            hands[seat] = _lin_hand(hand)
+
+    match = re.search(r"\d+", values.get("ah", ""))
+    board = int(match.group()) if match else None
+    vulnerability = _LIN_VULNERABILITY.get(values.get("sv", "o").lower(),
+                                           "None")
+    if auction and auction[-3:] != ["P"] * 3:
+        # Claims and incomplete records end without the final passes.
+        auction = _complete_passes(auction)
+
+    return RecordedBoard(board, dealer, vulnerability, _complete_hands(hands),
+                         tuple(auction))
+
+
+def _complete_hands(hands):
+    """ Give any one missing hand the remaining cards. """
+    missing = [seat for seat in SEATS if seat not in hands]
+    if len(missing) == 1:
+        remaining = []
+        for i in range(len(_SUITS)):
+            used = "".join(hand.split()[i] for hand in hands.values())
+            remaining.append("".join(rank for rank in _RANKS
+                                     if rank not in used) or "-")
+
+        hands[missing[0]] = " ".join(remaining)
+
+    return hands
+
+
+def board_number_for(dealer, vulnerability):
+    """
+    The first board number with the given dealer and vulnerability.
+
+    BiddingProgram derives both from the board number, which uses the
+    standard rotation, so every combination occurs once in 16 boards.
+    """
+    vulnerable = {"None": BiddingProgram.Vulnerability.None_,
+                  "NS": BiddingProgram.Vulnerability.Unfavourable,
+                  "EW": BiddingProgram.Vulnerability.Favourable,
+                  "All": BiddingProgram.Vulnerability.All}[vulnerability]
+    for board_number in range(1, 17):
+        if (BiddingProgram.dealer_for(board_number).name[0] == dealer
+                and BiddingProgram.vulnerability_for(board_number)
+                == vulnerable):
+            return board_number
+
+    raise ValueError(dealer, vulnerability)  # pragma: no cover
+
+
+def first_divergence(recorded, robot):
+    """ The index of the first call which differs, or None. """
+    for i, (recorded_call, robot_call) in enumerate(zip(recorded, robot)):
+        if recorded_call != robot_call:
+            return i
+
+    if len(recorded) != len(robot):
+        return min(len(recorded), len(robot))
+
+    return None
+
+
+# Set in each worker process by _load_system.
+_program = None
+
+
+def _load_system(xml_source):
+    global _program
+    _program = BiddingProgram()
+    _program.set_opening_bids(XmlReaderForFile(xml_source)
+                              .get_bids_from_xml())
+    _program.set_mode(BiddingProgram.ProgramMode.Automatic)
+
+
+def _compare(raw_record, parse_record):
+    board = parse_record(raw_record)
+    if board is None or len(board.hands) != 4:
+        return None
+
+    deal = Deal.prepare(dict(board.hands))()
+    board_number = board_number_for(board.dealer, board.vulnerability)
+    _program.set_deal(deal, board_number)
+    # East-West's recorded calls are replayed, so that the robot bids for
+    # North-South over the auction made at the table. The comparison ends
+    # at the first call of North-South which differs.
+    robot = []
+    while not _program.is_passed_out(_program.bidding_sequence):
+        i = len(robot)
+        if _program.auction.seat() % 2 and i < len(board.auction):
+            try:
+                _program.replay_call(board.auction[i])
+            except KeyError:
+                # The recorded auction is not legal.
+                return None
+        else:
+            _program.bid()
+
+        robot.append(call_value(call_code(
+            _program.bidding_sequence[-1].value)))
+        if i >= len(board.auction) or robot[i] != board.auction[i]:
+            break
+
+    robot = tuple(robot)
+    return Comparison(board.board, board.auction, robot,
+                      first_divergence(board.auction, robot))
+
+
+def compare_records(raw_records, parse_record, xml_source, processes=None,
+                    max_pending=None):
+    """
+    Yield a Comparison for each raw record, in order.
+
+    At most max_pending records are held in memory at once. With
+    processes=0 everything runs in this process.
+    """
+    if processes == 0:
+        _load_system(xml_source)
+        for raw_record in raw_records:
+            comparison = _compare(raw_record, parse_record)
+            if comparison is not None:
+                yield comparison
+        return
+
+    processes = processes or os.cpu_count() or 1
+    max_pending = max_pending or 4 * processes
+    with multiprocessing.Pool(processes, _load_system,
+                              (xml_source,)) as pool:
+        # Pool.imap would read the whole input ahead of the workers, so
+        # keep a bounded window of tasks in flight instead.
+        pending = deque()
+        for raw_record in raw_records:
+            pending.append(pool.apply_async(_compare,
+                                            (raw_record, parse_record)))
+            if len(pending) >= max_pending:
+                comparison = pending.popleft().get()
+                if comparison is not None:
+                    yield comparison
+
+        while pending:
+            comparison = pending.popleft().get()
+            if comparison is not None:
+                yield comparison
+
+
+def compare_file(filepath, xml_source, processes=None, max_pending=None):
+    """ Compare the robot with every auction in a PBN or LIN file. """
+    if filepath.lower().endswith(".lin"):
+        iter_records, parse_record = iter_lin_records, parse_lin_record
+    else:
+        iter_records, parse_record = iter_pbn_records, parse_pbn_record
+
+    with open(filepath, encoding="utf-8", errors="replace") as file:
+        yield from compare_records(iter_records(file), parse_record,
+                                   xml_source, processes, max_pending)
+
+
+def main():
+    """ Print where the robot diverges from each recorded auction. """
+    xml_source, filepath = sys.argv[1:3]
+    try:
+        processes = int(sys.argv[3])
+    except IndexError:
+        processes = None
+
+    boards = divergent = 0
+    for comparison in compare_file(filepath, xml_source, processes):
+        boards += 1
+        if comparison.divergence is None:
+            continue
+
+        divergent += 1
+        i = comparison.divergence
+        print(f"Board {comparison.board}: diverges at call {i + 1}. "
+              f"Recorded: {' '.join(comparison.recorded[:i + 1])}. "
+              f"Robot: {' '.join(comparison.robot[:i + 1])}.")
+
+    print(f"{divergent} of {boards} auctions diverged.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 07:12:40 2026
+
+Streaming output of per-board simulation records.
+
+A sink buffers at most chunk_size records, then writes them out, so memory
+stays constant however many boards are run. The file type is chosen from
+the extension (see SINKS):
+    .csv               CSV with a header row.
+    .parquet           Parquet, one row group per chunk.
+    .arrow, .feather   Arrow IPC (Feather v2), one record batch per chunk.
+Parquet and Arrow need pyarrow. Each loads straight into pandas, e.g.
+pandas.read_csv(path) or pandas.read_parquet(path).
+
+Any object with write(record) and close() may be used as a sink. A CSV
+file may also be carried on after an interrupted run (see CsvSink).
+"""
+
+__author__ = "Andrew I McClement"
+
+from collections import namedtuple
+import csv
+import os
+
+# Records buffered before they are written.
+CHUNK_SIZE = 10000
+
+# deal: PBN, e.g. "N:AKQ.JT9.876.5432 ...". auction: calls separated by
+# spaces. contract: as BiddingProgram.get_contract. tricks: double dummy
+# tricks for declarer, None if passed out. score: for North-South. nodes:
+# bid conditions evaluated to bid the board.
+BoardRecord = namedtuple("BoardRecord", ["board", "dealer", "vulnerability",
+                                         "deal", "auction", "contract",
+                                         "tricks", "score", "nodes"])
+FIELDS = BoardRecord._fields
+# Field -> pyarrow type name.
+_ARROW_TYPES = {"board": "int64", "dealer": "string",
+                "vulnerability": "string", "deal": "string",
+                "auction": "string", "contract": "string", "tricks": "int8",
+                "score": "int32", "nodes": "int32"}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Writing Parquet or Arrow files needs pyarrow: "
+                          "pip install pyarrow") from None
+
+    return pyarrow
+
+
+class ResultsSink:
+    """ Base class: buffers records and writes them a chunk at a time. """
+
+    def __init__(self, path, chunk_size=CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.records_written = 0
+        self._chunk = []
+
+    def write(self, record):
+        """ Add a record, writing the chunk out if it is full. """
+        self._chunk.append(record)
+        if len(self._chunk) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """ Write out the buffered records. """
+        if self._chunk:
+            self._write_chunk(self._chunk)
+            self.records_written += len(self._chunk)
+            self._chunk = []
+
+    def _write_chunk(self, records):
+        raise NotImplementedError
+
+    def close(self):
+        """ Write out the buffered records and close the file. """
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class CsvSink(ResultsSink):
+    """
+    Writes records as CSV, with a header row.
+
+    Given resume_size, carries on a file whose first resume_size bytes were
+    written by an earlier sink (see size), discarding anything after them.
+    """
+
+    def __init__(self, path, chunk_size=CHUNK_SIZE, resume_size=None):
+        super().__init__(path, chunk_size)
+        if resume_size is None:
+            self._file = open(path, "w", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(FIELDS)
+        else:
+            os.truncate(path, resume_size)
+            self._file = open(path, "a", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._file)
+
+    def size(self) -> int:
+        """ Write out the buffered records; the size of the file. """
+        self.flush()
+        return os.path.getsize(self.path)
+
+    def _write_chunk(self, records):
+        self._writer.writerows(records)
+        self._file.flush()
+
+    def close(self):
+        super().close()
+        self._file.close()
+
+
+class _ArrowSink(ResultsSink):
+    """ Writes each chunk as a pyarrow table. """
+
+    def __init__(self, path, chunk_size=CHUNK_SIZE):
+        super().__init__(path, chunk_size)
+        self._pa = _pyarrow()
+        self._schema = self._pa.schema(
+            [(name, getattr(self._pa, _ARROW_TYPES[name])())
+             for name in FIELDS])
+        self._writer = self._open_writer()
+
+    def _open_writer(self):
+        raise NotImplementedError
+
+    def _write_chunk(self, records):
+        columns = {name: list(values)
+                   for name, values in zip(FIELDS, zip(*records))}
+        self._writer.write_table(
+            self._pa.Table.from_pydict(columns, schema=self._schema))
+
+    def close(self):
+        super().close()
+        self._writer.close()
+
+
+class ParquetSink(_ArrowSink):
+    """ Writes records to Parquet, one row group per chunk. """
+
+    def _open_writer(self):
+        import pyarrow.parquet
+        return pyarrow.parquet.ParquetWriter(self.path, self._schema)
+
+
+class ArrowSink(_ArrowSink):
+    """ Writes records to an Arrow IPC (Feather v2) file. """
+
+    def _open_writer(self):
+        import pyarrow.ipc
+        return pyarrow.ipc.new_file(self.path, self._schema)
+
+
+# Extension -> sink class.
+SINKS = {".csv": CsvSink, ".parquet": ParquetSink, ".arrow": ArrowSink,
+         ".feather": ArrowSink}
+
+
+def open_sink(path, chunk_size=CHUNK_SIZE) -> ResultsSink:
+    """ A sink for the file type given by the extension of path. """
+    extension = os.path.splitext(path)[1].lower()
+    try:
+        sink_class = SINKS[extension]
+    except KeyError:
+        raise ValueError(f"No sink for {extension} files; expected one of "
+                         f"{', '.join(SINKS)}.") from None
+
+    return sink_class(path, chunk_size)
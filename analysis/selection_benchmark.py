@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 06:42:18 2026
+
+How much work does priority selection save over random selection?
+
+The same boards are bid automatically in each selection mode (see
+BiddingProgram.SelectionMode), counting the bid conditions evaluated each
+time the program chooses a bid.
+
+Usage:
+    python -m practice_bidding.analysis.selection_benchmark system.xml
+        [boards]
+"""
+
+__author__ = "Andrew I McClement"
+
+from collections import namedtuple
+import sys
+import time
+
+from practice_bidding.analysis.bid_map import CountingBidMapper
+from practice_bidding.analysis.checkpoint import seeded_random
+from practice_bidding.redeal.redeal import Deal
+from practice_bidding.robot_bidding import BiddingProgram
+from practice_bidding.xml_parsing.xml_parser import XmlReaderForFile
+
+SelectionResult = namedtuple("SelectionResult", ["selection", "choices",
+                                                 "evaluations", "seconds"])
+
+
+def measure_selection(opening_bids, boards=1000, seed=0):
+    """
+    Bid the same boards in each selection mode. Returns a SelectionResult
+    for each mode.
+    """
+    with seeded_random(seed):
+        deals = [Deal.prepare({})() for _ in range(boards)]
+
+    results = []
+    for selection in BiddingProgram.SelectionMode:
+        with seeded_random(seed):
+            results.append(_bid_boards(opening_bids, deals, selection))
+
+    return results
+
+
+def _bid_boards(opening_bids, deals, selection):
+    program = BiddingProgram()
+    program.set_opening_bids(opening_bids)
+    program.set_mode(BiddingProgram.ProgramMode.Automatic)
+    program.set_selection(selection)
+    mapper = CountingBidMapper()
+    program.set_bid_mapper(mapper)
+    choices = 0
+    start = time.perf_counter()
+    for board, deal in enumerate(deals, 1):
+        program.set_deal(deal, board)
+        while not program.is_passed_out(program.bidding_sequence):
+            if program.potential_bids:
+                choices += 1
+            program.bid()
+
+    return SelectionResult(selection, choices, mapper.evaluations,
+                           time.perf_counter() - start)
+
+
+def main():
+    """ Print the evaluations per choice of bid in each selection mode. """
+    boards = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    opening_bids = XmlReaderForFile(sys.argv[1]).get_bids_from_xml()
+    for result in measure_selection(opening_bids, boards):
+        print(f"{result.selection.name}: "
+              f"{result.evaluations / max(result.choices, 1):.2f} "
+              f"evaluations per choice, "
+              f"{1000 * result.seconds / boards:.3f} ms per board.")
+
+
+if __name__ == "__main__":
+    main()
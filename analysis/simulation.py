@@ -0,0 +1,394 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 07:26:53 2026
+
+Batch simulation: bid many boards with a system and record each of them.
+
+Each board gives a BoardRecord (see results_sink.py): the deal, the
+auction, the contract, its double dummy tricks and score and the number of
+bid conditions evaluated. Records are streamed to a sink as boards
+complete, so memory does not grow with the number of boards.
+
+Boards are simulated in shards of consecutive boards, which pass through a
+pipeline of stages (see pipeline.py):
+    deal -> auction -> dd -> score
+each with its own worker processes. Double dummy solving is far slower than
+the rest, so by default it gets most of the processes (see stage_workers).
+Each stage fills in more of the shard's records. With a seed, shard k is
+dealt, and bid, from its own random substreams, so the results do not
+depend on the number of processes.
+
+Usage:
+    python -m practice_bidding.analysis.simulation system.xml boards
+        output.csv [corpus] [processes] [east_west.xml]
+The output may be .csv, .parquet or .arrow (see results_sink.py). A .csv
+output is checkpointed (see checkpoint.py): if the run is stopped, run it
+again with the same arguments to carry on.
+"""
+
+__author__ = "Andrew I McClement"
+
+import os
+import sys
+
+from practice_bidding.analysis.bid_map import CountingBidMapper
+from practice_bidding.analysis.checkpoint import Checkpoint, seeded_random
+from practice_bidding.analysis.dd_corpus import board_deal, load_corpus
+from practice_bidding.analysis.pipeline import Stage, run_pipeline
+from practice_bidding.analysis.results_sink import BoardRecord, CsvSink
+from practice_bidding.analysis.results_sink import open_sink
+from practice_bidding.calls import call_code, call_value
+from practice_bidding.redeal.redeal import Deal
+from practice_bidding.robot_bidding import BiddingProgram
+from practice_bidding.scoring import contract_score, parse_contract
+from practice_bidding.suit_tables import hand_masks
+from practice_bidding.xml_parsing.binary_system import load_opening_bids
+
+# Boards per task.
+SHARD_SIZE = 256
+# Shards between checkpoints.
+CHECKPOINT_EVERY = 16
+STAGES = ("deal", "auction", "dd", "score")
+_RANKS = "AKQJT98765432"
+_SEATS = "NESW"
+_VULNERABILITY_NAMES = {BiddingProgram.Vulnerability.None_: "None",
+                        BiddingProgram.Vulnerability.Unfavourable: "NS",
+                        BiddingProgram.Vulnerability.Favourable: "EW",
+                        BiddingProgram.Vulnerability.All: "All"}
+
+# Set in each worker process by the initializer of its stage.
+_program = None
+_mapper = None
+_corpus = None
+
+
+def deal_pbn(deal) -> str:
+    """ A deal in PBN form, e.g. "N:AKQ.JT9.876.5432 ...". """
+    return "N:" + " ".join(
+        ".".join("".join(rank for i, rank in enumerate(_RANKS)
+                         if mask >> (12 - i) & 1)
+                 for mask in hand_masks(hand))
+        for hand in deal)
+
+
+def pbn_deal(pbn):
+    """ The Deal given by deal_pbn. """
+    return Deal.prepare({
+        seat: " ".join(suit or "-" for suit in hand.split("."))
+        for seat, hand in zip(_SEATS, pbn[2:].split())})()
+
+
+def vulnerability_name(board) -> str:
+    """ The vulnerability of a board in PBN form: None, NS, EW or All. """
+    return _VULNERABILITY_NAMES[BiddingProgram.vulnerability_for(board)]
+
+
+def stage_workers(processes):
+    """
+    Processes for each stage: one each to deal and score, a quarter of the
+    rest to bid and the others to solve double dummy.
+    """
+    auction = max(1, (processes - 2) // 4)
+    return {"deal": 1, "auction": auction,
+            "dd": max(1, processes - 2 - auction), "score": 1}
+
+
+def _substream(seed, shard, stage):
+    """
+    The random substream of a stage of a shard. The same seed deals, and
+    bids, the same shard in any process. Without a seed, every shard is
+    seeded afresh, so that forked workers differ.
+    """
+    return seeded_random(None if seed is None
+                         else f"{seed}:{shard}:{stage}")
+
+
+def _load_corpus(corpus_path):
+    global _corpus
+    _corpus = None if corpus_path is None else load_corpus(corpus_path)
+
+
+def _load_system(xml_source, east_west_source):
+    global _program, _mapper
+    opening_bids = load_opening_bids(xml_source)
+    if east_west_source is None:
+        east_west_bids = None
+    elif east_west_source == xml_source:
+        east_west_bids = opening_bids
+    else:
+        east_west_bids = load_opening_bids(east_west_source)
+
+    _program = BiddingProgram()
+    _program.set_opening_bids(opening_bids)
+    _program.set_east_west_bids(east_west_bids)
+    _program.set_mode(BiddingProgram.ProgramMode.Automatic)
+    _mapper = CountingBidMapper()
+    _program.set_bid_mapper(_mapper)
+
+
+def shard_boards(shard, boards, shard_size=SHARD_SIZE):
+    """ The boards (counting from 1) of a shard (counting from 0). """
+    return range(shard * shard_size + 1,
+                 min((shard + 1) * shard_size, boards) + 1)
+
+
+def shard_count(boards, shard_size=SHARD_SIZE):
+    """ The number of shards of a simulation. """
+    return -(-boards // shard_size)
+
+
+def _deal_shard(task):
+    shard, boards, shard_size, seed = task
+    records = []
+    with _substream(seed, shard, "deal"):
+        for board in shard_boards(shard, boards, shard_size):
+            if _corpus is None:
+                deal = Deal.prepare({})()
+            else:
+                deal = board_deal(_corpus, board)
+            records.append(BoardRecord(
+                board, BiddingProgram.dealer_for(board).name[0],
+                vulnerability_name(board), deal_pbn(deal), None, None,
+                None, None, None))
+
+    return shard, seed, records
+
+
+def _bid_shard(item):
+    shard, seed, records = item
+    with _substream(seed, shard, "auction"):
+        for i, record in enumerate(records):
+            _program.set_deal(pbn_deal(record.deal), record.board)
+            evaluations = _mapper.evaluations
+            while not _program.is_passed_out(_program.bidding_sequence):
+                _program.bid()
+
+            auction = " ".join(call_value(call_code(bid.value))
+                               for bid in _program.bidding_sequence)
+            records[i] = record._replace(
+                auction=auction, contract=_program.get_contract(),
+                nodes=_mapper.evaluations - evaluations)
+
+    return item
+
+
+def _solve_shard(item):
+    records = item[2]
+    for i, record in enumerate(records):
+        if record.contract == "P":
+            continue
+
+        level, strain, _, declarer = parse_contract(record.contract)
+        if _corpus is None:
+            deal = pbn_deal(record.deal)
+        else:
+            # Read from the corpus's double dummy tables where solved.
+            deal = board_deal(_corpus, record.board)
+        records[i] = record._replace(
+            tricks=deal.dd_tricks(f"{level}{strain}{declarer}"))
+
+    return item
+
+
+def _score_shard(item):
+    records = item[2]
+    for i, record in enumerate(records):
+        score = 0
+        if record.contract != "P":
+            level, strain, doubled, declarer = parse_contract(
+                record.contract)
+            side = "NS" if declarer in "NS" else "EW"
+            score = contract_score(
+                level, strain, record.tricks,
+                record.vulnerability in {"All", side}, doubled)
+            if side == "EW":
+                score = -score
+        records[i] = record._replace(score=score)
+
+    return records
+
+
+def load_simulation(xml_source, corpus_path=None, east_west_source=None):
+    """ Load everything needed by simulate_shard in this process. """
+    _load_corpus(corpus_path)
+    _load_system(xml_source, east_west_source)
+
+
+def simulate_shard(shard, boards, shard_size=SHARD_SIZE, seed=None):
+    """
+    The BoardRecords of a shard, simulated in this process (see
+    load_simulation). The same as the records simulate gives for it.
+    """
+    item = _deal_shard((shard, boards, shard_size, seed))
+    return _score_shard(_solve_shard(_bid_shard(item)))
+
+
+def simulation_stages(xml_source, corpus_path=None, east_west_source=None,
+                      workers=None):
+    """
+    The pipeline stages of a simulation. workers maps each stage name in
+    STAGES to its number of processes; by default everything runs in this
+    process.
+    """
+    workers = workers or dict.fromkeys(STAGES, 0)
+    return [Stage("deal", _deal_shard, workers["deal"], _load_corpus,
+                  (corpus_path,)),
+            Stage("auction", _bid_shard, workers["auction"], _load_system,
+                  (xml_source, east_west_source)),
+            Stage("dd", _solve_shard, workers["dd"], _load_corpus,
+                  (corpus_path,)),
+            Stage("score", _score_shard, workers["score"])]
+
+
+def simulate(xml_source, boards, corpus_path=None, east_west_source=None,
+             processes=None, shard_size=SHARD_SIZE, seed=None,
+             max_pending=None, workers=None, start_shard=0):
+    """
+    Yield a BoardRecord for each of boards 1 to boards, in order, starting
+    from the first board of start_shard.
+
+    Deals are random, or taken in order from a corpus if corpus_path is
+    given. East-West pass unless east_west_source gives their system.
+    processes are shared between the stages by stage_workers, unless
+    workers gives the processes for each stage. At most max_pending shards
+    are in the pipeline at once. With processes=0 everything runs in this
+    process.
+    """
+    if workers is None and processes != 0:
+        workers = stage_workers(processes or os.cpu_count() or 1)
+
+    stages = simulation_stages(xml_source, corpus_path, east_west_source,
+                               workers)
+    tasks = ((shard, boards, shard_size, seed)
+             for shard in range(start_shard, shard_count(boards, shard_size)))
+    for records in run_pipeline(tasks, stages, max_pending=max_pending):
+        yield from records
+
+
+class SimulationTotals:
+    """ Running totals of the records of a simulation. """
+
+    __slots__ = ("boards", "passed_out", "score", "nodes")
+
+    def __init__(self, boards=0, passed_out=0, score=0, nodes=0):
+        self.boards = boards
+        self.passed_out = passed_out
+        # For North-South.
+        self.score = score
+        self.nodes = nodes
+
+    def add(self, record):
+        """ Count a BoardRecord. """
+        self.boards += 1
+        self.passed_out += record.contract == "P"
+        self.score += record.score
+        self.nodes += record.nodes
+
+    def merge(self, other):
+        """ Add the totals of another SimulationTotals. """
+        for name in self.__slots__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def as_dict(self):
+        """ The totals, as a dictionary of the constructor's arguments. """
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def checkpoint_path_for(output_path):
+    """ The checkpoint path used by main for an output. """
+    return output_path + ".checkpoint"
+
+
+def _checkpoint_arguments(xml_source, boards, output_path, kwargs):
+    arguments = {"xml_source": xml_source, "boards": boards,
+                 "output_path": output_path}
+    for name in ("corpus_path", "east_west_source", "shard_size"):
+        arguments[name] = kwargs.get(name)
+
+    return arguments
+
+
+def run_simulation(xml_source, boards, output_path, checkpoint_path=None,
+                   checkpoint_every=CHECKPOINT_EVERY, totals=None,
+                   **kwargs) -> int:
+    """
+    Simulate boards (see simulate) into a file, returning the number of
+    records written. If totals (a SimulationTotals) is given, each record
+    is added to it.
+
+    Given checkpoint_path, progress is saved there every checkpoint_every
+    shards, and a run with the same arguments carries on from the last
+    checkpoint, writing the same file as a run which was never stopped.
+    This needs a CSV output. The checkpoint is removed once the run is
+    complete.
+    """
+    totals = totals if totals is not None else SimulationTotals()
+    if checkpoint_path is None:
+        with open_sink(output_path) as sink:
+            for record in simulate(xml_source, boards, **kwargs):
+                sink.write(record)
+                totals.add(record)
+
+        return sink.records_written
+
+    if not output_path.lower().endswith(".csv"):
+        raise ValueError("Only a .csv output may be checkpointed.")
+
+    checkpoint = Checkpoint.resume(
+        checkpoint_path,
+        _checkpoint_arguments(xml_source, boards, output_path, kwargs),
+        kwargs.pop("seed", None))
+    shard_size = kwargs.get("shard_size", SHARD_SIZE)
+    if checkpoint.shards:
+        sink = CsvSink(output_path,
+                       resume_size=checkpoint.state["output_size"])
+        for name, value in checkpoint.state["totals"].items():
+            setattr(totals, name, value)
+        sink.records_written = totals.boards
+    else:
+        sink = CsvSink(output_path)
+
+    shards = checkpoint.shards
+    with sink:
+        for record in simulate(xml_source, boards, seed=checkpoint.seed,
+                               start_shard=shards, **kwargs):
+            sink.write(record)
+            totals.add(record)
+            if record.board == shard_boards(shards, boards,
+                                            shard_size)[-1]:
+                shards += 1
+                if shards % checkpoint_every == 0:
+                    checkpoint.save(shards, output_size=sink.size(),
+                                    totals=totals.as_dict())
+
+    checkpoint.remove()
+    return sink.records_written
+
+
+def main():
+    """ Simulate the boards given on the command line into a file. """
+    xml_source, boards, output_path = sys.argv[1:4]
+    kwargs = {}
+    for argument in sys.argv[4:]:
+        if argument.lower().endswith(".xml"):
+            kwargs["east_west_source"] = argument
+        elif argument.isdigit():
+            kwargs["processes"] = int(argument)
+        else:
+            kwargs["corpus_path"] = argument
+
+    if output_path.lower().endswith(".csv"):
+        kwargs["checkpoint_path"] = checkpoint_path_for(output_path)
+
+    totals = SimulationTotals()
+    written = run_simulation(xml_source, int(boards), output_path,
+                             totals=totals, **kwargs)
+    print(f"{written} boards written to {output_path}: "
+          f"{totals.passed_out} passed out, mean score "
+          f"{totals.score / max(totals.boards, 1):+.1f} to North-South, "
+          f"{totals.nodes / max(totals.boards, 1):.1f} conditions "
+          f"evaluated per board.")
+
+
+if __name__ == "__main__":
+    main()
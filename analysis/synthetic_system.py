@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 11:05:52 2026
+
+Synthetic bidding systems, of any size, for scaling tests.
+
+write_system writes a valid XML system of a given number of bids (up to
+millions), with a maximum depth and fan-out. The tree is filled level by
+level: each bid has up to fan_out children, the next fan_out bids above it,
+until there are enough bids. Each bid has a condition drawn from a mix of
+condition types (see CONDITION_TYPES), taken from a limited pool so that
+they repeat as in a real system. The same arguments always give the same
+file.
+
+measure_scaling reads systems of several sizes and measures how the time
+to read them, the memory they take and the time for the robot to choose a
+bid grow with the number of bids. Per bid figures which grow with the size
+show super-linear behaviour.
+
+Usage:
+    python -m practice_bidding.analysis.synthetic_system system.xml bids
+        [depth] [fan_out]
+    python -m practice_bidding.analysis.synthetic_system measure
+        bids [bids...]
+"""
+
+__author__ = "Andrew I McClement"
+
+from array import array
+from collections import namedtuple
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from practice_bidding.analysis.checkpoint import seeded_random
+from practice_bidding.calls import call_value, CALLS, FIRST_BID
+from practice_bidding.redeal.redeal import Deal
+from practice_bidding.robot_bidding import BiddingProgram
+from practice_bidding.xml_parsing.xml_parser import XmlReaderForFile
+
+# evaluation: an <evaluation> range of hcp, points or tricks.
+# general: a balanced or unbalanced <shape>.
+# shape: a <shape type="shape"> pattern, e.g. x5xx or (4432).
+# formula: a <formula> element, e.g. "hearts + spades >= 9".
+# legacy: include and exclude <condition> elements instead of <and>.
+CONDITION_TYPES = ("evaluation", "general", "shape", "formula", "legacy")
+DEFAULT_MIX = {"evaluation": 4, "general": 1, "shape": 2, "formula": 2,
+               "legacy": 1}
+# Distinct conditions in a system.
+POOL_SIZE = 200
+_SUITS = ("spades", "hearts", "diamonds", "clubs")
+
+ScalingResult = namedtuple("ScalingResult", ["bids", "read_seconds",
+                                             "memory", "bid_seconds"])
+
+
+def _evaluation(rng):
+    method, top, width = rng.choice((("hcp", 30, 7), ("points", 32, 7),
+                                     ("tricks", 10, 3)))
+    minimum = rng.randrange(top)
+    maximum = minimum + rng.randrange(1, width)
+    return (f"<evaluation><{method}><min>{minimum}</min><max>{maximum}</max>"
+            f"</{method}></evaluation>")
+
+
+def _general(rng):
+    general = rng.choice(("balanced", "unbalanced"))
+    return f'<shape type="general">{general}</shape>'
+
+
+def _shape(rng):
+    if rng.random() < 0.25:
+        pattern = rng.choice(("(4333)", "(4432)", "(5332)", "(5431)",
+                              "(4441)", "(5422)"))
+    else:
+        pattern = ["x"] * 4
+        pattern[rng.randrange(4)] = str(rng.randrange(4, 8))
+        pattern = "".join(pattern)
+    return f'<shape type="shape">{pattern}</shape>'
+
+
+def _formula(rng):
+    first, second = rng.sample(_SUITS, 2)
+    text = rng.choice((f"{first} + {second} &gt;= {rng.randrange(7, 11)}",
+                       f"{first} &gt; {second}",
+                       f"hcp + 2 * {first} &gt;= {rng.randrange(12, 26)}",
+                       f"({first} - {second}) * 2 &lt; "
+                       f"{rng.randrange(1, 6)} or hcp &gt;= 20"))
+    return f"<formula>{text}</formula>"
+
+
+_LEAVES = {"evaluation": _evaluation, "general": _general, "shape": _shape,
+           "formula": _formula}
+
+
+def _condition(rng, mix):
+    types = list(mix)
+    weights = [mix[type_] for type_ in types]
+    type_ = rng.choices(types, weights)[0]
+    if type_ == "legacy":
+        include = _evaluation(rng) + _general(rng)
+        exclude = _shape(rng)
+        return (f'<condition type="include">{include}</condition>'
+                f'<condition type="exclude">{exclude}</condition>')
+
+    leaves = [_LEAVES[type_](rng)]
+    if type_ != "evaluation" and rng.random() < 0.5:
+        leaves.append(_evaluation(rng))
+    return f"<and>{''.join(leaves)}</and>"
+
+
+def system_tree(bids, depth, fan_out):
+    """
+    The shape of a synthetic system, level by level: for each bid in order,
+    its call code, the index of its first child and its number of children.
+    The first entries are the opening bids.
+    """
+    codes = array("B")
+    first_children = array("i")
+    child_counts = array("i")
+    level = range(FIRST_BID, min(FIRST_BID + fan_out, len(CALLS)))
+    codes.extend(level[:bids])
+    level_start = 0
+    for _ in range(depth - 1):
+        level_end = len(codes)
+        for i in range(level_start, level_end):
+            first_children.append(len(codes))
+            children = range(codes[i] + 1,
+                             min(codes[i] + 1 + fan_out, len(CALLS)))
+            children = children[:bids - len(codes)]
+            codes.extend(children)
+            child_counts.append(len(children))
+        level_start = level_end
+
+    # The last level has no children.
+    missing = len(codes) - len(child_counts)
+    first_children.extend([len(codes)] * missing)
+    child_counts.extend([0] * missing)
+    return codes, first_children, child_counts
+
+
+def write_system(filepath, bids=1000, depth=8, fan_out=4, mix=None, seed=0,
+                 pool_size=POOL_SIZE) -> int:
+    """
+    Write a synthetic system (see above) with at most the given number of
+    bids. mix maps each of CONDITION_TYPES to its weight, by default
+    DEFAULT_MIX. Returns the number of bids written.
+    """
+    mix = DEFAULT_MIX if mix is None else mix
+    rng = random.Random(seed)
+    pool = [_condition(rng, mix) for _ in range(pool_size)]
+    codes, first_children, child_counts = system_tree(bids, depth, fan_out)
+    openings = min(fan_out, len(CALLS) - FIRST_BID, len(codes))
+    with open(filepath, "w", encoding="utf-8") as file:
+        file.write("<?xml version='1.0' encoding='utf-8'?>\n"
+                   '<openingBids hcp="standard" shape="standard">\n')
+        # (bid index, depth), or (-1, depth) to close a bid.
+        stack = [(i, 0) for i in reversed(range(openings))]
+        while stack:
+            i, level = stack.pop()
+            indent = "  " * level
+            if i < 0:
+                file.write(f"{indent}</bid>\n")
+                continue
+
+            file.write(f'{indent}<bid id="{i}"><value>'
+                       f"{call_value(codes[i])}</value><desc>Synthetic "
+                       f"{i}</desc>{rng.choice(pool)}\n")
+            stack.append((-1, level))
+            start = first_children[i]
+            stack.extend((child, level + 1) for child in reversed(
+                range(start, start + child_counts[i])))
+
+        file.write("</openingBids>\n")
+
+    return len(codes)
+
+
+def measure_scaling(sizes, depth=8, fan_out=4, deals=200, seed=0):
+    """
+    Write and read a synthetic system of each size, returning a
+    ScalingResult for each: the seconds to read it, the bytes it occupies
+    and the mean seconds the robot takes to choose a bid.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "system.xml")
+        for size in sizes:
+            bids = write_system(path, size, depth, fan_out, seed=seed)
+            gc.collect()
+            start = time.perf_counter()
+            XmlReaderForFile(path).get_bids_from_xml()
+            read_seconds = time.perf_counter() - start
+
+            gc.collect()
+            tracemalloc.start()
+            opening_bids = XmlReaderForFile(path).get_bids_from_xml()
+            gc.collect()
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+
+            with seeded_random(seed):
+                boards = [Deal.prepare({})() for _ in range(deals)]
+                program = BiddingProgram()
+                program.set_opening_bids(opening_bids)
+                program.set_mode(BiddingProgram.ProgramMode.Automatic)
+                calls = 0
+                # Only the bidding is timed, not the dealing.
+                start = time.perf_counter()
+                for board, deal in enumerate(boards, 1):
+                    program.set_deal(deal, board)
+                    while not program.is_passed_out(
+                            program.bidding_sequence):
+                        program.bid()
+                        calls += 1
+
+                bid_seconds = time.perf_counter() - start
+
+            results.append(ScalingResult(bids, read_seconds, memory,
+                                         bid_seconds / max(calls, 1)))
+
+    return results
+
+
+def main():
+    """ Write a synthetic system, or measure scaling, as given. """
+    if sys.argv[1] == "measure":
+        for result in measure_scaling([int(size) for size in sys.argv[2:]]):
+            print(f"{result.bids} bids: read "
+                  f"{1e6 * result.read_seconds / result.bids:.1f} us and "
+                  f"{result.memory / result.bids:.0f} bytes per bid, "
+                  f"{1e6 * result.bid_seconds:.1f} us per call.")
+        return
+
+    filepath, bids = sys.argv[1:3]
+    shape = [int(argument) for argument in sys.argv[3:5]]
+    written = write_system(filepath, int(bids), *shape)
+    print(f"{written} bids written to {filepath}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 03:52:17 2026
+
+Simulated team matches between two bidding systems.
+
+Each board is bid by the robot with both systems, in automatic mode, and
+each contract is scored double dummy with the vulnerability of the board.
+The difference is converted to IMPs for the first system.
+
+In a competitive match the opponents bid too: system A sits North-South
+against system B at the first table, and the other way round at the second.
+
+Boards are shared between worker processes, each of which loads both
+systems once. The double dummy tricks of a deal are solved at most once
+per strain and declarer, and shared by the two tables; deals from a corpus
+with a double dummy sidecar (see dd_corpus.py) are not solved at all.
+
+Usage:
+    python -m practice_bidding.analysis.team_match system_a.xml
+        system_b.xml boards [corpus] [processes] [competitive]
+"""
+
+__author__ = "Andrew I McClement"
+
+from collections import namedtuple
+import math
+import multiprocessing
+from statistics import mean, stdev
+import sys
+
+from practice_bidding.analysis.bid_map import BidMapper
+from practice_bidding.analysis.checkpoint import seeded_random
+from practice_bidding.analysis.dd_corpus import board_deal, load_corpus
+from practice_bidding.redeal.redeal import Deal
+from practice_bidding.robot_bidding import BiddingProgram
+from practice_bidding.scoring import contract_score, imps, parse_contract
+from practice_bidding.xml_parsing.xml_parser import XmlReaderForFile
+
+# Boards per task.
+CHUNK_SIZE = 16
+
+BoardResult = namedtuple("BoardResult", ["board", "contracts", "scores",
+                                         "imps"])
+
+# Set in each worker process by _load_systems.
+_programs = None
+_corpus = None
+
+
+def _load_program(opening_bids, east_west_bids, bid_mapper):
+    program = BiddingProgram()
+    program.set_opening_bids(opening_bids)
+    program.set_east_west_bids(east_west_bids)
+    program.set_bid_mapper(bid_mapper)
+    program.set_mode(BiddingProgram.ProgramMode.Automatic)
+    return program
+
+
+def _load_systems(xml_sources, corpus_path, competitive=False):
+    global _programs, _corpus
+    systems = [XmlReaderForFile(xml_source).get_bids_from_xml()
+               for xml_source in xml_sources]
+    # Both tables bid the same deal, so share the features of its hands.
+    bid_mapper = BidMapper({})
+    _programs = [_load_program(opening_bids,
+                               systems[1 - i] if competitive else None,
+                               bid_mapper)
+                 for i, opening_bids in enumerate(systems)]
+    _corpus = None if corpus_path is None else load_corpus(corpus_path)
+
+
+def _deal(board):
+    if _corpus is None:
+        return Deal.prepare({})()
+
+    return board_deal(_corpus, board)
+
+
+def _ns_score(deal, contract, vulnerable, tricks):
+    """
+    The double dummy score for North-South of a contract such as "4HS".
+
+    tricks caches the tricks of each strain and declarer of the deal.
+    """
+    if contract == "P":
+        return 0
+
+    level, strain, doubled, declarer = parse_contract(contract)
+    try:
+        declarer_tricks = tricks[strain, declarer]
+    except KeyError:
+        declarer_tricks = tricks[strain, declarer] = deal.dd_tricks(
+            f"1{strain}{declarer}")
+
+    score = contract_score(level, strain, declarer_tricks,
+                           vulnerable(declarer), doubled)
+    return score if declarer in "NS" else -score
+
+
+def _play_boards(boards, seed):
+    # The same seed deals, and bids, the same boards in any process.
+    # Without one, each chunk is seeded afresh so that forked workers
+    # differ.
+    with seeded_random(None if seed is None else f"{seed}:{boards[0]}"):
+        results = []
+        for board in boards:
+            deal = _deal(board)
+            tricks = {}
+            contracts = []
+            scores = []
+            for program in _programs:
+                program.set_deal(deal, board)
+                while not program.is_passed_out(program.bidding_sequence):
+                    program.bid()
+
+                contract = program.get_contract()
+                contracts.append(contract)
+                scores.append(_ns_score(deal, contract, program.is_vulnerable,
+                                        tricks))
+
+            results.append(BoardResult(board, tuple(contracts), tuple(scores),
+                                       imps(scores[0] - scores[1])))
+
+    return results
+
+
+def _play_board_chunk(arguments):
+    return _play_boards(*arguments)
+
+
+def play_match(xml_source_a, xml_source_b, boards, corpus_path=None,
+               processes=None, chunk_size=CHUNK_SIZE, seed=None,
+               competitive=False):
+    """
+    Yield a BoardResult for each of boards 1 to boards, in order. IMPs are
+    won by system A.
+
+    Deals are random, or taken in order from a corpus if corpus_path is
+    given. With processes=0 everything runs in this process. If competitive,
+    each system bids against the other rather than against silent
+    opponents.
+    """
+    xml_sources = (xml_source_a, xml_source_b)
+    chunks = [list(range(start, min(start + chunk_size, boards + 1)))
+              for start in range(1, boards + 1, chunk_size)]
+    if processes == 0:
+        _load_systems(xml_sources, corpus_path, competitive)
+        for chunk in chunks:
+            yield from _play_boards(chunk, seed)
+        return
+
+    with multiprocessing.Pool(processes, _load_systems,
+                              (xml_sources, corpus_path,
+                               competitive)) as pool:
+        for results in pool.imap(_play_board_chunk,
+                                 [(chunk, seed) for chunk in chunks]):
+            yield from results
+
+
+def normal_quantile(p) -> float:
+    """ The p quantile of the standard normal distribution. """
+    # statistics.NormalDist needs Python 3.8, so bisect the CDF instead.
+    low, high = -40.0, 40.0
+    for _ in range(100):
+        middle = (low + high) / 2
+        if (1 + math.erf(middle / math.sqrt(2))) / 2 < p:
+            low = middle
+        else:
+            high = middle
+
+    return (low + high) / 2
+
+
+class MatchResult:
+    """ The IMPs of a match, for system A. """
+
+    def __init__(self, board_results):
+        self.boards = list(board_results)
+        self.imps = [result.imps for result in self.boards]
+
+    @property
+    def total(self):
+        return sum(self.imps)
+
+    @property
+    def mean(self):
+        """ IMPs per board. """
+        return mean(self.imps)
+
+    def confidence_interval(self, confidence=0.95):
+        """
+        The normal approximation confidence interval of the IMPs per board.
+        """
+        if len(self.imps) < 2:
+            return -math.inf, math.inf
+
+        z = normal_quantile((1 + confidence) / 2)
+        half_width = z * stdev(self.imps) / math.sqrt(len(self.imps))
+        return self.mean - half_width, self.mean + half_width
+
+    def __str__(self):
+        low, high = self.confidence_interval()
+        return (f"{self.total:+d} IMPs over {len(self.boards)} boards: "
+                f"{self.mean:+.2f} per board (95% interval {low:+.2f} to "
+                f"{high:+.2f}).")
+
+
+def main():
+    """ Print the result of a match between two systems. """
+    arguments = sys.argv[1:]
+    competitive = "competitive" in arguments
+    if competitive:
+        arguments.remove("competitive")
+
+    xml_source_a, xml_source_b, boards = arguments[:3]
+    corpus_path = arguments[3] if len(arguments) > 3 else None
+    try:
+        processes = int(arguments[4])
+    except IndexError:
+        processes = None
+
+    print(MatchResult(play_match(xml_source_a, xml_source_b, int(boards),
+                                 corpus_path, processes,
+                                 competitive=competitive)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 05:58:24 2026
+
+Auctions as sequences of call codes (see calls.py).
+
+An Auction updates its state as each call is made: the last bid and who
+made it, whether it has been doubled or redoubled, the passes since the
+last other call and the first player of each side to bid each strain.
+Checking whether a call is legal, whether the auction is over and what the
+contract is are then O(1).
+
+A completed auction is self-delimiting, so auctions pack into a byte
+string of the dealer and one byte per call (see pack_auctions).
+"""
+
+__author__ = "Andrew I McClement"
+
+from practice_bidding.calls import (CALLS, DOUBLE, FIRST_BID, PASS, REDOUBLE,
+                                    STRAINS, call_code, call_value, level,
+                                    strain)
+
+SEATS = "NESW"
+_SIDES = 2
+
+
+class Auction:
+    """
+    The calls of one board, from the dealer onwards.
+
+    Seats and sides are numbered from North (see SEATS); the positions of
+    calls are numbered from 0 for the dealer's first call.
+    """
+
+    __slots__ = ("dealer", "calls", "_last_bid", "_last_bidder", "_doubled",
+                 "_passes", "_first_bidders")
+
+    def __init__(self, dealer=0, calls=()):
+        self.dealer = dealer
+        self.calls = bytearray()
+        # PASS until something is bid.
+        self._last_bid = PASS
+        # The position of the last bid.
+        self._last_bidder = None
+        # 0, 1 or 2 for undoubled, doubled and redoubled.
+        self._doubled = 0
+        self._passes = 0
+        # side * len(STRAINS) + strain -> the position of the first bid of
+        # the strain by the side, or None.
+        self._first_bidders = [None] * (_SIDES * len(STRAINS))
+        for code in calls:
+            self.add(code)
+
+    @classmethod
+    def from_values(cls, values, dealer=0):
+        """ An auction from calls such as "1c", "P" and "X". """
+        return cls(dealer, (call_code(value) for value in values))
+
+    def __len__(self):
+        return len(self.calls)
+
+    def __eq__(self, other):
+        return (isinstance(other, Auction) and self.dealer == other.dealer
+                and self.calls == other.calls)
+
+    def __repr__(self):
+        values = " ".join(call_value(code) for code in self.calls)
+        return f"Auction({SEATS[self.dealer]}: {values})"
+
+    def seat(self, position=None) -> int:
+        """ The seat making the call at a position, by default the next. """
+        if position is None:
+            position = len(self.calls)
+        return (self.dealer + position) % len(SEATS)
+
+    @property
+    def is_complete(self) -> bool:
+        """ Whether the auction has ended. """
+        if self._last_bid == PASS:
+            return self._passes >= 4
+        return self._passes >= 3
+
+    def is_legal(self, code) -> bool:
+        """ Whether the next player may make the call. """
+        if self.is_complete:
+            return False
+
+        if code == PASS:
+            return True
+
+        if code == DOUBLE or code == REDOUBLE:
+            if self._last_bidder is None:
+                return False
+
+            opponents_bid = (len(self.calls) - self._last_bidder) % 2 == 1
+            if code == DOUBLE:
+                return self._doubled == 0 and opponents_bid
+            return self._doubled == 1 and not opponents_bid
+
+        return self._last_bid < code < len(CALLS)
+
+    def add(self, code):
+        """
+        Make the next call. Raises ValueError if the call is not legal.
+        """
+        if not self.is_legal(code):
+            raise ValueError(f"{call_value(code)} is not legal after "
+                             f"{self!r}.")
+
+        position = len(self.calls)
+        if code == PASS:
+            self._passes += 1
+        else:
+            self._passes = 0
+            if code == DOUBLE:
+                self._doubled = 1
+            elif code == REDOUBLE:
+                self._doubled = 2
+            else:
+                self._last_bid = code
+                self._last_bidder = position
+                self._doubled = 0
+                key = (position % _SIDES) * len(STRAINS) + strain(code)
+                if self._first_bidders[key] is None:
+                    self._first_bidders[key] = position
+
+        self.calls.append(code)
+
+    def has_bid(self, seat) -> bool:
+        """ Whether the side of a seat has made a bid. """
+        side = (seat - self.dealer) % _SIDES * len(STRAINS)
+        return any(position is not None for position
+                   in self._first_bidders[side:side + len(STRAINS)])
+
+    @property
+    def last_bid(self):
+        """ The code of the last bid, or None if nothing has been bid. """
+        return self._last_bid if self._last_bid >= FIRST_BID else None
+
+    @property
+    def doubled(self) -> int:
+        """ 0, 1 or 2 for undoubled, doubled and redoubled. """
+        return self._doubled
+
+    @property
+    def declarer(self):
+        """
+        The seat of the player of the last bid's side who first bid its
+        strain, or None if nothing has been bid.
+        """
+        if self._last_bidder is None:
+            return None
+
+        key = ((self._last_bidder % _SIDES) * len(STRAINS)
+               + strain(self._last_bid))
+        return self.seat(self._first_bidders[key])
+
+    def contract(self) -> str:
+        """
+        The contract so far, e.g. "4HXS", or "P" if nothing has been bid.
+        """
+        if self._last_bidder is None:
+            return "P"
+
+        return (f"{level(self._last_bid)}"
+                f"{STRAINS[strain(self._last_bid)].upper()}"
+                f"{'X' * self._doubled}{SEATS[self.declarer]}")
+
+    def pack(self) -> bytes:
+        """ The dealer, then one byte per call. """
+        return bytes([self.dealer]) + self.calls
+
+
+def pack_auctions(auctions) -> bytes:
+    """ Pack completed auctions into one byte string. """
+    packed = bytearray()
+    for auction in auctions:
+        if not auction.is_complete:
+            raise ValueError(f"{auction!r} has not ended.")
+        packed += auction.pack()
+
+    return bytes(packed)
+
+
+def unpack_auctions(data):
+    """ Yield the auctions packed by pack_auctions. """
+    position = 0
+    while position < len(data):
+        auction = Auction(data[position])
+        position += 1
+        while not auction.is_complete:
+            try:
+                auction.add(data[position])
+            except IndexError:
+                raise ValueError("The last auction is incomplete.") from None
+            position += 1
+
+        yield auction
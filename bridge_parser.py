@@ -38,9 +38,9 @@ STANDARD_REGEXES = {
     re.compile("^desc(ribe|ription)?$", re.I): ParseResults.Describe,
     re.compile("^y(es)?$", re.I): ParseResults.Yes,
     re.compile("^no?$", re.I): ParseResults.No,
-    re.compile("^([1-7][cdhsn]|p(ass)?)$", re.I): ParseResults.BridgeBid,
+    re.compile("^([1-7][cdhsn]|p(ass)?|xx?)$", re.I): ParseResults.BridgeBid,
     re.compile("^[0-9]+$"): ParseResults.Integer,
-    re.compile("^([1-7][cdhsn][ensw]|p(ass)?)$", re.I):
+    re.compile("^([1-7][cdhsn](xx?)?[ensw]|p(ass)?)$", re.I):
         ParseResults.BridgeContract
     }
 
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 17:26:13 2026
+
+Integer codes for the 38 calls of an auction.
+
+Pass, double and redouble are 0, 1 and 2. Bids follow in ascending order, so
+a bid is sufficient exactly when its code is greater than that of the
+previous bid.
+"""
+
+__author__ = "Andrew I McClement"
+
+STRAINS = "cdhsn"
+PASS, DOUBLE, REDOUBLE = 0, 1, 2
+FIRST_BID = 3
+CALLS = ("P", "X", "XX") + tuple(f"{level}{strain}"
+                                 for level in range(1, 8)
+                                 for strain in STRAINS)
+_CODES = {call: code for code, call in enumerate(CALLS)}
+_CODES.update({"PASS": PASS, "p": PASS, "x": DOUBLE, "xx": REDOUBLE})
+
+
+def call_code(value) -> int:
+    """ The code of a call such as "1c", "P" or "XX". """
+    try:
+        return _CODES[value]
+    except KeyError:
+        # Raises KeyError if this is not a call.
+        value = value.strip()
+        return _CODES[value.upper() if value.upper() in _CODES
+                      else value.lower()]
+
+
+def call_value(code) -> str:
+    """ The value of a call, in the form used by the XML systems. """
+    return CALLS[code]
+
+
+def is_bid(code) -> bool:
+    """ Whether the call is a bid rather than pass, double or redouble. """
+    return code >= FIRST_BID
+
+
+def level(code) -> int:
+    """ The level (1-7) of a bid. """
+    return (code - FIRST_BID) // len(STRAINS) + 1
+
+
+def strain(code) -> int:
+    """ The strain of a bid as an index into STRAINS. """
+    return (code - FIRST_BID) % len(STRAINS)
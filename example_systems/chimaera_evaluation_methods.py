@@ -7,11 +7,14 @@ Names here must match those used in the XML and must all be lower case.
 
 __author__ = "Andrew I McClement"
 
-from practice_bidding.redeal.redeal import A, K, Q, Evaluator
+from practice_bidding.redeal.redeal import K, Q
+from practice_bidding import suit_tables
+from practice_bidding.suit_tables import SuitTable
 
 
 SUITS = ("clubs", "diamonds", "hearts", "spades")
-HCP = Evaluator(4.5, 3, 1.5, 0.75, 0.25)
+HCP = SuitTable.from_values(4.5, 3, 1.5, 0.75, 0.25)
+TOP_THREE = SuitTable.from_values(1, 1, 1)
 
 
 def hcp(hand):
@@ -22,8 +25,7 @@ def hcp(hand):
 def _get_top_three_suit(suit):
     def top_three_in_suit(hand):
         f""" Count how many of AKQ are in the given {suit}."""
-        holding = getattr(hand, suit)
-        return holding.count(A) + holding.count(K) + holding.count(Q)
+        return TOP_THREE.holding_value(getattr(hand, suit))
 
     return top_three_in_suit
 
@@ -35,14 +37,16 @@ top_three_s = _get_top_three_suit("spades")
 
 
 def top_three(hand):
-    return (top_three_c(hand) + top_three_d(hand) + top_three_h(hand)
-            + top_three_s(hand))
+    return TOP_THREE(hand)
 
 
 def _get_tricks(suit):
     def playing_tricks(hand):
         f""" The number of playing tricks in {suit if suit else 'hand'}."""
-        return hand.pt if suit is None else getattr(hand, suit).pt
+        if suit is None:
+            return suit_tables.playing_tricks(hand)
+
+        return suit_tables.holding_playing_tricks(getattr(hand, suit))
 
     return playing_tricks
 
@@ -53,8 +57,8 @@ tricks_d = _get_tricks("diamonds")
 tricks_h = _get_tricks("hearts")
 tricks_s = _get_tricks("spades")
 
-gerber = Evaluator(1)
-controls = Evaluator(2, 1)
+gerber = SuitTable.from_values(1)
+controls = SuitTable.from_values(2, 1)
 
 
 def _get_rkcb(suit):
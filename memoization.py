@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:40:05 2026
+
+Per-hand memoisation of formula module functions.
+
+Functions in a formula module are assumed to be pure functions of the hand,
+so XmlReaderForFile wraps them in a HandMemo. Decorate a function with
+@impure in the formula module to opt out.
+"""
+
+__author__ = "Andrew I McClement"
+
+import functools
+import weakref
+
+_IMPURE = "_practice_bidding_impure"
+# A board has four hands.
+HANDS_PER_BOARD = 4
+
+_memos = weakref.WeakSet()
+
+
+def impure(function):
+    """ Decorator: the function must be called afresh every time. """
+    setattr(function, _IMPURE, True)
+    return function
+
+
+def is_impure(function) -> bool:
+    """ Whether the function has been marked with @impure. """
+    return getattr(function, _IMPURE, False)
+
+
+class HandMemo:
+    """
+    Remembers the results of a function for the hands of the current board.
+
+    Hands are compared by identity, as redeal deals new Hand objects for
+    every board. The memo never holds more than max_hands results.
+    """
+
+    def __init__(self, function, max_hands=HANDS_PER_BOARD):
+        functools.update_wrapper(self, function)
+        self._function = function
+        self._max_hands = max_hands
+        # id(hand) -> (hand, result). Keeping the hand alive guarantees its
+        # id is not reused while the entry exists.
+        self._results = {}
+        _memos.add(self)
+
+    def __call__(self, hand):
+        try:
+            cached_hand, result = self._results[id(hand)]
+            if cached_hand is hand:
+                return result
+        except KeyError:
+            pass
+
+        if len(self._results) >= self._max_hands:
+            # Must be a new board.
+            self._results.clear()
+
+        result = self._function(hand)
+        self._results[id(hand)] = (hand, result)
+        return result
+
+    def clear(self):
+        """ Forget all stored results. """
+        self._results.clear()
+
+
+def memoize_per_hand(function):
+    """ Wrap function in a HandMemo unless it is marked as impure. """
+    if is_impure(function) or isinstance(function, HandMemo):
+        return function
+
+    return HandMemo(function)
+
+
+def clear_hand_caches():
+    """ Clear every HandMemo, e.g. when a new board is dealt. """
+    for memo in list(_memos):
+        memo.clear()
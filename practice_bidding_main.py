@@ -13,11 +13,15 @@ from time import sleep
 import traceback
 from typing import Callable, Dict
 
+from practice_bidding.analysis.bid_map import BidMapper
+from practice_bidding.analysis.dd_corpus import DDCorpus
 from practice_bidding.xml_parsing.xml_parser import Bid
 from practice_bidding.bridge_parser import ParseResults
 from practice_bidding.redeal.redeal import Hand
 from practice_bidding.redeal import redeal
 from practice_bidding.robot_bidding import BiddingProgram
+from practice_bidding.xml_parsing.hot_reload import SystemWatcher
+from practice_bidding.xml_parsing.hot_reload import reload_system
 from practice_bidding.xml_parsing.xml_parser import XmlReaderForFile
 
 redeal.SUITS_FORCE_UNICODE = True
@@ -73,6 +77,37 @@ def get_xml_source(parse: Callable[[str], ParseResults]) -> str:
     return filepath
 
 
+def _optional_arguments():
+    # The arguments after the system: a deal corpus and/or an XML system
+    # for East-West, in either order.
+    return sys.argv[2:] if __name__ == "__main__" else []
+
+
+def get_deal_generator():
+    """
+    Boards are drawn from a deal corpus with precomputed double dummy
+    tables if its path is given as an argument after the system, else dealt
+    at random.
+    """
+    for argument in _optional_arguments():
+        if not argument.lower().endswith(".xml"):
+            return DDCorpus.load(argument).dealer()
+
+    return None
+
+
+def get_east_west_source():
+    """
+    The XML system of East-West, if given as an argument after the system.
+    Otherwise East-West pass throughout.
+    """
+    for argument in _optional_arguments():
+        if argument.lower().endswith(".xml"):
+            return argument
+
+    return None
+
+
 def _get_final_contract(parse_method,
                         rejection_options) -> (bool, str):
     result = None
@@ -115,7 +150,8 @@ def _play_board(program, get_user_input, parse_user_input):
             dd_result = program.get_double_dummy_result(contract)
             print(f"Double dummy result: {contract} {dd_result}")
 
-    # TODO: Add optimal contract (dd_solve).
+    par_score, par_contract = program.get_par_result()
+    print(f"Par: {par_contract} {par_score} to North-South")
 
     input_, result = get_user_input("Play another hand? (y/n)",
                                     {ParseResults.Yes, ParseResults.No})
@@ -157,16 +193,30 @@ def main():
     # Set a prettier printed version of a Hand object.
     Hand.__str__ = hand_to_str
 
-    program = BiddingProgram()
+    program = BiddingProgram(get_deal_generator())
 
     try:
         source = get_xml_source(program.parse)
-        reader = XmlReaderForFile(source)
-        bids = reader.get_bids_from_xml()
+        # Edits to the system are picked up between boards.
+        watcher = SystemWatcher(source)
+        bids = watcher.opening_bids
         print_general_bid_details(bids)
         program.set_opening_bids(bids)
+        watchers = [watcher]
+        east_west_source = get_east_west_source()
+        if east_west_source is not None:
+            watchers.append(SystemWatcher(east_west_source))
+            program.set_east_west_bids(watchers[-1].opening_bids)
+            # The two systems share the features of each hand.
+            bid_mapper = BidMapper({})
+            program.set_bid_mapper(bid_mapper)
+            for watcher in watchers:
+                watcher.add_listener(bid_mapper.update)
+
         while _play_board(program, program.get_validated_input,
                           program.parse):
+            for watcher in watchers:
+                reload_system(watcher)
             program.generate_new_deal()
 
     except KeyboardInterrupt:
@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 15:02:36 2026
+
+Serve practice sessions over a local JSON-over-HTTP API.
+
+Every session is a BiddingProgram, but all of them share one bid tree parsed
+once from the XML, and updated in place when the XML is edited. Bidding is
+cheap and runs on the event loop; double dummy solving runs in an executor so
+a slow solve never blocks other sessions.
+
+Usage:
+    python -m practice_bidding.practice_server system.xml [port]
+
+API (all responses are JSON):
+    POST   /sessions              Start a session. Bids until South's turn.
+    GET    /sessions/<id>         The state of the session.
+    POST   /sessions/<id>/bid     Bid for South, e.g. {"bid": "1c"}.
+    GET    /sessions/<id>/result  Double dummy result of the final contract.
+    POST   /sessions/<id>/next    Deal the next board.
+    DELETE /sessions/<id>         End the session.
+"""
+
+__author__ = "Andrew I McClement"
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import json
+import sys
+import traceback
+import tracemalloc
+import uuid
+
+from practice_bidding.analysis.bid_map import BidMapper
+from practice_bidding.redeal.redeal import Deal
+from practice_bidding.robot_bidding import BiddingProgram
+from practice_bidding.xml_parsing.hot_reload import SystemWatcher
+from practice_bidding.xml_parsing.hot_reload import reload_system
+
+DEFAULT_PORT = 8080
+# Seconds between checks for edits to the system.
+POLL_INTERVAL = 1
+_REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 500: "Internal Server Error",
+            503: "Service Unavailable"}
+
+
+class HttpError(Exception):
+    """ An error to be returned to the client with the given status. """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class PracticeServer:
+    """ Hosts many practice sessions over one shared bid tree. """
+
+    def __init__(self, opening_bids, max_sessions=10000, executor=None):
+        self._opening_bids = opening_bids
+        # One for every session, so that a hand's features are extracted
+        # once. Keep it up to date with SystemWatcher.add_listener.
+        self.bid_mapper = BidMapper(opening_bids)
+        self._max_sessions = max_sessions
+        # The DD solver is a C library which releases the GIL.
+        self._executor = executor or ThreadPoolExecutor()
+        self._deal_generator = Deal.prepare({})
+        self.sessions = {}
+
+    def _get_session(self, session_id) -> BiddingProgram:
+        try:
+            return self.sessions[session_id]
+        except KeyError:
+            raise HttpError(404, f"No session {session_id}.")
+
+    @staticmethod
+    def _bid_until_users_turn(program):
+        while not (program.is_passed_out(program.bidding_sequence)
+                   or program.is_users_turn):
+            program.bid()
+
+    @staticmethod
+    def _state(session_id, program):
+        finished = program.is_passed_out(program.bidding_sequence)
+        state = {"session": session_id,
+                 "board": program.board_number,
+                 "vulnerability": program.vulnerability.name,
+                 "dealer": program.dealer_for(program.board_number).name,
+                 "hand": str(program.get_hand()),
+                 "auction": [bid.value for bid in program.bidding_sequence],
+                 "finished": finished}
+        if finished:
+            state["contract"] = program.get_contract()
+            state["hands"] = {seat.name: str(program.get_hand(seat))
+                              for seat in program.Players}
+        else:
+            state["potential_bids"] = sorted(program.potential_bids)
+
+        return state
+
+    def create_session(self):
+        """ Start a session and return its state. """
+        if len(self.sessions) >= self._max_sessions:
+            raise HttpError(503, "Too many sessions.")
+
+        session_id = uuid.uuid4().hex
+        program = BiddingProgram(self._deal_generator)
+        program.set_opening_bids(self._opening_bids)
+        program.set_bid_mapper(self.bid_mapper)
+        self.sessions[session_id] = program
+        self._bid_until_users_turn(program)
+        return self._state(session_id, program)
+
+    def get_state(self, session_id):
+        """ The state of a session. """
+        return self._state(session_id, self._get_session(session_id))
+
+    def make_bid(self, session_id, value):
+        """ Bid for South, then let the robot bid until South is next. """
+        program = self._get_session(session_id)
+        if not program.is_users_turn:
+            raise HttpError(400, "It is not South's turn to bid.")
+
+        try:
+            program.make_user_bid(str(value))
+        except KeyError:
+            raise HttpError(400, f"{value} is not an expected response.")
+
+        self._bid_until_users_turn(program)
+        return self._state(session_id, program)
+
+    def next_board(self, session_id):
+        """ Deal the next board of a session. """
+        program = self._get_session(session_id)
+        program.generate_new_deal()
+        self._bid_until_users_turn(program)
+        return self._state(session_id, program)
+
+    def end_session(self, session_id):
+        """ Forget a session. """
+        self._get_session(session_id)
+        del self.sessions[session_id]
+        return {"session": session_id, "ended": True}
+
+    async def get_result(self, session_id):
+        """ The double dummy result of the final contract. """
+        program = self._get_session(session_id)
+        if not program.is_passed_out(program.bidding_sequence):
+            raise HttpError(400, "The auction has not finished.")
+
+        contract = program.get_contract()
+        result = {"session": session_id, "contract": contract}
+        if contract == "P":
+            return result
+
+        # Take what the solver needs now: the session may move on to the
+        # next board while the solve is running.
+        deal = program.deal
+        vulnerable = program.is_vulnerable(contract[-1])
+
+        def solve():
+            # Doubling does not change the tricks.
+            return (deal.dd_tricks(contract[:2] + contract[-1]),
+                    deal.dd_score(contract, vulnerable))
+
+        loop = asyncio.get_event_loop()
+        tricks, score = await loop.run_in_executor(self._executor, solve)
+        result.update(tricks=tricks, score=score)
+        return result
+
+    async def dispatch(self, method, path, body):
+        """ Route a request. Returns (status, payload). """
+        parts = [part for part in path.split("?")[0].split("/") if part]
+        if not parts or parts[0] != "sessions" or len(parts) > 3:
+            raise HttpError(404, f"Unknown path {path}.")
+
+        if len(parts) == 1:
+            if method != "POST":
+                raise HttpError(405, method)
+            return 201, self.create_session()
+
+        session_id = parts[1]
+        action = parts[2] if len(parts) == 3 else None
+        routes = {("GET", None): lambda: self.get_state(session_id),
+                  ("DELETE", None): lambda: self.end_session(session_id),
+                  ("POST", "bid"): lambda: self.make_bid(
+                      session_id, body.get("bid", "")),
+                  ("POST", "next"): lambda: self.next_board(session_id),
+                  ("GET", "result"): lambda: self.get_result(session_id)}
+        try:
+            route = routes[(method, action)]
+        except KeyError:
+            raise HttpError(405, f"{method} {path}")
+
+        payload = route()
+        if asyncio.iscoroutine(payload):
+            payload = await payload
+
+        return 200, payload
+
+    async def handle_connection(self, reader, writer):
+        """ Serve HTTP/1.1 requests on one connection. """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = (await reader.readline()).decode("latin-1")
+                    if not line.strip():
+                        break
+                    key, _, value = line.partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                raw_body = await reader.readexactly(length) if length else b""
+                status, payload = await self._respond(method.upper(), path,
+                                                      raw_body)
+                data = json.dumps(payload).encode("utf-8")
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    (f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                     "Content-Type: application/json\r\n"
+                     f"Content-Length: {len(data)}\r\n"
+                     f"Connection: {'keep-alive' if keep_alive else 'close'}"
+                     "\r\n\r\n").encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, method, path, raw_body):
+        try:
+            body = json.loads(raw_body.decode("utf-8")) if raw_body else {}
+            if not isinstance(body, dict):
+                raise HttpError(400, "Expected a JSON object.")
+            return await self.dispatch(method, path, body)
+        except HttpError as error:
+            return error.status, {"error": str(error)}
+        except ValueError as error:
+            return 400, {"error": str(error)}
+        except Exception:
+            # Answer rather than drop the connection, and keep serving.
+            traceback.print_exc()
+            return 500, {"error": "Internal server error."}
+
+    def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        """ Coroutine starting an asyncio server for this instance. """
+        return asyncio.start_server(self.handle_connection, host, port)
+
+
+def measure_session_memory(opening_bids, session_count=1000):
+    """
+    The memory in bytes allocated per idle session, including its deal.
+    """
+    server = PracticeServer(opening_bids, max_sessions=session_count)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for _ in range(session_count):
+            server.create_session()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    return (after - before) / session_count
+
+
+def main():
+    """ Serve the system given on the command line until interrupted. """
+    xml_source = sys.argv[1]
+    try:
+        port = int(sys.argv[2])
+    except IndexError:
+        port = DEFAULT_PORT
+
+    # Sessions share the watcher's bids, which edits to the XML update.
+    watcher = SystemWatcher(xml_source)
+    server = PracticeServer(watcher.opening_bids)
+    watcher.add_listener(server.bid_mapper.update)
+    loop = asyncio.get_event_loop()
+
+    def poll():
+        reload_system(watcher)
+        loop.call_later(POLL_INTERVAL, poll)
+
+    loop.call_later(POLL_INTERVAL, poll)
+    tcp_server = loop.run_until_complete(server.start(port=port))
+    print(f"Serving {xml_source} on http://127.0.0.1:{port}/sessions")
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        tcp_server.close()
+        loop.run_until_complete(tcp_server.wait_closed())
+        loop.close()
+
+
+if __name__ == "__main__":
+    main()
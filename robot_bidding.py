@@ -14,14 +14,45 @@ from enum import Enum, auto
 import itertools
 from random import choice
 
-from practice_bidding.xml_parsing.xml_parser import Bid
+from practice_bidding.auction import Auction
+from practice_bidding.calls import call_code
+from practice_bidding.xml_parsing.xml_parser import Bid, priority_order
 from practice_bidding.bridge_parser import parse_with_quit, ParseResults
+from practice_bidding.memoization import clear_hand_caches
 from practice_bidding.redeal.redeal import Deal
+from practice_bidding import scoring
+
+
+class BoardState:
+    """ The state of the current board of a BiddingProgram. """
+
+    __slots__ = ("board_number", "deal_generator", "deal", "bidding_sequence",
+                 "opening_bids", "east_west_bids", "bid_mapper", "auction")
+
+    def __init__(self, deal_generator):
+        # Board number set to 0 as BiddingProgram.generate_new_deal
+        # increments board number by 1.
+        self.board_number = 0
+        self.deal_generator = deal_generator
+        self.deal = None
+        self.bidding_sequence = []
+        # The calls of bidding_sequence, see BiddingProgram.auction.
+        self.auction = Auction()
+        self.opening_bids = {}
+        # East-West pass throughout if they have no system.
+        self.east_west_bids = None
+        # Evaluates the bids of both systems from features of the hands
+        # extracted once per board, see set_bid_mapper. Without one, each
+        # bid evaluates its own compiled condition.
+        self.bid_mapper = None
 
 
 class BiddingProgram:
     """ The player is assumed to always sit South. """
 
+    # Many sessions may be hosted at once (see practice_server.py).
+    __slots__ = ("_board_state", "_settings")
+
     class Players(Enum):
         """
         Bridge players at the table, named after the cardinal directions.
@@ -45,67 +76,122 @@ class BiddingProgram:
         # The program makes all bids.
         Automatic = auto()
 
+    class SelectionMode(Enum):
+        """ How the program chooses between the bids a hand satisfies. """
+        # A random choice between every accepted bid.
+        Random = auto()
+        # The first accepted bid, trying siblings in priority order (see
+        # xml_parser.priority_order) and stopping there.
+        Priority = auto()
+
     # Integers correspond to board number modulo 4 for which that player
     # is dealer.
     _dealer_map = {1: Players.North, 2: Players.East, 3: Players.South,
                    0: Players.West}
     _pass = Bid("P", "Pass", [])
+    _double = Bid("X", "Double", [])
+    _redouble = Bid("XX", "Redouble", [])
 
-    def __init__(self):
-        # Board number set to 0 as self.generate_new_deal increments board
-        # number by 1.
-        self._board_state = {"board_number": 0,
-                             "deal_generator": Deal.prepare({}),
-                             "deal": None,
-                             "bidding_sequence": [],
-                             "opening_bids": {}}
+    def __init__(self, deal_generator=None):
+        self._board_state = BoardState(deal_generator or Deal.prepare({}))
         self.generate_new_deal()
 
         self._settings = {"mode": self.ProgramMode.Default,
+                          "selection": self.SelectionMode.Random,
                           "display_meaning_of_bids": False,
                           "display_meaning_of_possible_bids": False}
 
     @property
     def _root(self):
-        return self._board_state["opening_bids"]
+        return self._board_state.opening_bids
 
     @property
     def deal(self):
         """ The current deal. """
-        return self._board_state["deal"]
+        return self._board_state.deal
 
     def generate_new_deal(self):
         """Get a new deal."""
-        self._board_state["deal"] = self._board_state["deal_generator"]()
-        self._board_state["bidding_sequence"] = []
-        self._board_state["board_number"] += 1
+        # Memoised formulas must not keep the previous board's hands alive.
+        clear_hand_caches()
+        self._board_state.deal = self._board_state.deal_generator()
+        self._board_state.bidding_sequence = []
+        self._board_state.board_number += 1
+        self._board_state.auction = Auction(self._dealer_seat)
+
+    def set_deal(self, deal, board_number):
+        """
+        Use a given deal, e.g. one recorded at the table.
+
+        The board number determines the dealer and vulnerability.
+        """
+        clear_hand_caches()
+        self._board_state.deal = deal
+        self._board_state.bidding_sequence = []
+        self._board_state.board_number = board_number
+        self._board_state.auction = Auction(self._dealer_seat)
+
+    @property
+    def _dealer_seat(self):
+        # The index of the dealer in auction.SEATS.
+        return (self._board_state.board_number - 1) % 4
+
+    @property
+    def auction(self):
+        """
+        The bidding sequence as an Auction, updated as each call is made.
+        """
+        auction = self._board_state.auction
+        sequence = self.bidding_sequence
+        if len(auction) != len(sequence) or (
+                sequence and auction.calls[-1] != call_code(
+                    sequence[-1].value)):
+            # The bidding sequence has been edited directly.
+            auction = self._board_state.auction = Auction.from_values(
+                (bid.value for bid in sequence), self._dealer_seat)
+
+        return auction
+
+    def _make_call(self, bid):
+        self.auction.add(call_code(bid.value))
+        self.bidding_sequence.append(bid)
 
     @property
     def bidding_sequence(self):
         """The bidding sequence so far."""
-        return self._board_state["bidding_sequence"]
+        return self._board_state.bidding_sequence
 
     @property
     def board_number(self):
         """The current board number."""
-        return self._board_state["board_number"]
+        return self._board_state.board_number
 
     @property
     def vulnerability(self):
         """Current vulnerability."""
-        board_number = self.board_number % 16
+        return self.vulnerability_for(self.board_number)
+
+    @classmethod
+    def vulnerability_for(cls, board_number):
+        """ The vulnerability of a given board. """
+        board_number = board_number % 16
         if board_number in {1, 8, 11, 14}:
-            return self.Vulnerability.None_
+            return cls.Vulnerability.None_
         elif board_number in {2, 5, 12, 15}:
-            return self.Vulnerability.Unfavourable
+            return cls.Vulnerability.Unfavourable
         elif board_number in {3, 6, 9, 0}:
-            return self.Vulnerability.Favourable
+            return cls.Vulnerability.Favourable
         elif board_number in {4, 7, 10, 13}:
-            return self.Vulnerability.All
+            return cls.Vulnerability.All
+
+    @classmethod
+    def dealer_for(cls, board_number):
+        """ The dealer of a given board. """
+        return cls._dealer_map[board_number % 4]
 
     @property
     def _dealer(self):
-        return self._dealer_map[(self.board_number) % 4]
+        return self.dealer_for(self.board_number)
 
     # shift = index in bidding sequence. By default returns the player
     # who is next to bid.
@@ -191,7 +277,8 @@ class BiddingProgram:
 
         # Get the next bid made.
         current_bidder = self._bidder()
-        if current_bidder in {self.Players.East, self.Players.West}:
+        if (current_bidder in {self.Players.East, self.Players.West}
+                and not self._board_state.east_west_bids):
             next_bid = self._pass
         elif current_bidder == self.Players.South and \
                 self._mode == self.ProgramMode.Default:
@@ -203,21 +290,112 @@ class BiddingProgram:
         if ((next_bid != self._pass)
                 and self._settings["display_meaning_of_bids"]):
             print(f"{next_bid.value}: {next_bid.description}")
-        self.bidding_sequence.append(next_bid)
+        self._make_call(next_bid)
+
+    @property
+    def potential_bids(self):
+        """
+        The legal bids defined by the next bidder's system.
+
+        If partner has bid, these are the continuations of partner's bid.
+        Otherwise, if the bidder's side has not bid yet, they are the opening
+        bids of the bidder's system, used as overcalls if the opponents have
+        opened.
+        """
+        sequence = self.bidding_sequence
+        auction = self.auction
+        if len(sequence) >= 2 and sequence[-2] != self._pass:
+            # Partner made a non-trivial bid.
+            candidates = sequence[-2].children
+        elif auction.has_bid(auction.seat()):
+            # The side has bid, but partner passed: the system says no more.
+            return {}
+        elif self._bidder() in {self.Players.North, self.Players.South}:
+            candidates = self._root
+        else:
+            candidates = self._board_state.east_west_bids or {}
+
+        return {value: bid for value, bid in candidates.items()
+                if auction.is_legal(call_code(value))}
+
+    @property
+    def is_users_turn(self):
+        """ Whether the program is waiting for the user to bid as South. """
+        return (self._mode == self.ProgramMode.Default
+                and not self.is_passed_out(self.bidding_sequence)
+                and self._bidder() == self.Players.South)
+
+    def make_user_bid(self, value):
+        """
+        Make a bid for South without prompting for input.
+
+        Raises KeyError if the bid is not one of the potential bids.
+        """
+        assert self.is_users_turn
+        bid = self._competitive_call(value)
+        if bid is None:
+            bid = self.potential_bids[value.lower()]
+
+        self._make_call(bid)
+        return bid
+
+    def replay_call(self, value):
+        """
+        Make a given call for the next bidder, e.g. one recorded at the
+        table. Calls outside the bidder's system are made without a meaning.
+
+        Raises KeyError if the call is not legal.
+        """
+        bid = self._competitive_call(value)
+        if bid is None:
+            value = value.lower()
+            if not self.auction.is_legal(call_code(value)):
+                raise KeyError(value)
+
+            bid = self.potential_bids.get(value) or Bid(value, "Recorded",
+                                                        [])
+
+        self._make_call(bid)
+        return bid
+
+    def _competitive_call(self, value):
+        """
+        The pass, double or redouble for a value, or None if the value is
+        not one of those. Raises KeyError if the double or redouble is not
+        legal.
+        """
+        value = value.upper()
+        if value in {self._pass.value, "PASS"}:
+            return self._pass
+
+        calls = {self._double.value: self._double,
+                 self._redouble.value: self._redouble}
+        if value not in calls:
+            return None
+
+        if not self.auction.is_legal(call_code(value)):
+            raise KeyError(value)
+
+        return calls[value]
+
+    def _accept(self, bid, hand):
+        mapper = self._board_state.bid_mapper
+        if mapper is None:
+            return bid.accept(hand)
+
+        return mapper.accept(bid, hand)
 
     def _program_bid(self, current_hand):
-        potential_bids = None
+        if self._settings["selection"] == self.SelectionMode.Priority:
+            for bid in sorted(self.potential_bids.values(),
+                              key=priority_order):
+                if self._accept(bid, current_hand):
+                    return bid
 
-        if len(self.bidding_sequence) >= 2:
-            current_bid = self.bidding_sequence[-2]
-            if current_bid != self._pass:
-                # Partner made a non-trivial bid.
-                potential_bids = [bid for bid in current_bid.children.values()
-                                  if bid.accept(current_hand)]
+            return self._pass
 
-        if potential_bids is None:
-            potential_bids = [bid for bid in self._root.values()
-                              if bid.accept(current_hand)]
+        potential_bids = [bid for bid in self.potential_bids.values()
+                          if self._accept(bid, current_hand)]
 
         try:
             bid = choice(potential_bids)
@@ -227,19 +405,39 @@ class BiddingProgram:
 
         return bid
 
+    def set_mode(self, mode):
+        """ Set the mode of the program. """
+        assert isinstance(mode, self.ProgramMode)
+        self._settings["mode"] = mode
+
+    def set_selection(self, selection):
+        """ Set how the program chooses between acceptable bids. """
+        assert isinstance(selection, self.SelectionMode)
+        self._settings["selection"] = selection
+
+    def set_bid_mapper(self, mapper):
+        """
+        Evaluate bids with the given BidMapper, which may be shared by
+        several programs and by the systems of both sides, so that the
+        features of each hand are extracted once per board. None (the
+        default) evaluates each bid's own compiled condition.
+        """
+        self._board_state.bid_mapper = mapper
+
     def set_opening_bids(self, opening_bids):
         """ Set the opening bids. """
-        self._board_state["opening_bids"] = opening_bids
+        self._board_state.opening_bids = opening_bids
 
-    def _user_bid(self):
-        # By default this is an opening bid.
-        potential_bids = self._root
-        if len(self.bidding_sequence) >= 2:
-            current_bid = self.bidding_sequence[-2]
-            if current_bid != self._pass:
-                # Our partner made a non-trivial bid.
-                potential_bids = current_bid.children
+    def set_east_west_bids(self, opening_bids):
+        """
+        Set the opening bids of the system played by East-West, who bid in
+        competition with North-South. None (the default) makes them pass
+        throughout.
+        """
+        self._board_state.east_west_bids = opening_bids
 
+    def _user_bid(self):
+        potential_bids = self.potential_bids
         bid = None
         while bid is None:
             if self._mode == self.ProgramMode.Automatic:
@@ -255,13 +453,10 @@ class BiddingProgram:
                 help_message=("Enter a bid from one of the potential bids "
                               "listed.  You must use a single character to "
                               "define the suit."))
-            if selected.upper() in {self._pass.value, "PASS"}:
-                bid = self._pass
-                break
-
-            selected = selected.lower()
             try:
-                bid = potential_bids[selected]
+                bid = self._competitive_call(selected)
+                if bid is None:
+                    bid = potential_bids[selected.lower()]
             except KeyError:
                 print("That was not an expected response.")
 
@@ -303,6 +498,16 @@ class BiddingProgram:
                         self._settings["mode"] = self.ProgramMode.Default
                     elif self._mode == self.ProgramMode.Default:
                         self._settings["mode"] = self.ProgramMode.Automatic
+            elif key == "selection":
+                input_ = input("Do you wish to change how the program "
+                               "chooses between bids from "
+                               f"{self._settings[key]}? (y/n)")
+                result = self.parse(input_, True)
+                if result == ParseResults.Yes:
+                    self._settings[key] = (
+                        self.SelectionMode.Random
+                        if self._settings[key] == self.SelectionMode.Priority
+                        else self.SelectionMode.Priority)
             else:
                 input_, result = self.get_validated_input(
                     f"Do you wish to change {key} from {self._settings[key]}?"
@@ -320,48 +525,46 @@ class BiddingProgram:
         if bidding_sequence is None:
             bidding_sequence = self.bidding_sequence
         assert self.is_passed_out(bidding_sequence)
-        # Must have 3 passes.
-        last_bid = bidding_sequence[-4]
-        if last_bid == self._pass:
-            return "P"
-
-        index = len(bidding_sequence) - 4
-        suit = last_bid.suit
-        suit_bid_by_partner = False
-        # Work out who bid the suit first.
-        for i in range(index - 2, -1, -4):
-            partner_bid = bidding_sequence[i]
-            if partner_bid == self._pass:
-                break
-            elif partner_bid.suit == suit:
-                suit_bid_by_partner = True
-                break
+        if bidding_sequence is self.bidding_sequence:
+            return self.auction.contract()
 
-        bidder = self._bidder(index - 2 if suit_bid_by_partner else index)
-        contract = last_bid.value.upper()
-        player_map = {self.Players.North: "N", self.Players.East: "E",
-                      self.Players.South: "S", self.Players.West: "W"}
-        contract += player_map[bidder]
-        return contract
+        return Auction.from_values((bid.value for bid in bidding_sequence),
+                                   self._dealer_seat).contract()
 
     def get_double_dummy_result(self, contract):
         """ Get the number of tricks and corresponding score. """
         try:
-            assert len(contract) == 3
+            assert len(contract) in range(3, 6)
             assert int(contract[0]) in range(1, 8)
             assert contract[1] in {"C", "D", "H", "S", "N"}
-            assert contract[2] in {"N", "E", "S", "W"}
+            assert contract[2:-1] in {"", "X", "XX"}
+            assert contract[-1] in {"N", "E", "S", "W"}
         except AssertionError:
             raise ValueError(f"{contract} not a valid contract.")
 
-        if contract[2] in {"N", "S"}:
-            vulnerability = self.vulnerability in {
-                self.Vulnerability.All,
-                self.Vulnerability.Unfavourable}
-        else:
-            vulnerability = self.vulnerability in {
-                self.Vulnerability.All,
-                self.Vulnerability.Favourable}
-
-        return (self.deal.dd_tricks(contract),
+        vulnerability = self.is_vulnerable(contract[-1])
+        return (self.deal.dd_tricks(contract[:2] + contract[-1]),
                 self.deal.dd_score(contract, vulnerability))
+
+    def get_par_result(self):
+        """
+        Get the par score for North-South and the par contract.
+
+        Deals with a precomputed table (see analysis/dd_corpus.py) are not
+        solved again.
+        """
+        table = getattr(self.deal, "dd_table", None)
+        if table is None:
+            table = scoring.dd_table(self.deal)
+
+        return scoring.par(table, self.is_vulnerable("N"),
+                           self.is_vulnerable("E"))
+
+    def is_vulnerable(self, seat):
+        """ Whether the player in seat N, E, S or W is vulnerable. """
+        if seat in {"N", "S"}:
+            return self.vulnerability in {self.Vulnerability.All,
+                                          self.Vulnerability.Unfavourable}
+
+        return self.vulnerability in {self.Vulnerability.All,
+                                      self.Vulnerability.Favourable}
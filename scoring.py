@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 02:41:15 2026
+
+Duplicate bridge scoring from double dummy tables.
+
+A double dummy table is 20 trick counts, indexed by
+table_index(strain, declarer): strains in the order C, D, H, S, N and
+declarers in the order N, E, S, W.
+"""
+
+__author__ = "Andrew I McClement"
+
+from bisect import bisect_right
+
+STRAINS = "CDHSN"
+SEATS = "NESW"
+TABLE_SIZE = len(STRAINS) * len(SEATS)
+_SIDES = ("NS", "EW")
+# The least difference in score worth 1, 2, ... IMPs.
+_IMP_THRESHOLDS = (20, 50, 90, 130, 170, 220, 270, 320, 370, 430, 500, 600,
+                   750, 900, 1100, 1300, 1500, 1750, 2000, 2250, 2500, 3000,
+                   3500, 4000)
+
+
+def table_index(strain, declarer) -> int:
+    """ The index of a strain ("C" to "N") and declarer in a DD table. """
+    return STRAINS.index(strain.upper()) * len(SEATS) + SEATS.index(declarer)
+
+
+def dd_table(deal) -> bytes:
+    """ Solve the tricks for every strain and declarer of a redeal Deal. """
+    return bytes(deal.dd_tricks(f"1{strain}{seat}")
+                 for strain in STRAINS for seat in SEATS)
+
+
+def parse_contract(contract):
+    """ "4HXS" -> (4, "H", 1, "S"): level, strain, doubles, declarer. """
+    contract = contract.upper()
+    return (int(contract[0]), contract[1], contract.count("X"),
+            contract[-1])
+
+
+def contract_score(level, strain, tricks, vulnerable, doubled=0) -> int:
+    """
+    The score for declarer of a contract taking the given number of tricks.
+
+    doubled is 0, 1 or 2 for undoubled, doubled and redoubled.
+    """
+    multiplier = 2 ** doubled
+    overtricks = tricks - level - 6
+    if overtricks < 0:
+        undertricks = -overtricks
+        if not doubled:
+            return -undertricks * (100 if vulnerable else 50)
+
+        if vulnerable:
+            penalty = 200 + 300 * (undertricks - 1)
+        else:
+            penalty = (100 + 200 * min(undertricks - 1, 2)
+                       + 300 * max(undertricks - 3, 0))
+        return -penalty * multiplier // 2
+
+    trick_value = 20 if strain in "CD" else 30
+    contract_points = level * trick_value + (10 if strain == "N" else 0)
+    score = contract_points * multiplier
+    if contract_points * multiplier >= 100:
+        score += 500 if vulnerable else 300
+    else:
+        score += 50
+
+    if level == 6:
+        score += 750 if vulnerable else 500
+    elif level == 7:
+        score += 1500 if vulnerable else 1000
+
+    if doubled:
+        score += 50 * doubled
+        score += overtricks * (200 if vulnerable else 100) * multiplier // 2
+    else:
+        score += overtricks * (30 if strain == "N" else trick_value)
+
+    return score
+
+
+def imps(difference) -> int:
+    """ Convert a difference in score to International Match Points. """
+    gained = bisect_right(_IMP_THRESHOLDS, abs(difference))
+    return gained if difference >= 0 else -gained
+
+
+def dd_score(table, contract, vulnerable) -> int:
+    """ The score for declarer of a contract such as "3NS" or "4HXE". """
+    level, strain, doubled, declarer = parse_contract(contract)
+    tricks = table[table_index(strain, declarer)]
+    return contract_score(level, strain, tricks, vulnerable, doubled)
+
+
+def par(table, ns_vulnerable, ew_vulnerable):
+    """
+    The par score for North-South and the par contract, e.g. (-500, "4SXN").
+
+    An approximation: the contracts are walked in ascending order and each
+    side outbids the other whenever it gains by doing so, sacrificing
+    doubled if the contract fails. Returns (0, "P") if neither side should
+    bid.
+    """
+    vulnerable = {"NS": ns_vulnerable, "EW": ew_vulnerable}
+    best_score, best_contract = 0, "P"
+    for level in range(1, 8):
+        for strain in STRAINS:
+            for side in _SIDES:
+                tricks, declarer = max(
+                    (table[table_index(strain, seat)], seat) for seat in side)
+                doubled = int(tricks < level + 6)
+                score = contract_score(level, strain, tricks,
+                                       vulnerable[side], doubled)
+                ns_score = score if side == "NS" else -score
+                if (ns_score > best_score if side == "NS"
+                        else ns_score < best_score):
+                    best_score = ns_score
+                    best_contract = (f"{level}{strain}{'X' * doubled}"
+                                     f"{declarer}")
+                    # The other side may only outbid at a higher contract.
+                    break
+
+    return best_score, best_contract
@@ -3,9 +3,9 @@
 All methods must be lower case.
 """
 
-from practice_bidding.redeal.redeal import Evaluator
+from practice_bidding.suit_tables import SuitTable, playing_tricks
 
-HCP = Evaluator(4, 3, 2, 1)
+HCP = SuitTable.from_values(4, 3, 2, 1)
 
 
 def hcp(hand):
@@ -15,4 +15,24 @@ def hcp(hand):
 
 def tricks(hand):
     """ Get the playing tricks for a hand. """
-    return hand.pt
+    return playing_tricks(hand)
+
+
+def spades(hand):
+    """ The number of spades in a hand. """
+    return len(hand.spades)
+
+
+def hearts(hand):
+    """ The number of hearts in a hand. """
+    return len(hand.hearts)
+
+
+def diamonds(hand):
+    """ The number of diamonds in a hand. """
+    return len(hand.diamonds)
+
+
+def clubs(hand):
+    """ The number of clubs in a hand. """
+    return len(hand.clubs)
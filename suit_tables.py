@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:12:44 2026
+
+Lookup tables over 13-bit suit holdings.
+
+There are only 2 ** 13 == 8192 possible holdings in a suit, so any evaluation
+which is a sum over the suits of a hand can be tabulated once per holding.
+Evaluating a hand is then four table reads.
+"""
+
+__author__ = "Andrew I McClement"
+
+from fractions import Fraction
+from math import gcd
+
+from practice_bidding.redeal.redeal.global_defs import Rank
+
+HOLDING_COUNT = 1 << 13
+
+# Highest rank first, matching the argument order of redeal's Evaluator.
+_RANKS = sorted(Rank, reverse=True)
+_RANK_BITS = {rank: 1 << (len(_RANKS) - 1 - i)
+              for i, rank in enumerate(_RANKS)}
+# Holdings are immutable and there are at most 8192 of them.
+_MASKS = {}
+
+
+def holding_mask(holding) -> int:
+    """ The 13-bit mask of a holding, with the ace as the highest bit. """
+    try:
+        return _MASKS[holding]
+    except KeyError:
+        mask = 0
+        for rank in holding:
+            mask |= _RANK_BITS[rank]
+
+        _MASKS[holding] = mask
+        return mask
+
+
+def hand_masks(hand) -> tuple:
+    """ The masks of the holdings of a hand, in the order spades to clubs."""
+    return tuple(holding_mask(holding) for holding in hand)
+
+
+def _lcm(a, b):
+    return a * b // gcd(a, b)
+
+
+class SuitTable:
+    """
+    An evaluator with the value of every holding precomputed.
+
+    Values are stored as integers multiplied by self.scale, so fractional
+    point counts such as (4.5, 3, 1.5, 0.75, 0.25) are represented exactly.
+    """
+
+    def __init__(self, table, scale=1, description=None):
+        assert len(table) == HOLDING_COUNT
+        self._table = table
+        self.scale = scale
+        self._description = description or "SuitTable"
+
+    @classmethod
+    def from_values(cls, *values):
+        """
+        Create a table with the same semantics as redeal's Evaluator, i.e.
+        values[0] for the ace, values[1] for the king and so on.
+        """
+        assert len(values) <= len(_RANKS)
+        fractions = [Fraction(str(value)) for value in values]
+        scale = 1
+        for fraction in fractions:
+            scale = _lcm(scale, fraction.denominator)
+
+        rank_values = [int(fraction * scale) for fraction in fractions]
+        # Build the table incrementally: the value of a holding is the
+        # value of its highest card plus the value of the rest.
+        table = [0] * HOLDING_COUNT
+        for mask in range(1, HOLDING_COUNT):
+            highest_bit = mask.bit_length() - 1
+            index = len(_RANKS) - 1 - highest_bit
+            card_value = rank_values[index] if index < len(rank_values) else 0
+            table[mask] = card_value + table[mask ^ (1 << highest_bit)]
+
+        description = f"SuitTable{tuple(values)}"
+        return cls(table, scale, description)
+
+    def scaled(self, hand) -> int:
+        """ The value of the hand multiplied by self.scale. """
+        table = self._table
+        return sum(table[holding_mask(holding)] for holding in hand)
+
+    def holding_value(self, holding):
+        """ The value of a single holding. """
+        return self._unscale(self._table[holding_mask(holding)])
+
+    def _unscale(self, value):
+        return value if self.scale == 1 else value / self.scale
+
+    def __call__(self, hand):
+        return self._unscale(self.scaled(hand))
+
+    def __repr__(self):
+        return self._description
+
+
+# Filled on demand from redeal's own definition of playing tricks.
+_PLAYING_TRICKS = [None] * HOLDING_COUNT
+
+
+def holding_playing_tricks(holding):
+    """ The number of playing tricks in a holding. """
+    mask = holding_mask(holding)
+    tricks = _PLAYING_TRICKS[mask]
+    if tricks is None:
+        tricks = _PLAYING_TRICKS[mask] = holding.pt
+
+    return tricks
+
+
+def playing_tricks(hand):
+    """ The number of playing tricks in a hand. """
+    return sum(holding_playing_tricks(holding) for holding in hand)
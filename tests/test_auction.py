@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 06:14:37 2026
+"""
+
+__author__ = "Andrew I McClement"
+
+import random
+import unittest
+
+from practice_bidding.auction import Auction, pack_auctions, unpack_auctions
+from practice_bidding.calls import CALLS, DOUBLE, PASS, REDOUBLE, call_code
+from practice_bidding.practice_bidding_main import DEFAULT_XML_SOURCE
+from practice_bidding.redeal.redeal import Deal
+from practice_bidding.robot_bidding import BiddingProgram
+from practice_bidding.xml_parsing.xml_parser import XmlReaderForFile
+
+
+def _random_auction(rng):
+    auction = Auction(rng.randrange(4))
+    while not auction.is_complete:
+        legal = [code for code in range(len(CALLS)) if auction.is_legal(code)]
+        # Mostly pass, so auctions end.
+        auction.add(PASS if rng.random() < 0.5 else rng.choice(legal))
+
+    return auction
+
+
+class AuctionTests(unittest.TestCase):
+
+    def test_passed_out(self):
+        auction = Auction.from_values(["P"] * 3)
+        self.assertFalse(auction.is_complete)
+        auction.add(PASS)
+        self.assertTrue(auction.is_complete)
+        self.assertEqual(auction.contract(), "P")
+        self.assertIsNone(auction.declarer)
+        self.assertFalse(auction.is_legal(PASS))
+
+    def test_legality(self):
+        auction = Auction.from_values(["P"])
+        self.assertFalse(auction.is_legal(DOUBLE))
+        self.assertFalse(auction.is_legal(REDOUBLE))
+        auction.add(call_code("1h"))
+        self.assertFalse(auction.is_legal(call_code("1d")))
+        self.assertFalse(auction.is_legal(call_code("1h")))
+        self.assertTrue(auction.is_legal(call_code("1s")))
+        self.assertFalse(auction.is_legal(REDOUBLE))
+        auction.add(DOUBLE)
+        self.assertFalse(auction.is_legal(DOUBLE))
+        self.assertTrue(auction.is_legal(REDOUBLE))
+        auction.add(PASS)
+        # Only the doubled side may redouble.
+        self.assertFalse(auction.is_legal(DOUBLE))
+        self.assertFalse(auction.is_legal(REDOUBLE))
+        with self.assertRaises(ValueError):
+            auction.add(call_code("1c"))
+
+    def test_contract(self):
+        # East deals: E 1h, S X, W XX, N 1s, E 2h, S P, W P, N P.
+        auction = Auction.from_values(
+            ["1h", "X", "XX", "1s", "2h", "P", "P", "P"], dealer=1)
+        self.assertTrue(auction.is_complete)
+        self.assertEqual(auction.contract(), "2HE")
+        auction = Auction.from_values(
+            ["1h", "X", "P", "2c", "X", "XX", "P", "P", "P"], dealer=1)
+        self.assertEqual(auction.contract(), "2CXXN")
+        # North bid hearts first, South bid them last.
+        auction = Auction.from_values(
+            ["1h", "1s", "2h", "P", "P", "P"], dealer=0)
+        self.assertEqual(auction.contract(), "2HN")
+
+    def test_has_bid(self):
+        auction = Auction.from_values(["P", "1c", "X"], dealer=3)
+        self.assertTrue(auction.has_bid(0))
+        self.assertTrue(auction.has_bid(2))
+        # Doubling is not bidding.
+        self.assertFalse(auction.has_bid(1))
+        self.assertFalse(auction.has_bid(3))
+
+    def test_pack(self):
+        rng = random.Random(4)
+        auctions = [_random_auction(rng) for _ in range(200)]
+        packed = pack_auctions(auctions)
+        self.assertEqual(len(packed),
+                         sum(len(auction) + 1 for auction in auctions))
+        self.assertEqual(list(unpack_auctions(packed)), auctions)
+        with self.assertRaises(ValueError):
+            list(unpack_auctions(packed[:-1]))
+        with self.assertRaises(ValueError):
+            pack_auctions([Auction()])
+
+
+class ProgramAuctionTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._bids = XmlReaderForFile(DEFAULT_XML_SOURCE).get_bids_from_xml()
+
+    def test_program_keeps_auction(self):
+        program = BiddingProgram()
+        program.set_opening_bids(self._bids)
+        program.set_east_west_bids(self._bids)
+        program.set_mode(BiddingProgram.ProgramMode.Automatic)
+        for board in range(1, 21):
+            program.set_deal(Deal.prepare({})(), board)
+            while not program.is_passed_out(program.bidding_sequence):
+                program.bid()
+                self.assertEqual(
+                    program.auction, Auction.from_values(
+                        (bid.value for bid in program.bidding_sequence),
+                        (board - 1) % 4))
+
+            self.assertTrue(program.auction.is_complete)
+            self.assertEqual(program.get_contract(),
+                             program.get_contract(
+                                 list(program.bidding_sequence)))
+
+    def test_user_may_double(self):
+        program = BiddingProgram()
+        program.set_opening_bids(self._bids)
+        # Board 3: South deals, with nothing to double.
+        program.set_deal(Deal.prepare({})(), 3)
+        with self.assertRaises(KeyError):
+            program.make_user_bid("X")
+
+        # Board 2: East deals.
+        program.set_deal(Deal.prepare({})(), 2)
+        program.bidding_sequence.append(self._bids["1c"])
+        program.make_user_bid("X")
+        self.assertEqual(program.bidding_sequence[-1].value, "X")
+        for _ in range(3):
+            program.bidding_sequence.append(BiddingProgram._pass)
+
+        self.assertEqual(program.get_contract(), "1CXE")
+
+
+if __name__ == "__main__":
+    unittest.main()
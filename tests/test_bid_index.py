@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 02:06:37 2026
+"""
+
+__author__ = "Andrew I McClement"
+
+import math
+import os
+import tempfile
+import unittest
+
+from practice_bidding.analysis.bid_index import BidIndex
+from practice_bidding.analysis.deal_corpus import CorpusEvaluator, DealCorpus
+from practice_bidding.analysis.deal_corpus import write_corpus
+from practice_bidding.practice_bidding_main import DEFAULT_XML_SOURCE
+from practice_bidding.xml_parsing.conditions import AndCondition
+from practice_bidding.xml_parsing.conditions import EvaluationCondition
+from practice_bidding.xml_parsing.xml_parser import XmlReaderForFile
+
+
+class BidIndexTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._directory = tempfile.TemporaryDirectory()
+        path = os.path.join(cls._directory.name, "deals.corpus")
+        write_corpus(path, 40)
+        cls._corpus = DealCorpus.load(path)
+        cls._reader = XmlReaderForFile(DEFAULT_XML_SOURCE)
+        cls._bids = cls._reader.get_bids_from_xml()
+        cls._index = BidIndex.build(cls._bids, CorpusEvaluator(cls._corpus),
+                                    cls._reader.formulas)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls._corpus
+        cls._directory.cleanup()
+
+    def _accepting_deals(self, bid, seat):
+        return {i for i in range(len(self._corpus))
+                if bid.accept(self._corpus.hand(4 * i + seat))}
+
+    def _deal_set(self, bitmap):
+        return {i for i in range(len(self._corpus)) if bitmap >> i & 1}
+
+    def test_deals(self):
+        one_spade = self._bids["1s"]
+        two_notrump = one_spade.children["2n"]
+        south, north = 2, 0
+        self.assertEqual(self._deal_set(self._index.deals("1s")),
+                         self._accepting_deals(one_spade, south))
+        self.assertEqual(self._deal_set(self._index.deals("1s 2n", "N")),
+                         self._accepting_deals(one_spade, south)
+                         & self._accepting_deals(two_notrump, north))
+
+    def test_save_and_load(self):
+        path = os.path.join(self._directory.name, "bids.index")
+        self._index.save(path)
+        loaded = BidIndex.load(path)
+        self.assertEqual(loaded.sequences, self._index.sequences)
+        for sequence in ("1c", "1s 2n", "1n 2c 2d"):
+            self.assertEqual(loaded.hands(sequence),
+                             self._index.hands(sequence))
+
+    def test_incremental_rebuild(self):
+        evaluator = CorpusEvaluator(self._corpus)
+        bids = XmlReaderForFile(DEFAULT_XML_SOURCE).get_bids_from_xml()
+        unchanged = BidIndex.build(bids, evaluator, self._reader.formulas,
+                                   previous=self._index)
+        self.assertEqual(unchanged.evaluated, 0)
+
+        bids["1s"].condition = AndCondition([EvaluationCondition(
+            self._reader.formulas.hcp, 37, math.inf, "hcp")])
+        changed = BidIndex.build(bids, evaluator, self._reader.formulas,
+                                 previous=self._index)
+        self.assertEqual(changed.evaluated, 1)
+        self.assertEqual(changed.deals("1s"), 0)
+        self.assertEqual(changed.hands("1c"), self._index.hands("1c"))
+
+    def test_dealer(self):
+        opening = max(self._bids, key=lambda value: bin(
+            self._index.deals(value)).count("1"))
+        deals = self._deal_set(self._index.deals(opening))
+        dealer = self._index.dealer(self._corpus, opening)
+        expected = {str(self._corpus.deal(i).south) for i in deals}
+        for _ in range(len(deals) + 1):
+            self.assertIn(str(dealer().south), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 21:20:45 2026
+"""
+
+__author__ = "Andrew I McClement"
+
+import unittest
+
+from practice_bidding.analysis.bid_map import BidMapper
+from practice_bidding.practice_bidding_main import DEFAULT_XML_SOURCE
+from practice_bidding.redeal.redeal import Deal
+from practice_bidding.xml_parsing.xml_parser import XmlReaderForFile
+
+
+class BidMapTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        reader = XmlReaderForFile(DEFAULT_XML_SOURCE)
+        cls._bids = reader.get_bids_from_xml()
+        cls._mapper = BidMapper(cls._bids)
+        dealer = Deal.prepare({})
+        cls._hands = [hand for _ in range(10) for hand in dealer()]
+
+    def _expected(self, hand, node, children, depth, max_depth, result):
+        if max_depth is not None and depth >= max_depth:
+            return
+
+        result[node] = [bid for bid in children.values() if bid.accept(hand)]
+        for bid in children.values():
+            self._expected(hand, bid, bid.children, depth + 1, max_depth,
+                           result)
+
+    def test_matches_node_by_node_evaluation(self):
+        for max_depth in (None, 1, 3):
+            for hand in self._hands:
+                with self.subTest(max_depth=max_depth, hand=str(hand)):
+                    expected = {}
+                    self._expected(hand, None, self._bids, 0, max_depth,
+                                   expected)
+                    self.assertEqual(
+                        self._mapper.accepted_bids(hand, max_depth=max_depth),
+                        expected)
+
+    def test_start_from_bid(self):
+        hand = self._hands[0]
+        one_club = self._bids["1c"]
+        result = self._mapper.accepted_bids(hand, one_club, max_depth=1)
+        self.assertEqual(list(result), [one_club])
+        self.assertEqual(result[one_club],
+                         [bid for bid in one_club.children.values()
+                          if bid.accept(hand)])
+
+    def test_shape_results_are_shared(self):
+        for hand in self._hands:
+            self._mapper.accepted_bids(hand)
+
+        shapes = {tuple(hand.shape) for hand in self._hands}
+        self.assertEqual(set(self._mapper._shape_results), shapes)
+
+
+if __name__ == "__main__":
+    unittest.main()
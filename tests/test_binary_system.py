@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 06:03:55 2026
+"""
+
+__author__ = "Andrew I McClement"
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from practice_bidding.analysis.bid_index import condition_fingerprint
+from practice_bidding.practice_bidding_main import DEFAULT_XML_SOURCE
+from practice_bidding.redeal.redeal import Deal, Hand
+from practice_bidding.xml_parsing.binary_system import BinarySystem
+from practice_bidding.xml_parsing.binary_system import write_system
+from practice_bidding.xml_parsing.xml_parser import XmlReaderForFile
+
+
+def _all_bids(bids):
+    for bid in bids.values():
+        yield bid
+        yield from _all_bids(bid.children)
+
+
+class BinarySystemTests(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def _round_trip(self, xml_source):
+        reader = XmlReaderForFile(xml_source)
+        bids = reader.get_bids_from_xml()
+        path = os.path.join(self._directory.name, "system.pbsy")
+        write_system(path, bids, reader.formulas)
+        return bids, path
+
+    def test_round_trip(self):
+        directory = os.path.dirname(DEFAULT_XML_SOURCE)
+        hands = [hand for _ in range(20) for hand in Deal.prepare({})()]
+        for name in ("chimaera.xml", "acol.xml"):
+            with self.subTest(system=name):
+                bids, path = self._round_trip(os.path.join(directory, name))
+                system = BinarySystem.load(path)
+                self.assertEqual(system.formulas.attributes,
+                                 XmlReaderForFile(os.path.join(
+                                     directory, name)).formulas.attributes)
+                decoded = list(_all_bids(system.opening_bids))
+                original = list(_all_bids(bids))
+                self.assertEqual(len(decoded), len(original))
+                for bid, decoded_bid in zip(original, decoded):
+                    self.assertEqual(
+                        (bid.value, bid.description, bid.id),
+                        (decoded_bid.value, decoded_bid.description,
+                         decoded_bid.id))
+                    self.assertEqual(
+                        condition_fingerprint(bid.condition),
+                        condition_fingerprint(decoded_bid.condition))
+                    self.assertEqual([bid.accept(hand) for hand in hands],
+                                     [decoded_bid.accept(hand)
+                                      for hand in hands])
+
+                # Writing the decoded system again changes nothing.
+                copy = os.path.join(self._directory.name, "copy.pbsy")
+                write_system(copy, system.opening_bids, system.formulas,
+                             system.formula_source)
+                with open(path, "rb") as file, open(copy, "rb") as copied:
+                    self.assertEqual(file.read(), copied.read())
+
+    def test_lazy_loading(self):
+        _, path = self._round_trip(DEFAULT_XML_SOURCE)
+        with mock.patch("importlib.util.spec_from_file_location",
+                        side_effect=AssertionError("Module imported.")), \
+                mock.patch("xml.etree.ElementTree.parse",
+                           side_effect=AssertionError("XML parsed.")):
+            system = BinarySystem.load(path)
+            self.assertIn("2c", system.opening_bids)
+            self.assertEqual(system.opening_bids._bids, {})
+
+            one_club = system.opening_bids["1c"]
+            self.assertEqual(list(system.opening_bids._bids), ["1c"])
+            self.assertIs(system.opening_bids["1c"], one_club)
+            self.assertIs(one_club.children["1d"].parent, one_club)
+            self.assertTrue(one_club.accept(
+                Hand.from_str("AKQJ AKQ AKQ AKQ")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 09:06:48 2026
+"""
+
+__author__ = "Andrew I McClement"
+
+import json
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+from practice_bidding.analysis import simulation
+from practice_bidding.analysis.checkpoint import Checkpoint
+from practice_bidding.analysis.deal_corpus import write_corpus
+from practice_bidding.analysis.pipeline import PipelineError
+from practice_bidding.analysis.simulation import run_simulation
+from practice_bidding.analysis.simulation import SimulationTotals
+from practice_bidding.practice_bidding_main import DEFAULT_XML_SOURCE
+from practice_bidding.redeal.redeal import Deal
+
+
+class _Interrupt(Exception):
+    pass
+
+
+def _interrupt_after(calls, function):
+    """ function, raising _Interrupt once it has been called calls times. """
+    remaining = [calls]
+
+    def interrupted(*args):
+        if not remaining[0]:
+            raise _Interrupt
+        remaining[0] -= 1
+        return function(*args)
+
+    return interrupted
+
+
+class CheckpointTests(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self._directory.name, name)
+
+    def _read(self, name):
+        with open(self._path(name), "rb") as file:
+            return file.read()
+
+    def test_resume(self):
+        path = self._path("run.checkpoint")
+        checkpoint = Checkpoint.resume(path, {"boards": 10})
+        self.assertEqual(checkpoint.shards, 0)
+        checkpoint.save(3, totals=[1, 2])
+
+        resumed = Checkpoint.resume(path, {"boards": 10})
+        self.assertEqual((resumed.seed, resumed.shards, resumed.state),
+                         (checkpoint.seed, 3, {"totals": [1, 2]}))
+        with self.assertRaises(ValueError):
+            Checkpoint.resume(path, {"boards": 11})
+        with self.assertRaises(ValueError):
+            Checkpoint.resume(path, {"boards": 10}, checkpoint.seed + 1)
+
+        resumed.remove()
+        self.assertFalse(os.path.exists(path))
+
+    def test_simulation(self):
+        kwargs = {"processes": 0, "shard_size": 4, "seed": 5}
+        expected_totals = SimulationTotals()
+        run_simulation(DEFAULT_XML_SOURCE, 30, self._path("expected.csv"),
+                       totals=expected_totals, **kwargs)
+
+        output_path = self._path("boards.csv")
+        checkpoint_path = self._path("boards.checkpoint")
+        with mock.patch.object(simulation, "_score_shard", _interrupt_after(
+                5, simulation._score_shard)):
+            with self.assertRaises(PipelineError) as raised:
+                run_simulation(DEFAULT_XML_SOURCE, 30, output_path,
+                               checkpoint_path=checkpoint_path,
+                               checkpoint_every=2, **kwargs)
+        self.assertIsInstance(raised.exception.__cause__, _Interrupt)
+
+        with open(checkpoint_path, encoding="utf-8") as file:
+            self.assertEqual(json.load(file)["shards"], 4)
+        totals = SimulationTotals()
+        written = run_simulation(DEFAULT_XML_SOURCE, 30, output_path,
+                                 checkpoint_path=checkpoint_path,
+                                 checkpoint_every=2, totals=totals, **kwargs)
+        self.assertEqual(written, 30)
+        self.assertEqual(totals.as_dict(), expected_totals.as_dict())
+        self.assertEqual(self._read("boards.csv"), self._read("expected.csv"))
+        self.assertFalse(os.path.exists(checkpoint_path))
+
+    def test_caller_random_state_kept(self):
+        state = random.getstate()
+        write_corpus(self._path("deals.corpus"), 12, chunk_size=5, seed=3)
+        self.assertEqual(random.getstate(), state)
+
+        # The caller's random numbers do not depend on the seed of the run.
+        draws = []
+        for caller_seed in range(2):
+            random.seed(caller_seed)
+            run_simulation(DEFAULT_XML_SOURCE, 8, self._path("boards.csv"),
+                           processes=0, shard_size=4, seed=5)
+            draws.append(random.random())
+        self.assertNotEqual(draws[0], draws[1])
+
+    def test_corpus(self):
+        write_corpus(self._path("expected.corpus"), 45, chunk_size=10,
+                     seed=3)
+
+        checkpoint_path = self._path("deals.checkpoint")
+        with self.assertRaises(_Interrupt):
+            write_corpus(self._path("deals.corpus"), 45,
+                         _interrupt_after(25, Deal.prepare({})),
+                         chunk_size=10, seed=3,
+                         checkpoint_path=checkpoint_path)
+
+        write_corpus(self._path("deals.corpus"), 45, chunk_size=10, seed=3,
+                     checkpoint_path=checkpoint_path)
+        self.assertEqual(self._read("deals.corpus"),
+                         self._read("expected.corpus"))
+        self.assertFalse(os.path.exists(checkpoint_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 05:31:12 2026
+"""
+
+__author__ = "Andrew I McClement"
+
+import os
+import unittest
+
+from practice_bidding.analysis.bid_map import BidMapper
+from practice_bidding.analysis.team_match import play_match
+from practice_bidding.calls import call_code, is_bid
+from practice_bidding.practice_bidding_main import DEFAULT_XML_SOURCE
+from practice_bidding.redeal.redeal import Deal
+from practice_bidding.robot_bidding import BiddingProgram, Bid
+from practice_bidding.scoring import imps
+from practice_bidding.xml_parsing.xml_parser import XmlReaderForFile
+
+ACOL = os.path.join(os.path.dirname(DEFAULT_XML_SOURCE), "acol.xml")
+
+
+def _walk(bids):
+    for bid in bids.values():
+        yield bid
+        yield from _walk(bid.children)
+
+
+class CompetitiveBiddingTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._chimaera_bids = XmlReaderForFile(
+            DEFAULT_XML_SOURCE).get_bids_from_xml()
+        cls._acol_bids = XmlReaderForFile(ACOL).get_bids_from_xml()
+
+    def setUp(self):
+        self._program = BiddingProgram()
+        self._program.set_opening_bids(self._chimaera_bids)
+        self._program.set_east_west_bids(self._acol_bids)
+        self._program.set_mode(BiddingProgram.ProgramMode.Automatic)
+
+    def test_auctions_are_legal(self):
+        east_west_bid = False
+        for board in range(1, 41):
+            self._program.set_deal(Deal.prepare({})(), board)
+            while not self._program.is_passed_out(
+                    self._program.bidding_sequence):
+                self._program.bid()
+
+            codes = [call_code(bid.value)
+                     for bid in self._program.bidding_sequence]
+            bids = [code for code in codes if is_bid(code)]
+            self.assertEqual(bids, sorted(set(bids)))
+            east_west_bid |= any(
+                is_bid(code) for i, code in enumerate(codes)
+                if self._program._bidder(i).name in {"East", "West"})
+
+            contract = self._program.get_contract()
+            if contract != "P":
+                self.assertEqual(self._program.get_double_dummy_result(
+                    contract)[0], self._program.deal.dd_tricks(contract))
+
+        self.assertTrue(east_west_bid)
+
+    def test_overcalls_are_sufficient(self):
+        # Board 1: North deals.
+        self._program.set_deal(Deal.prepare({})(), 1)
+        self._program.bidding_sequence.append(self._chimaera_bids["1c"])
+        potential_bids = self._program.potential_bids
+        self.assertNotIn("1c", potential_bids)
+        self.assertTrue(set(potential_bids) <= set(self._acol_bids))
+        self.assertTrue(all(
+            call_code(value) > call_code("1c") for value in potential_bids
+            if is_bid(call_code(value))))
+
+    def test_no_system_bids_after_partner_passes(self):
+        pass_ = BiddingProgram._pass
+        self._program.set_deal(Deal.prepare({})(), 1)
+        self._program.bidding_sequence.extend(
+            [self._chimaera_bids["1c"], self._acol_bids["1h"], pass_, pass_])
+        self.assertEqual(self._program.potential_bids, {})
+
+    def test_east_west_declarer(self):
+        pass_ = BiddingProgram._pass
+        one_club = Bid("1c", "", [])
+        one_heart = Bid("1h", "", [])
+        two_hearts = Bid("2h", "", [])
+        self._program.set_deal(Deal.prepare({})(), 1)
+        sequence = [one_club, one_heart, pass_, two_hearts] + [pass_] * 3
+        self.assertEqual(self._program.get_contract(sequence), "2HE")
+        sequence = [pass_, pass_, one_club, one_heart, pass_, two_hearts,
+                    pass_, pass_, pass_]
+        # West bid hearts first: East only raised.
+        self.assertEqual(self._program.get_contract(sequence), "2HW")
+
+    def test_east_west_silent_without_system(self):
+        self._program.set_east_west_bids(None)
+        self._program.set_deal(Deal.prepare({})(), 2)
+        self._program.bid()
+        self.assertEqual(self._program.bidding_sequence[0].value, "P")
+
+
+class SharedFeatureTests(unittest.TestCase):
+
+    def test_matches_bid_accept(self):
+        chimaera = XmlReaderForFile(DEFAULT_XML_SOURCE).get_bids_from_xml()
+        acol = XmlReaderForFile(ACOL).get_bids_from_xml()
+        mapper = BidMapper({})
+        bids = list(_walk(chimaera)) + list(_walk(acol))
+        for _ in range(3):
+            for hand in Deal.prepare({})():
+                for bid in bids:
+                    self.assertEqual(mapper.accept(bid, hand),
+                                     bid.accept(hand))
+
+                # The features of a hand are extracted once for every bid
+                # of both systems.
+                self.assertIs(mapper._features(hand), mapper._features(hand))
+
+    def test_replaced_condition_is_recompiled(self):
+        bids = XmlReaderForFile(DEFAULT_XML_SOURCE).get_bids_from_xml()
+        mapper = BidMapper(bids)
+        one_club = bids["1c"]
+        hands = [hand for _ in range(5) for hand in Deal.prepare({})()]
+        for hand in hands:
+            mapper.accept(one_club, hand)
+
+        one_club.condition = bids["1d"].condition
+        one_club.compile()
+        for hand in hands:
+            self.assertEqual(mapper.accept(one_club, hand),
+                             bids["1d"].accept(hand))
+
+
+class CompetitiveMatchTests(unittest.TestCase):
+
+    def test_competitive_match(self):
+        boards = list(play_match(DEFAULT_XML_SOURCE, ACOL, 12, processes=0,
+                                 seed=5, competitive=True))
+        self.assertEqual([board.board for board in boards],
+                         list(range(1, 13)))
+        for board in boards:
+            self.assertEqual(board.imps,
+                             imps(board.scores[0] - board.scores[1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 20:14:06 2026
+"""
+
+__author__ = "Andrew I McClement"
+
+import gc
+import linecache
+import os
+import unittest
+from unittest import mock
+
+from practice_bidding.practice_bidding_main import DEFAULT_XML_SOURCE
+from practice_bidding.redeal.redeal import Deal
+from practice_bidding.xml_parsing import compiled_conditions
+from practice_bidding.xml_parsing.compiled_conditions import compile_condition
+from practice_bidding.xml_parsing.conditions import AndCondition, OrCondition
+from practice_bidding.xml_parsing.conditions import NotCondition
+from practice_bidding.xml_parsing.xml_parser import XmlReaderForFile
+
+
+def _all_bids(bids):
+    for bid in bids.values():
+        yield bid
+        yield from _all_bids(bid.children)
+
+
+class CompiledConditionTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        dealer = Deal.prepare({})
+        cls._hands = [hand for _ in range(10) for hand in dealer()]
+
+    def test_matches_condition_objects(self):
+        directory = os.path.dirname(DEFAULT_XML_SOURCE)
+        for name in ("acol.xml", "chimaera.xml"):
+            reader = XmlReaderForFile(os.path.join(directory, name))
+            bids = list(_all_bids(reader.get_bids_from_xml()))
+            for hand in self._hands:
+                with self.subTest(system=name, hand=str(hand)):
+                    self.assertEqual(
+                        [bid.accept(hand) for bid in bids],
+                        [bid.condition.accept(hand) for bid in bids])
+
+    def test_empty_conditions(self):
+        hand = self._hands[0]
+        self.assertTrue(compile_condition(AndCondition())(hand))
+        self.assertFalse(compile_condition(OrCondition())(hand))
+        self.assertTrue(
+            compile_condition(NotCondition(OrCondition()))(hand))
+
+    def test_source_is_kept(self):
+        accept = compile_condition(AndCondition([OrCondition()]))
+        self.assertIn("def accept(hand", accept.source)
+        self.assertIn("(False)", accept.source)
+
+    def test_linecache_not_kept(self):
+        accept = compile_condition(AndCondition())
+        filename = accept.__code__.co_filename
+        self.assertNotIn(filename, linecache.cache)
+
+        with mock.patch.object(compiled_conditions, "REGISTER_SOURCE", True):
+            accept = compile_condition(AndCondition())
+        filename = accept.__code__.co_filename
+        self.assertEqual(linecache.getlines(filename),
+                         accept.source.splitlines(True))
+        del accept
+        gc.collect()
+        self.assertNotIn(filename, linecache.cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
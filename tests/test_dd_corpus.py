@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 03:31:52 2026
+"""
+
+__author__ = "Andrew I McClement"
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from practice_bidding.analysis.dd_corpus import DDCorpus, UNSOLVED
+from practice_bidding.analysis.dd_corpus import build_dd_tables, dd_path_for
+from practice_bidding.analysis.deal_corpus import DealCorpus, write_corpus
+from practice_bidding.redeal.redeal import Deal
+from practice_bidding.robot_bidding import BiddingProgram
+from practice_bidding import scoring
+
+
+class DDCorpusTests(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._directory.name, "deals.corpus")
+        write_corpus(self._path, 9)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def _check_tables(self):
+        corpus = DealCorpus.load(self._path)
+        dd_corpus = DDCorpus.load(self._path)
+        for i in range(len(corpus)):
+            self.assertEqual(dd_corpus.table(i),
+                             scoring.dd_table(corpus.deal(i)))
+
+    def test_build_and_resume(self):
+        self.assertEqual(build_dd_tables(self._path, processes=0,
+                                         chunk_size=2), 9)
+        self._check_tables()
+        self.assertEqual(build_dd_tables(self._path, processes=0), 0)
+
+        # As if the build had been interrupted before solving two deals.
+        with open(dd_path_for(self._path), "r+b") as file:
+            for i in (3, 8):
+                file.seek(-scoring.TABLE_SIZE * (9 - i), os.SEEK_END)
+                file.write(bytes([UNSOLVED]) * scoring.TABLE_SIZE)
+
+        dd_corpus = DDCorpus.load(self._path)
+        self.assertFalse(dd_corpus.solved(3))
+        with self.assertRaises(ValueError):
+            dd_corpus.table(8)
+
+        self.assertEqual(build_dd_tables(self._path, processes=2,
+                                         chunk_size=1), 2)
+        self._check_tables()
+
+    def test_practice_without_solver(self):
+        build_dd_tables(self._path, processes=0)
+        dd_corpus = DDCorpus.load(self._path)
+        program = BiddingProgram(dd_corpus.dealer())
+        with mock.patch.object(Deal, "dd_tricks",
+                               side_effect=AssertionError("Solver called.")):
+            for board in range(1, 5):
+                table = dd_corpus.table(board - 1)
+                self.assertEqual(program.get_double_dummy_result("3NS"),
+                                 (table[scoring.table_index("N", "S")],
+                                  scoring.dd_score(
+                                      table, "3NS",
+                                      program.is_vulnerable("S"))))
+                self.assertEqual(program.get_par_result(), scoring.par(
+                    table, program.is_vulnerable("N"),
+                    program.is_vulnerable("E")))
+                self.assertEqual(str(program.get_hand()),
+                                 str(dd_corpus.corpus.deal(board - 1).south))
+                program.generate_new_deal()
+
+
+if __name__ == "__main__":
+    unittest.main()
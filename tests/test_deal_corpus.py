@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 00:58:03 2026
+"""
+
+__author__ = "Andrew I McClement"
+
+import os
+import tempfile
+import unittest
+
+from practice_bidding.analysis.deal_corpus import CorpusEvaluator, DealCorpus
+from practice_bidding.analysis.deal_corpus import hand_features, iter_bits
+from practice_bidding.analysis.deal_corpus import write_corpus
+from practice_bidding.practice_bidding_main import DEFAULT_XML_SOURCE
+from practice_bidding.redeal.redeal import Deal
+from practice_bidding.xml_parsing.xml_parser import XmlReaderForFile
+
+
+def _all_bids(bids):
+    for bid in bids.values():
+        yield bid
+        yield from _all_bids(bid.children)
+
+
+class DealCorpusTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        dealer = Deal.prepare({})
+        cls._deals = [dealer() for _ in range(25)]
+        cls._directory = tempfile.TemporaryDirectory()
+        cls._path = os.path.join(cls._directory.name, "deals.corpus")
+        deals = iter(cls._deals)
+        # A small chunk size checks that chunks are placed correctly.
+        write_corpus(cls._path, len(cls._deals), lambda: next(deals),
+                     chunk_size=7)
+        cls._corpus = DealCorpus.load(cls._path)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls._corpus
+        cls._directory.cleanup()
+
+    def test_hands_and_features(self):
+        self.assertEqual(len(self._corpus), len(self._deals))
+        columns = ("shape", "hcp", "chimaera_hcp", "freakness", "tricks")
+        for i, deal in enumerate(self._deals):
+            self.assertEqual(str(self._corpus.deal(i).south), str(deal.south))
+            for seat, hand in enumerate(deal):
+                hand_id = 4 * i + seat
+                self.assertEqual(str(self._corpus.hand(hand_id)), str(hand))
+                self.assertEqual(
+                    tuple(self._corpus.column(name)[hand_id]
+                          for name in columns),
+                    hand_features(hand))
+
+        self.assertEqual(self._corpus.feature("tricks", 2),
+                         hand_features(self._deals[0][2])[-1] / 2)
+
+    def test_dealer(self):
+        dealer = self._corpus.dealer(start=len(self._deals) - 1)
+        self.assertEqual(str(dealer().north), str(self._deals[-1].north))
+        self.assertEqual(str(dealer().north), str(self._deals[0].north))
+
+    def test_evaluator_matches_accept(self):
+        reader = XmlReaderForFile(DEFAULT_XML_SOURCE)
+        evaluator = CorpusEvaluator(self._corpus)
+        hands = [hand for deal in self._deals for hand in deal]
+        for bid in _all_bids(reader.get_bids_from_xml()):
+            with self.subTest(bid=bid.value, description=bid.description):
+                self.assertEqual(
+                    sorted(map(evaluator.hand_id, iter_bits(
+                        evaluator.accepted(bid.condition)))),
+                    [i for i, hand in enumerate(hands) if bid.accept(hand)])
+
+    def test_seats(self):
+        evaluator = CorpusEvaluator(self._corpus)
+        south = evaluator.seat_hands("S")
+        self.assertEqual(sorted(map(evaluator.hand_id, iter_bits(south))),
+                         list(range(2, self._corpus.hand_count, 4)))
+        self.assertEqual(evaluator.seat_deals(south, "S"),
+                         (1 << len(self._corpus)) - 1)
+        self.assertEqual(evaluator.seat_deals(south, "N"), 0)
+        for hand_id in range(self._corpus.hand_count):
+            self.assertEqual(evaluator.hand_id(evaluator.bit(hand_id)),
+                             hand_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
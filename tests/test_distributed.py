@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 09:57:40 2026
+"""
+
+__author__ = "Andrew I McClement"
+
+import multiprocessing
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from practice_bidding.analysis.distributed import Coordinator
+from practice_bidding.analysis.distributed import receive_message
+from practice_bidding.analysis.distributed import run_worker, send_message
+from practice_bidding.analysis.simulation import simulate, SimulationTotals
+from practice_bidding.practice_bidding_main import DEFAULT_XML_SOURCE
+from practice_bidding.xml_parsing.binary_system import convert, EXTENSION
+
+_HOST = "127.0.0.1"
+
+
+def _lost_worker(port):
+    """ Take a shard, then disconnect without simulating it. """
+    with socket.create_connection((_HOST, port)) as connection:
+        send_message(connection, {"type": "hello"})
+        receive_message(connection)
+        receive_message(connection)
+
+
+class DistributedTests(unittest.TestCase):
+
+    def test_merged_totals(self):
+        expected = SimulationTotals()
+        for record in simulate(DEFAULT_XML_SOURCE, 40, processes=0,
+                               shard_size=4, seed=9):
+            expected.add(record)
+
+        coordinator = Coordinator(DEFAULT_XML_SOURCE, 40, shard_size=4,
+                                  seed=9, host=_HOST, port=0,
+                                  shard_timeout=60)
+        port = coordinator.address[1]
+        results = []
+        runner = threading.Thread(
+            target=lambda: results.append(coordinator.run(timeout=120)))
+        runner.start()
+
+        lost = multiprocessing.Process(target=_lost_worker, args=(port,))
+        lost.start()
+        lost.join()
+
+        workers = [multiprocessing.Process(target=run_worker,
+                                           args=(_HOST, port))
+                   for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        runner.join()
+        for worker in workers:
+            worker.join(30)
+
+        self.assertEqual(results[0].as_dict(), expected.as_dict())
+        self.assertEqual(coordinator.reissued, 1)
+        self.assertEqual(sorted(coordinator.results), list(range(10)))
+        self.assertEqual([worker.exitcode for worker in workers], [0] * 3)
+
+    def test_binary_system(self):
+        expected = SimulationTotals()
+        for record in simulate(DEFAULT_XML_SOURCE, 12, processes=0,
+                               shard_size=4, seed=4):
+            expected.add(record)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "system" + EXTENSION)
+            convert(DEFAULT_XML_SOURCE, path)
+            coordinator = Coordinator(path, 12, shard_size=4, seed=4,
+                                      host=_HOST, port=0)
+            worker = multiprocessing.Process(
+                target=run_worker, args=(_HOST, coordinator.address[1]))
+            worker.start()
+            totals = coordinator.run(timeout=120)
+            worker.join(30)
+
+        self.assertEqual(totals.as_dict(), expected.as_dict())
+
+    def test_message_round_trip(self):
+        first, second = socket.socketpair()
+        with first, second:
+            send_message(first, {"type": "shard", "shard": 3})
+            self.assertEqual(receive_message(second),
+                             {"type": "shard", "shard": 3})
+            first.close()
+            self.assertIsNone(receive_message(second))
+
+
+if __name__ == "__main__":
+    unittest.main()
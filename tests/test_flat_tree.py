@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 18:40:57 2026
+"""
+
+__author__ = "Andrew I McClement"
+
+import os
+import tempfile
+import unittest
+
+from practice_bidding.practice_bidding_main import DEFAULT_XML_SOURCE
+from practice_bidding.redeal.redeal import Deal
+from practice_bidding.robot_bidding import BiddingProgram
+from practice_bidding.xml_parsing.flat_tree import FlatBidTree
+from practice_bidding.xml_parsing.flat_tree import write_flat_tree
+from practice_bidding.xml_parsing.xml_parser import XmlReaderForFile
+
+
+def _all_bids(bids):
+    for bid in bids.values():
+        yield bid
+        yield from _all_bids(bid.children)
+
+
+class FlatTreeTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        directory = os.path.dirname(DEFAULT_XML_SOURCE)
+        cls._systems = {}
+        for name in ("acol.xml", "chimaera.xml"):
+            reader = XmlReaderForFile(os.path.join(directory, name))
+            cls._systems[name] = (reader, reader.get_bids_from_xml())
+
+        dealer = Deal.prepare({})
+        cls._hands = [hand for _ in range(10) for hand in dealer()]
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def _flatten(self, name):
+        reader, bids = self._systems[name]
+        path = os.path.join(self._directory.name, "system.pbft")
+        write_flat_tree(path, bids, reader.formulas)
+        return bids, FlatBidTree.load(path)
+
+    def test_structure_round_trips(self):
+        for name in self._systems:
+            with self.subTest(system=name):
+                bids, tree = self._flatten(name)
+                flat_bids = list(_all_bids(tree.opening_bids))
+                original_bids = list(_all_bids(bids))
+                self.assertEqual(len(tree), len(original_bids))
+                # Same bids in the same order, depth first.
+                for flat_bid, bid in zip(flat_bids, original_bids):
+                    self.assertEqual(flat_bid.value, bid.value)
+                    self.assertEqual(flat_bid.description, bid.description)
+                    self.assertEqual(flat_bid.suit, bid.suit)
+                    self.assertEqual(list(flat_bid.children),
+                                     list(bid.children))
+
+    def test_accept_matches_bid_objects(self):
+        for name in self._systems:
+            bids, tree = self._flatten(name)
+            pairs = list(zip(_all_bids(tree.opening_bids), _all_bids(bids)))
+            for hand in self._hands:
+                with self.subTest(system=name, hand=str(hand)):
+                    self.assertEqual(
+                        [flat_bid.accept(hand) for flat_bid, _ in pairs],
+                        [bid.accept(hand) for _, bid in pairs])
+
+    def test_program_bids_from_flat_tree(self):
+        _, tree = self._flatten("chimaera.xml")
+        program = BiddingProgram()
+        program.set_opening_bids(tree.opening_bids)
+        program.set_mode(BiddingProgram.ProgramMode.Automatic)
+        for _ in range(8):
+            while not program.is_passed_out(program.bidding_sequence):
+                program.bid()
+            program.get_contract()
+            program.generate_new_deal()
+
+
+if __name__ == "__main__":
+    unittest.main()
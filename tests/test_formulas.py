@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 10:31:09 2026
+"""
+
+__author__ = "Andrew I McClement"
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from practice_bidding.analysis.bid_map import BidMapper
+from practice_bidding.example_systems import chimaera_evaluation_methods
+from practice_bidding.redeal.redeal import Deal
+from practice_bidding.xml_parsing.binary_system import BinarySystem
+from practice_bidding.xml_parsing.binary_system import write_system
+from practice_bidding.xml_parsing.xml_parser import XmlReaderForFile
+
+_SYSTEM = """<?xml version='1.0' encoding='utf-8'?>
+<openingBids hcp="chimaera" shape="freakiness" formulas="{formulas}">
+<bid id="0">
+  <value>1c</value>
+  <desc>Formulas</desc>
+  <and>
+    <formula>top_three_h + controls &gt;= 4</formula>
+    <formula>(spades + hearts) * 2 &gt; 15 - clubs</formula>
+  </and>
+  <bid id="00">
+    <value>1d</value>
+    <desc>Key cards</desc>
+    <condition type="include">
+      <formula>rkcb_s[0] == 1 or rkcb_s[0] == 4</formula>
+    </condition>
+  </bid>
+</bid>
+<bid id="1">
+  <value>1h</value>
+  <desc>Shared formula</desc>
+  <or>
+    <formula>top_three_h + controls &gt;= 4</formula>
+    <formula>not 3 &lt;= hcp &lt; 17.5</formula>
+  </or>
+</bid>
+</openingBids>
+"""
+
+
+def _expected(hand):
+    methods = chimaera_evaluation_methods
+    one_club = (methods.top_three_h(hand) + methods.controls(hand) >= 4
+                and (len(hand.spades) + len(hand.hearts)) * 2
+                > 15 - len(hand.clubs))
+    one_diamond = methods.rkcb_s(hand)[0] in {1, 4}
+    one_heart = (methods.top_three_h(hand) + methods.controls(hand) >= 4
+                 or not 3 <= methods.hcp(hand) < 17.5)
+    return one_club, one_diamond, one_heart
+
+
+class FormulaTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._directory = tempfile.TemporaryDirectory()
+        cls._path = os.path.join(cls._directory.name, "system.xml")
+        with open(cls._path, "w", encoding="utf-8") as file:
+            file.write(_SYSTEM.format(
+                formulas=chimaera_evaluation_methods.__file__))
+
+        cls._reader = XmlReaderForFile(cls._path)
+        cls._bids = cls._reader.get_bids_from_xml()
+        cls._hands = [hand for _ in range(100)
+                      for hand in Deal.prepare({})()]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._directory.cleanup()
+
+    def _accepted(self, bids, accept):
+        return [(accept(bids["1c"], hand),
+                 accept(bids["1c"].children["1d"], hand),
+                 accept(bids["1h"], hand)) for hand in self._hands]
+
+    def test_accept(self):
+        expected = list(map(_expected, self._hands))
+        # Every branch is taken.
+        self.assertEqual({len(set(column)) for column in zip(*expected)},
+                         {2})
+        self.assertEqual(self._accepted(
+            self._bids, lambda bid, hand: bid.accept(hand)), expected)
+        self.assertEqual(self._accepted(
+            self._bids, lambda bid, hand: bid.condition.accept(hand)),
+            expected)
+        mapper = BidMapper(self._bids)
+        self.assertEqual(self._accepted(self._bids, mapper.accept), expected)
+
+    def test_compiled_once(self):
+        bids = XmlReaderForFile(self._path).get_bids_from_xml()
+        with mock.patch("ast.parse",
+                        side_effect=AssertionError("Formula parsed.")):
+            self._accepted(bids, BidMapper(bids).accept)
+            self._accepted(bids, lambda bid, hand: bid.accept(hand))
+
+    def test_shared(self):
+        one_club = self._bids["1c"].condition.conditions[0]
+        one_heart = self._bids["1h"].condition.conditions[0]
+        self.assertIs(one_club, one_heart)
+        self.assertEqual(one_club.info,
+                         "Formula: top_three_h + controls >= 4")
+
+    def test_invalid(self):
+        parser = self._reader.formula_parser
+        for text in ("hcp >=", "hcp + 3", "unknown >= 3",
+                     "__import__('os') == 0", "hand.spades > 3",
+                     "hcp(hand) > 3", "hcp > 'a'", "hcp ** 2 > 3",
+                     "hcp in (1, 2)", "rkcb_s[hcp] > 1", "[hcp] == [1]",
+                     "hcp > 3 if True else False", "hcp / spades > 1",
+                     "hcp[0] > 1", "rkcb_s > 1", "rkcb_s[2] > 1",
+                     "rkcb_s[0.5] > 1", "hcp > True"):
+            with self.subTest(formula=text):
+                with self.assertRaises(ValueError):
+                    parser.parse(text)
+
+    def test_binary_system(self):
+        path = os.path.join(self._directory.name, "system.pbsy")
+        write_system(path, self._bids, self._reader.formulas)
+        bids = BinarySystem.load(path).opening_bids
+        self.assertEqual(
+            self._accepted(bids, lambda bid, hand: bid.accept(hand)),
+            list(map(_expected, self._hands)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 05:02:18 2026
+"""
+
+__author__ = "Andrew I McClement"
+
+import os
+import shutil
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+from practice_bidding.analysis.bid_index import BidIndex
+from practice_bidding.analysis.bid_map import BidMapper
+from practice_bidding.analysis.deal_corpus import CorpusEvaluator, DealCorpus
+from practice_bidding.analysis.deal_corpus import write_corpus
+from practice_bidding.practice_bidding_main import DEFAULT_XML_SOURCE
+from practice_bidding.robot_bidding import BiddingProgram
+from practice_bidding.xml_parsing.hot_reload import SystemWatcher
+from practice_bidding.xml_parsing.hot_reload import bid_hashes
+from practice_bidding.xml_parsing.xml_parser import XmlReaderForFile
+
+
+def _all_bids(bids):
+    for bid in bids.values():
+        yield bid
+        yield from _all_bids(bid.children)
+
+
+class HotReloadTests(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        source_directory = os.path.dirname(DEFAULT_XML_SOURCE)
+        for name in ("chimaera.xml", "chimaera_evaluation_methods.py"):
+            shutil.copy(os.path.join(source_directory, name),
+                        self._directory.name)
+
+        self._path = os.path.join(self._directory.name, "chimaera.xml")
+        self._tree = ET.parse(self._path)
+        self._watcher = SystemWatcher(self._path)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def _xml_bid(self, id_):
+        return next(xml_bid for xml_bid in self._tree.iter("bid")
+                    if xml_bid.get("id") == id_)
+
+    def _edit(self):
+        self._tree.write(self._path, encoding="utf-8")
+        return self._watcher.reload()
+
+    def test_bid_hashes(self):
+        hashes = bid_hashes(self._tree.getroot().findall("bid"))
+        own, subtree, children = hashes["0", "1c"]
+        self._xml_bid("000").find("desc").text = "Changed."
+        changed = bid_hashes(self._tree.getroot().findall("bid"))
+        changed_children = changed["0", "1c"][2]
+        self.assertEqual(changed["0", "1c"][0], own)
+        self.assertNotEqual(changed["0", "1c"][1], subtree)
+        self.assertEqual(changed_children["00", "1d"][0],
+                         children["00", "1d"][0])
+        self.assertNotEqual(changed_children["00", "1d"][2]["000", "1h"][0],
+                            children["00", "1d"][2]["000", "1h"][0])
+        self.assertEqual(changed_children["01", "1h"],
+                         children["01", "1h"])
+
+    def test_unchanged(self):
+        bids = list(_all_bids(self._watcher.opening_bids))
+        result = self._edit()
+        self.assertEqual(result, ([], [], [], False))
+        self.assertEqual([id(bid) for bid in bids],
+                         [id(bid) for bid in
+                          _all_bids(self._watcher.opening_bids)])
+
+    def test_changed_condition(self):
+        one_club = self._watcher.opening_bids["1c"]
+        one_diamond = one_club.children["1d"]
+        program = BiddingProgram()
+        program.set_opening_bids(self._watcher.opening_bids)
+        program.set_mode(BiddingProgram.ProgramMode.Automatic)
+        program.bid()
+
+        minimum = self._xml_bid("0").find("condition/evaluation/hcp/min")
+        minimum.text = "37"
+        result = self._edit()
+        self.assertEqual(result.changed, [one_club])
+        self.assertFalse(result.added or result.removed or result.full)
+        self.assertIs(self._watcher.opening_bids["1c"], one_club)
+        self.assertIs(one_club.children["1d"], one_diamond)
+        self.assertFalse(any(one_club.accept(program.get_hand(seat))
+                             for seat in program.Players))
+        # The session carries on with the updated system.
+        while not program.is_passed_out(program.bidding_sequence):
+            program.bid()
+
+    def test_added_and_removed(self):
+        one_club = self._watcher.opening_bids["1c"]
+        xml_one_club = self._xml_bid("0")
+        xml_one_club.remove(self._xml_bid("00"))
+        self._xml_bid("01").find("value").text = "7n"
+        result = self._edit()
+        self.assertEqual([bid.value for bid in result.removed], ["1d", "1h"])
+        self.assertEqual([bid.value for bid in result.added], ["7n"])
+        self.assertEqual(result.changed, [])
+        self.assertNotIn("1d", one_club.children)
+        self.assertNotIn("1h", one_club.children)
+        seven_notrump = one_club.children["7n"]
+        self.assertIs(seven_notrump.parent, one_club)
+        self.assertEqual(
+            len(list(_all_bids(seven_notrump.children))),
+            len(list(_all_bids(result.removed[1].children))))
+
+    def test_interner_released(self):
+        conditions = self._watcher._reader.conditions
+        minimum = self._xml_bid("0").find("condition/evaluation/hcp/min")
+        self._xml_bid("0").remove(self._xml_bid("01"))
+        for text in ("12", "13", "14"):
+            minimum.text = text
+            self._edit()
+
+        fresh = XmlReaderForFile(self._path)
+        fresh_bids = fresh.get_bids_from_xml()
+        # As many conditions, as often used, as in a fresh read.
+        self.assertEqual(len(conditions), len(fresh.conditions))
+        for bid, fresh_bid in zip(_all_bids(self._watcher.opening_bids),
+                                  _all_bids(fresh_bids)):
+            self.assertEqual(conditions.uses(bid.condition),
+                             fresh.conditions.uses(fresh_bid.condition))
+            self.assertEqual(bid._accept.source, fresh_bid._accept.source)
+
+    def test_full_reload(self):
+        self._tree.getroot().set("shape", "other")
+        old = list(self._watcher.opening_bids.values())
+        bids = self._watcher.opening_bids
+        result = self._edit()
+        self.assertTrue(result.full)
+        self.assertEqual(result.removed, old)
+        self.assertIs(self._watcher.opening_bids, bids)
+        self.assertEqual(list(bids), [bid.value for bid in old])
+
+    def test_poll(self):
+        self.assertIsNone(self._watcher.poll())
+        self._xml_bid("00").find("desc").text = "Changed."
+        self._tree.write(self._path, encoding="utf-8")
+        stat = os.stat(self._path)
+        os.utime(self._path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        result = self._watcher.poll()
+        self.assertEqual([bid.id for bid in result.changed], ["00"])
+        self.assertEqual(
+            self._watcher.opening_bids["1c"].children["1d"].description,
+            "Changed.")
+        self.assertIsNone(self._watcher.poll())
+
+    def test_caches_updated(self):
+        corpus_path = os.path.join(self._directory.name, "deals.corpus")
+        write_corpus(corpus_path, 30)
+        corpus = DealCorpus.load(corpus_path)
+        evaluator = CorpusEvaluator(corpus)
+        formulas = self._watcher._reader.formulas
+        bids = self._watcher.opening_bids
+        mapper = BidMapper(bids)
+        index = BidIndex.build(bids, evaluator, formulas)
+        self._watcher.add_listener(mapper.update)
+        self._watcher.add_listener(
+            lambda result: index.update(result, evaluator, formulas))
+
+        self._xml_bid("0").find("condition/evaluation/hcp/min").text = "12"
+        self._xml_bid("0").remove(self._xml_bid("01"))
+        self._edit()
+        self.assertEqual(index.evaluated, 1)
+
+        fresh_index = BidIndex.build(bids, evaluator, formulas)
+        self.assertEqual(index.sequences, fresh_index.sequences)
+        for sequence in index.sequences:
+            self.assertEqual(index.hands(sequence),
+                             fresh_index.hands(sequence))
+
+        fresh_mapper = BidMapper(bids)
+        for hand_id in range(corpus.hand_count):
+            hand = corpus.hand(hand_id)
+            self.assertEqual(mapper.accepted_bids(hand),
+                             fresh_mapper.accepted_bids(hand))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 22:41:52 2026
+"""
+
+__author__ = "Andrew I McClement"
+
+import os
+import tempfile
+import unittest
+
+from practice_bidding.practice_bidding_main import DEFAULT_XML_SOURCE
+from practice_bidding.redeal.redeal import Deal
+from practice_bidding.xml_parsing.compiled_conditions import compile_condition
+from practice_bidding.xml_parsing.compiled_conditions import ConditionCompiler
+from practice_bidding.xml_parsing.conditions import AndCondition, OrCondition
+from practice_bidding.xml_parsing.conditions import NotCondition
+from practice_bidding.xml_parsing.conditions import ShapeCondition
+from practice_bidding.xml_parsing.conditions import ShapeConditionFactory
+from practice_bidding.xml_parsing.interning import ConditionInterner
+from practice_bidding.xml_parsing.xml_parser import XmlReaderForFile
+
+
+def _leaves(condition):
+    try:
+        children = condition.conditions
+    except AttributeError:
+        try:
+            children = [condition.condition]
+        except AttributeError:
+            yield condition
+            return
+
+    for child in children:
+        yield from _leaves(child)
+
+
+def _all_bids(bids):
+    for bid in bids.values():
+        yield bid
+        yield from _all_bids(bid.children)
+
+_SHARED = ("<or><shape type=\"general\">balanced</shape><evaluation><hcp>"
+           "<min>15</min><max>17</max></hcp></evaluation></or>")
+_SYSTEM = f"""<?xml version='1.0' encoding='utf-8'?>
+<openingBids hcp="standard" shape="standard">
+<bid id="0"><value>1c</value><desc>First</desc>{_SHARED}</bid>
+<bid id="1"><value>1d</value><desc>Second</desc>{_SHARED}</bid>
+</openingBids>
+"""
+
+
+class ConditionInternerTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        dealer = Deal.prepare({})
+        cls._hand = dealer().north
+
+    def test_system_leaves_are_shared(self):
+        reader = XmlReaderForFile(DEFAULT_XML_SOURCE)
+        bids = list(_all_bids(reader.get_bids_from_xml()))
+        leaves = {id(leaf): leaf for bid in bids
+                  for leaf in _leaves(bid.condition)}
+        infos = [leaf.info for leaf in leaves.values()]
+        self.assertEqual(len(infos), len(set(infos)))
+        self.assertLess(len(leaves),
+                        sum(reader.conditions.uses(leaf)
+                            for leaf in leaves.values()))
+
+    def test_first_use_is_memoized(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "system.xml")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(_SYSTEM)
+            reader = XmlReaderForFile(path)
+            bids = reader.get_bids_from_xml()
+
+        one_club, one_diamond = bids["1c"], bids["1d"]
+        self.assertIs(one_club.condition, one_diamond.condition)
+        self.assertTrue(reader.conditions.is_memoized(one_club.condition))
+        # Both bids, not only the second defined, share the remembered
+        # result.
+        self.assertEqual(one_club._accept.source, one_diamond._accept.source)
+        self.assertEqual(one_club._accept.__defaults__,
+                         one_diamond._accept.__defaults__)
+
+    def test_equal_structures_are_interned(self):
+        interner = ConditionInterner()
+
+        def balanced():
+            return interner.leaf(
+                ("general", "balanced"),
+                lambda: ShapeConditionFactory.create_general_shape_condition(
+                    "balanced"))
+
+        first = interner.intern(
+            AndCondition([NotCondition(balanced()), OrCondition()]))
+        second = interner.intern(
+            AndCondition([NotCondition(balanced()), OrCondition()]))
+        different = interner.intern(
+            OrCondition([NotCondition(balanced()), OrCondition()]))
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, different)
+        self.assertIs(first.conditions[0], different.conditions[0])
+        self.assertEqual(interner.uses(first), 2)
+        self.assertEqual(interner.uses(different), 1)
+
+    def test_release(self):
+        interner = ConditionInterner()
+
+        def condition():
+            return interner.intern(NotCondition(interner.leaf(
+                ("general", "balanced"),
+                lambda: ShapeConditionFactory.create_general_shape_condition(
+                    "balanced"))))
+
+        first, second = condition(), condition()
+        self.assertIs(first, second)
+        self.assertEqual(len(interner), 2)
+        self.assertEqual(interner.take_resharing([first]), {id(first)})
+        self.assertEqual(interner.take_resharing([first]), set())
+
+        interner.release(first)
+        self.assertEqual(interner.uses(first), 1)
+        self.assertEqual(interner.uses(first.condition), 1)
+        self.assertEqual(interner.take_resharing([first]), {id(first)})
+        interner.release(first)
+        self.assertEqual(interner.uses(first), 0)
+        self.assertEqual(len(interner), 0)
+
+    def test_shared_condition_is_evaluated_once_per_hand(self):
+        calls = []
+
+        def accept(hand):
+            calls.append(hand)
+            return True
+
+        interner = ConditionInterner()
+        shared = [interner.leaf(("formula", "slow"),
+                                lambda: ShapeCondition(accept, "slow"),
+                                worth_memoizing=True)
+                  for _ in range(10)]
+        accepts = [compile_condition(AndCondition([condition]),
+                                     ConditionCompiler(interner))
+                   for condition in shared]
+
+        self.assertTrue(interner.is_memoized(shared[0]))
+        self.assertTrue(all(accept(self._hand) for accept in accepts))
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
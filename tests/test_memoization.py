@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 12:05:51 2026
+"""
+
+__author__ = "Andrew I McClement"
+
+import unittest
+
+from practice_bidding.memoization import HandMemo, impure, memoize_per_hand
+from practice_bidding.memoization import clear_hand_caches, HANDS_PER_BOARD
+from practice_bidding.practice_bidding_main import DEFAULT_XML_SOURCE
+from practice_bidding.redeal.redeal import Deal
+from practice_bidding.xml_parsing.xml_parser import XmlReaderForFile
+
+
+class MemoizationTests(unittest.TestCase):
+
+    def setUp(self):
+        self._calls = []
+        self._deal = Deal.prepare({})()
+
+    def _count_shape(self, hand):
+        self._calls.append(hand)
+        return hand.shape
+
+    def test_memo_calls_function_once_per_hand(self):
+        memo = memoize_per_hand(self._count_shape)
+        for _ in range(3):
+            for hand in self._deal:
+                self.assertEqual(memo(hand), hand.shape)
+
+        self.assertEqual(len(self._calls), 4)
+
+    def test_memo_is_bounded(self):
+        memo = HandMemo(self._count_shape)
+        for _ in range(5):
+            for hand in Deal.prepare({})():
+                memo(hand)
+
+        self.assertLessEqual(len(memo._results), HANDS_PER_BOARD)
+
+    def test_clear_hand_caches(self):
+        memo = HandMemo(self._count_shape)
+        hand = self._deal.north
+        memo(hand)
+        clear_hand_caches()
+        memo(hand)
+        self.assertEqual(len(self._calls), 2)
+
+    def test_impure_functions_are_not_wrapped(self):
+        @impure
+        def random_value(hand):
+            return hand
+
+        self.assertIs(memoize_per_hand(random_value), random_value)
+
+    def test_reader_memoizes_formula_module(self):
+        reader = XmlReaderForFile(DEFAULT_XML_SOURCE)
+        tricks = reader._get_formula("tricks_s")
+        self.assertIsInstance(tricks, HandMemo)
+        self.assertIs(reader._get_formula("tricks_s"), tricks)
+
+
+if __name__ == "__main__":
+    unittest.main()
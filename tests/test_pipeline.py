@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 08:21:05 2026
+"""
+
+__author__ = "Andrew I McClement"
+
+import os
+import random
+import time
+import unittest
+
+from practice_bidding.analysis.pipeline import PipelineError, Stage
+from practice_bidding.analysis.pipeline import run_pipeline
+from practice_bidding.analysis.simulation import stage_workers, STAGES
+from practice_bidding.analysis.simulation import deal_pbn, pbn_deal
+from practice_bidding.redeal.redeal import Deal
+
+_offset = 0
+
+
+def _set_offset(offset):
+    global _offset
+    _offset = offset
+
+
+def _add_offset(item):
+    return item + _offset
+
+
+def _slow_square(item):
+    # Finish out of order.
+    time.sleep(random.random() / 100)
+    return item * item
+
+
+def _fail_on_three(item):
+    if item == 3:
+        raise ValueError("three")
+    return item
+
+
+def _exit_on_three(item):
+    if item == 3:
+        # As if killed, e.g. for lack of memory.
+        os._exit(1)
+    return item
+
+
+def _failing_source():
+    yield 1
+    raise ValueError("source")
+
+
+def _stages(workers):
+    return [Stage("offset", _add_offset, workers, _set_offset, (1,)),
+            Stage("square", _slow_square, 2 * workers)]
+
+
+class PipelineTests(unittest.TestCase):
+
+    def test_in_order(self):
+        expected = [(i + 1) ** 2 for i in range(40)]
+        self.assertEqual(list(run_pipeline(range(40), _stages(0))),
+                         expected)
+        self.assertEqual(list(run_pipeline(range(40), _stages(2),
+                                           queue_size=2)), expected)
+
+    def test_backpressure(self):
+        produced = []
+
+        def source():
+            for i in range(30):
+                produced.append(i)
+                yield i
+
+        for i, _ in enumerate(run_pipeline(source(), _stages(1),
+                                           max_pending=3)):
+            # The source is not read far ahead of the results.
+            self.assertLessEqual(len(produced), i + 4)
+
+        self.assertEqual(len(produced), 30)
+
+    def test_early_exit(self):
+        results = run_pipeline(range(1000), _stages(1))
+        self.assertEqual(next(results), 1)
+        results.close()
+
+    def test_failure(self):
+        for workers in (0, 1):
+            with self.subTest(workers=workers), \
+                    self.assertRaisesRegex(PipelineError, "Stage fail"):
+                list(run_pipeline(range(6), [
+                    Stage("fail", _fail_on_three, workers),
+                    Stage("square", _slow_square, workers)]))
+
+    def test_source_failure(self):
+        for workers in (0, 1):
+            with self.subTest(workers=workers), \
+                    self.assertRaisesRegex(PipelineError, "Stage source"):
+                list(run_pipeline(_failing_source(), _stages(workers)))
+
+    def test_worker_died(self):
+        with self.assertRaises(PipelineError):
+            list(run_pipeline(range(6), [Stage("exit", _exit_on_three),
+                                         Stage("square", _slow_square)]))
+
+    def test_stage_workers(self):
+        for processes in range(1, 20):
+            workers = stage_workers(processes)
+            self.assertEqual(tuple(workers), STAGES)
+            self.assertEqual(workers["dd"], max(workers.values()))
+            if processes >= 4:
+                self.assertEqual(sum(workers.values()), processes)
+
+    def test_pbn_deal(self):
+        deal = Deal.prepare({})()
+        self.assertEqual(deal_pbn(pbn_deal(deal_pbn(deal))), deal_pbn(deal))
+
+
+if __name__ == "__main__":
+    unittest.main()
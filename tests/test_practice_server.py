@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 15:48:09 2026
+"""
+
+__author__ = "Andrew I McClement"
+
+import asyncio
+import contextlib
+import io
+import json
+import unittest
+from unittest import mock
+
+from practice_bidding.practice_bidding_main import DEFAULT_XML_SOURCE
+from practice_bidding.practice_server import PracticeServer, HttpError
+from practice_bidding.practice_server import measure_session_memory
+from practice_bidding.xml_parsing.xml_parser import XmlReaderForFile
+
+
+class PracticeServerTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        reader = XmlReaderForFile(DEFAULT_XML_SOURCE)
+        cls._bids = reader.get_bids_from_xml()
+
+    def setUp(self):
+        self._loop = asyncio.new_event_loop()
+        self._server = PracticeServer(self._bids, max_sessions=2)
+
+    def tearDown(self):
+        self._loop.close()
+
+    def _dispatch(self, method, path, body=None):
+        return self._loop.run_until_complete(
+            self._server.dispatch(method, path, body or {}))
+
+    def test_play_boards(self):
+        status, state = self._dispatch("POST", "/sessions")
+        self.assertEqual(status, 201)
+        session = state["session"]
+
+        for _ in range(4):
+            while not state["finished"]:
+                _, state = self._dispatch("POST", f"/sessions/{session}/bid",
+                                          {"bid": "P"})
+
+            self.assertIn("contract", state)
+            _, result = self._dispatch("GET", f"/sessions/{session}/result")
+            self.assertEqual(result["contract"], state["contract"])
+            _, state = self._dispatch("POST", f"/sessions/{session}/next")
+
+    def test_sessions_share_one_bid_tree(self):
+        _, first = self._dispatch("POST", "/sessions")
+        _, second = self._dispatch("POST", "/sessions")
+        programs = [self._server.sessions[state["session"]]
+                    for state in (first, second)]
+        self.assertIs(programs[0]._root, programs[1]._root)
+        # And one BidMapper, so no per session memos to clear each board.
+        self.assertIs(programs[0]._board_state.bid_mapper,
+                      self._server.bid_mapper)
+        self.assertIs(programs[1]._board_state.bid_mapper,
+                      self._server.bid_mapper)
+
+        with self.assertRaises(HttpError):
+            self._dispatch("POST", "/sessions")
+
+        self._dispatch("DELETE", f"/sessions/{first['session']}")
+        self.assertEqual(len(self._server.sessions), 1)
+
+    def test_session_memory(self):
+        bid = next(iter(self._bids.values()))
+        self.assertFalse(hasattr(bid, "__dict__"))
+        self.assertFalse(hasattr(bid.condition, "__dict__"))
+
+        bytes_per_session = measure_session_memory(self._bids, 200)
+        self.assertGreater(bytes_per_session, 0)
+        self.assertLess(bytes_per_session, 16 * 1024)
+
+    def test_errors(self):
+        with self.assertRaises(HttpError):
+            self._dispatch("GET", "/sessions/unknown")
+
+        _, state = self._dispatch("POST", "/sessions")
+        if not state["finished"]:
+            with self.assertRaises(HttpError):
+                self._dispatch("POST", f"/sessions/{state['session']}/bid",
+                               {"bid": "8c"})
+
+    def test_unexpected_error(self):
+        with mock.patch.object(self._server, "dispatch",
+                               side_effect=RuntimeError("unexpected")), \
+                contextlib.redirect_stderr(io.StringIO()) as stderr:
+            status, payload = self._loop.run_until_complete(
+                self._server._respond("POST", "/sessions", b""))
+        self.assertEqual(status, 500)
+        self.assertIn("error", payload)
+        self.assertIn("RuntimeError", stderr.getvalue())
+
+    def test_http(self):
+        async def request():
+            tcp_server = await self._server.start(port=0)
+            port = tcp_server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"POST /sessions HTTP/1.1\r\n"
+                         b"Connection: close\r\n\r\n")
+            response = await reader.read()
+            writer.close()
+            tcp_server.close()
+            await tcp_server.wait_closed()
+            return response
+
+        response = self._loop.run_until_complete(request())
+        head, _, body = response.partition(b"\r\n\r\n")
+        self.assertTrue(head.startswith(b"HTTP/1.1 201"))
+        self.assertIn("session", json.loads(body.decode("utf-8")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 23:38:19 2026
+"""
+
+__author__ = "Andrew I McClement"
+
+import math
+import unittest
+
+from practice_bidding.practice_bidding_main import DEFAULT_XML_SOURCE
+from practice_bidding.redeal.redeal import Deal
+from practice_bidding.standard_formulas import HCP
+from practice_bidding.xml_parsing.conditions import AndCondition, Condition
+from practice_bidding.xml_parsing.conditions import EvaluationCondition
+from practice_bidding.xml_parsing.conditions import NotCondition, OrCondition
+from practice_bidding.xml_parsing.conditions import ShapeConditionFactory
+from practice_bidding.xml_parsing.reachability import find_unreachable_bids
+from practice_bidding.xml_parsing.reachability import prune_unreachable_bids
+from practice_bidding.xml_parsing.xml_parser import Bid, XmlReaderForFile
+
+
+def _hcp(minimum, maximum):
+    return EvaluationCondition(HCP, minimum, maximum, "hcp")
+
+
+def _length(suit, minimum, maximum=13):
+    return ShapeConditionFactory.create_suit_length_condition(
+        suit, minimum, maximum)
+
+
+def _include(*conditions):
+    # As the reader builds a legacy bid with a single include condition.
+    return AndCondition([OrCondition([Condition([], list(conditions))])])
+
+
+def _add_bid(parent, value, condition):
+    bid = Bid(value, value, condition)
+    bid.parent = parent
+    parent.children[value] = bid
+    return bid
+
+
+class ReachabilityTests(unittest.TestCase):
+
+    def setUp(self):
+        self._opening = Bid("1c", "1c", AndCondition([_hcp(11, 15)]))
+        self._bids = {"1c": self._opening}
+        self._response = _add_bid(self._opening, "1d",
+                                  AndCondition([_hcp(0, 5)]))
+
+    def test_conflict_with_earlier_call(self):
+        rebid = _add_bid(self._response, "2n",
+                         AndCondition([_hcp(18, math.inf)]))
+        # Responder's calls do not constrain opener's rebid.
+        _add_bid(self._response, "1n", AndCondition([_hcp(11, 15)]))
+        self.assertEqual(find_unreachable_bids(self._bids), [rebid])
+
+    def test_empty_shape_set(self):
+        impossible = _add_bid(
+            self._opening, "2c",
+            _include(_length("hearts", 7), _length("spades", 7)))
+        self.assertEqual(find_unreachable_bids(self._bids), [impossible])
+
+    def test_negated_conditions(self):
+        reachable = _add_bid(self._response, "1h",
+                             NotCondition(AndCondition([_hcp(12, 15)])))
+        unreachable = _add_bid(self._response, "1s",
+                               NotCondition(AndCondition([_hcp(0, 15)])))
+        self.assertEqual(find_unreachable_bids(self._bids), [unreachable])
+        self.assertNotIn(reachable, find_unreachable_bids(self._bids))
+
+    def test_prune(self):
+        rebid = _add_bid(self._response, "3n",
+                         AndCondition([_hcp(16, math.inf)]))
+        _add_bid(rebid, "4c", AndCondition())
+        self.assertEqual(prune_unreachable_bids(self._bids), [rebid])
+        self.assertEqual(list(self._response.children), [])
+        self.assertEqual(find_unreachable_bids(self._bids), [])
+
+    def test_system_unreachable_bids_accept_no_hand(self):
+        reader = XmlReaderForFile(DEFAULT_XML_SOURCE)
+        bids = reader.get_bids_from_xml(prune_unreachable=True)
+        self.assertTrue(reader.unreachable_bids)
+        self.assertEqual(find_unreachable_bids(bids), [])
+
+        dealer = Deal.prepare({})
+        hands = [hand for _ in range(200) for hand in dealer()]
+        for bid in reader.unreachable_bids:
+            own_bids = []
+            earlier_bid = bid
+            while earlier_bid:
+                own_bids.append(earlier_bid)
+                earlier_bid = (earlier_bid.parent.parent
+                               if earlier_bid.parent else None)
+
+            with self.subTest(bid=bid.value, description=bid.description):
+                self.assertFalse(any(
+                    all(own_bid.accept(hand) for own_bid in own_bids)
+                    for hand in hands))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 14:10:32 2026
+"""
+
+__author__ = "Andrew I McClement"
+
+import os
+import tempfile
+import unittest
+
+from practice_bidding.analysis.recorded_auctions import iter_pbn_records
+from practice_bidding.analysis.recorded_auctions import parse_pbn_record
+from practice_bidding.analysis.recorded_auctions import iter_lin_records
+from practice_bidding.analysis.recorded_auctions import parse_lin_record
+from practice_bidding.analysis.recorded_auctions import compare_records
+from practice_bidding.analysis.recorded_auctions import board_number_for
+from practice_bidding.analysis.recorded_auctions import first_divergence
+from practice_bidding.practice_bidding_main import DEFAULT_XML_SOURCE
+from practice_bidding.robot_bidding import BiddingProgram
+
+_PBN = """% A comment
+[Event "Club night"]
+[Board "3"]
+[Dealer "S"]
+[Vulnerable "EW"]
+[Deal "S:AKQ2.J54.T3.K987 J.AQ32.KQ98.AQT2 T987.K876.J7.J54 6543.T9.A6542.63"]
+[Auction "S"]
+1C Pass 1D {relay} Pass
+2C =1= Pass AP
+
+[Board "4"]
+[Dealer "W"]
+[Vulnerable "All"]
+[Deal "N:AKQ2.J54.T3.K987 J.AQ32.KQ98.AQT2 T987.K876.J7.J54 6543.T9.A6542.63"]
+[Auction "W"]
+AP
+"""
+
+_LIN = ("pn|a,b,c,d|st||md|3SAKQ2HJ54DT3CK987,SJHAQ32DKQ98CAQT2,"
+        "ST987HK876DJ7CJ54,|sv|n|ah|Board 2|mb|1C!|mb|p|mb|1N|mb|d|"
+        "mb|p|mb|p|mb|r|mb|p|mb|p|mb|p|pg||\n")
+
+_ANY_HAND = ("<and><evaluation><hcp><min>0</min><max>40</max></hcp>"
+             "</evaluation></and>")
+_SYSTEM = f"""<?xml version='1.0' encoding='utf-8'?>
+<openingBids hcp="standard" shape="standard">
+<bid id="0"><value>1c</value><desc>Any hand</desc>{_ANY_HAND}
+  <bid id="00"><value>1n</value><desc>Any hand</desc>{_ANY_HAND}</bid>
+</bid>
+</openingBids>
+"""
+
+
+class RecordedAuctionTests(unittest.TestCase):
+
+    def test_parse_pbn(self):
+        boards = [parse_pbn_record(record)
+                  for record in iter_pbn_records(_PBN.splitlines(True))]
+        self.assertEqual(len(boards), 2)
+
+        board = boards[0]
+        self.assertEqual(board.board, 3)
+        self.assertEqual(board.dealer, "S")
+        self.assertEqual(board.vulnerability, "EW")
+        self.assertEqual(board.hands["S"], "AKQ2 J54 T3 K987")
+        self.assertEqual(board.hands["N"], "T987 K876 J7 J54")
+        self.assertEqual(board.auction,
+                         ("1c", "P", "1d", "P", "2c", "P", "P", "P"))
+
+        self.assertEqual(boards[1].auction, ("P",) * 4)
+
+    def test_parse_lin(self):
+        records = list(iter_lin_records(_LIN.splitlines(True)))
+        self.assertEqual(len(records), 1)
+        board = parse_lin_record(records[0])
+        self.assertEqual(board.board, 2)
+        self.assertEqual(board.dealer, "N")
+        self.assertEqual(board.vulnerability, "NS")
+        self.assertEqual(board.hands["S"], "AKQ2 J54 T3 K987")
+        # East is implied by the other three hands.
+        self.assertEqual(board.hands["E"], "6543 T9 A6542 63")
+        self.assertEqual(board.auction, ("1c", "P", "1n", "X", "P", "P",
+                                         "XX", "P", "P", "P"))
+
+    def test_board_number_for(self):
+        for board_number in range(1, 17):
+            dealer = BiddingProgram.dealer_for(board_number).name[0]
+            vulnerability = {
+                BiddingProgram.Vulnerability.None_: "None",
+                BiddingProgram.Vulnerability.Unfavourable: "NS",
+                BiddingProgram.Vulnerability.Favourable: "EW",
+                BiddingProgram.Vulnerability.All: "All"}[
+                    BiddingProgram.vulnerability_for(board_number)]
+            with self.subTest(board_number=board_number):
+                self.assertEqual(board_number_for(dealer, vulnerability),
+                                 board_number)
+
+    def test_first_divergence(self):
+        self.assertIsNone(first_divergence(("1c", "P"), ("1c", "P")))
+        self.assertEqual(first_divergence(("1c", "P"), ("1d", "P")), 0)
+        self.assertEqual(first_divergence(("1c",), ("1c", "P")), 1)
+
+    def _check_comparisons(self, comparisons):
+        self.assertEqual([comparison.board for comparison in comparisons],
+                         [3, 4, 2])
+        for comparison in comparisons:
+            recorded, robot = comparison.recorded, comparison.robot
+            i = comparison.divergence
+            self.assertEqual(i, first_divergence(recorded, robot))
+            if i is None:
+                self.assertEqual(robot, recorded)
+                continue
+
+            # Only North-South's calls are the robot's, and the comparison
+            # stops at the first which differs.
+            self.assertEqual(len(robot), i + 1)
+            self.assertEqual(robot[:i], recorded[:i])
+            dealer = {3: "S", 4: "W", 2: "N"}[comparison.board]
+            self.assertIn("NESW"[("NESW".index(dealer) + i) % 4], "NS")
+
+    def _compare(self, processes):
+        pbn = compare_records(iter_pbn_records(_PBN.splitlines(True)),
+                              parse_pbn_record, DEFAULT_XML_SOURCE,
+                              processes)
+        lin = compare_records(iter_lin_records(_LIN.splitlines(True)),
+                              parse_lin_record, DEFAULT_XML_SOURCE,
+                              processes)
+        return list(pbn) + list(lin)
+
+    def test_compare_in_process(self):
+        self._check_comparisons(self._compare(processes=0))
+
+    def test_compare_in_pool(self):
+        self._check_comparisons(self._compare(processes=2))
+
+    def test_east_west_replayed(self):
+        # North opens 1c and South responds 1n with any hand, with no
+        # further bids. West's double is replayed, but South's redouble is
+        # not in the system.
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "system.xml")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(_SYSTEM)
+            comparison, = compare_records(
+                iter_lin_records(_LIN.splitlines(True)), parse_lin_record,
+                path, processes=0)
+
+        self.assertEqual(comparison.robot,
+                         ("1c", "P", "1n", "X", "P", "P", "P"))
+        self.assertEqual(comparison.divergence, 6)
+
+if __name__ == "__main__":
+    unittest.main()
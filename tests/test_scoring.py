@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 03:24:10 2026
+"""
+
+__author__ = "Andrew I McClement"
+
+import unittest
+
+from practice_bidding.scoring import TABLE_SIZE, contract_score, dd_score
+from practice_bidding.scoring import imps, par, table_index
+
+
+def _table(tricks):
+    """ tricks: {(strain, declarer): tricks}, 6 tricks elsewhere. """
+    table = bytearray([6] * TABLE_SIZE)
+    for (strain, declarer), value in tricks.items():
+        table[table_index(strain, declarer)] = value
+
+    return bytes(table)
+
+
+class ScoringTests(unittest.TestCase):
+
+    def test_contract_score(self):
+        cases = [((3, "N", 9, False), 400),
+                 ((4, "S", 11, True), 650),
+                 ((1, "C", 7, False, 2), 230),
+                 ((2, "H", 8, False, 1), 470),
+                 ((7, "N", 13, True), 2220),
+                 ((6, "D", 12, False), 920),
+                 ((4, "H", 9, False), -50),
+                 ((1, "N", 6, True, 1), -200),
+                 ((3, "S", 6, False, 1), -500),
+                 ((3, "S", 5, False, 1), -800),
+                 ((3, "S", 6, True, 2), -1600),
+                 ((1, "N", 9, True, 1), 580)]
+        for arguments, score in cases:
+            with self.subTest(arguments=arguments):
+                self.assertEqual(contract_score(*arguments), score)
+
+    def test_dd_score(self):
+        table = _table({("S", "N"): 10})
+        self.assertEqual(dd_score(table, "4SN", False), 420)
+        self.assertEqual(dd_score(table, "4SXS", False), -800)
+
+    def test_imps(self):
+        for difference, expected in ((0, 0), (10, 0), (20, 1), (-50, -2),
+                                     (420, 9), (-430, -10), (5000, 24)):
+            with self.subTest(difference=difference):
+                self.assertEqual(imps(difference), expected)
+
+    def test_par(self):
+        self.assertEqual(par(_table({}), False, False), (0, "P"))
+        self.assertEqual(par(_table({("S", "N"): 10}), False, False),
+                         (420, "4SN"))
+        # East-West save in 5h doubled against 4s.
+        table = _table({("S", "N"): 10, ("S", "S"): 10, ("H", "E"): 9,
+                        ("H", "W"): 8, ("S", "E"): 3, ("S", "W"): 3})
+        self.assertEqual(par(table, False, False), (300, "5HXE"))
+        # The save costs too much when East-West are vulnerable.
+        self.assertEqual(par(table, False, True), (420, "4SS"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 06:51:09 2026
+"""
+
+__author__ = "Andrew I McClement"
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+from practice_bidding.analysis.selection_benchmark import measure_selection
+from practice_bidding.practice_bidding_main import DEFAULT_XML_SOURCE
+from practice_bidding.redeal.redeal import Deal
+from practice_bidding.robot_bidding import BiddingProgram
+from practice_bidding.xml_parsing.binary_system import BinarySystem
+from practice_bidding.xml_parsing.binary_system import write_system
+from practice_bidding.xml_parsing.hot_reload import SystemWatcher
+from practice_bidding.xml_parsing.xml_parser import XmlReaderForFile
+from practice_bidding.xml_parsing.xml_parser import priority_order
+
+
+class PriorityTests(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        source_directory = os.path.dirname(DEFAULT_XML_SOURCE)
+        for name in ("chimaera.xml", "chimaera_evaluation_methods.py"):
+            shutil.copy(os.path.join(source_directory, name),
+                        self._directory.name)
+
+        self._path = os.path.join(self._directory.name, "chimaera.xml")
+        self._tree = ET.parse(self._path)
+        # Try 1d before the other responses to 1c.
+        self._one_diamond = next(xml_bid for xml_bid in self._tree.iter("bid")
+                                 if xml_bid.get("id") == "00")
+        self._one_diamond.set("priority", "1")
+        self._tree.write(self._path, encoding="utf-8")
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_priority_is_read(self):
+        reader = XmlReaderForFile(self._path)
+        bids = reader.get_bids_from_xml()
+        responses = bids["1c"].children
+        self.assertEqual(responses["1d"].priority, 1)
+        self.assertIsNone(responses["1h"].priority)
+        ordered = sorted(responses.values(), key=priority_order)
+        self.assertEqual(ordered[0], responses["1d"])
+        # The rest keep their order.
+        self.assertEqual(ordered[1:], [bid for bid in responses.values()
+                                       if bid is not responses["1d"]])
+
+        path = os.path.join(self._directory.name, "system.pbsy")
+        write_system(path, bids, reader.formulas)
+        decoded = BinarySystem.load(path).opening_bids["1c"].children
+        self.assertEqual({value: bid.priority
+                          for value, bid in decoded.items()},
+                         {value: bid.priority
+                          for value, bid in responses.items()})
+
+    def test_priority_reloaded(self):
+        watcher = SystemWatcher(self._path)
+        one_diamond = watcher.opening_bids["1c"].children["1d"]
+        self._one_diamond.set("priority", "3")
+        self._tree.write(self._path, encoding="utf-8")
+        result = watcher.reload()
+        self.assertIn(one_diamond, result.changed)
+        self.assertEqual(one_diamond.priority, 3)
+
+
+class SelectionTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._bids = XmlReaderForFile(DEFAULT_XML_SOURCE).get_bids_from_xml()
+
+    def test_first_accepted_bid(self):
+        program = BiddingProgram()
+        program.set_opening_bids(self._bids)
+        program.set_selection(BiddingProgram.SelectionMode.Priority)
+        for _ in range(40):
+            deal = Deal.prepare({})()
+            # North deals.
+            program.set_deal(deal, 1)
+            hand = deal.north
+            expected = next((bid for bid in self._bids.values()
+                             if bid.accept(hand)), BiddingProgram._pass)
+            self.assertIs(program._program_bid(hand), expected)
+            # Deterministic.
+            self.assertIs(program._program_bid(hand), expected)
+
+    def test_fewer_evaluations(self):
+        random_result, priority_result = measure_selection(self._bids, 100)
+        self.assertEqual(random_result.selection,
+                         BiddingProgram.SelectionMode.Random)
+        self.assertLess(priority_result.evaluations,
+                        random_result.evaluations)
+
+    def test_caller_random_state_kept(self):
+        state = random.getstate()
+        measure_selection(self._bids, 5)
+        self.assertEqual(random.getstate(), state)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 07:44:16 2026
+"""
+
+__author__ = "Andrew I McClement"
+
+import csv
+import importlib.util
+import os
+import tempfile
+import unittest
+
+from practice_bidding.analysis.results_sink import BoardRecord, CsvSink
+from practice_bidding.analysis.results_sink import FIELDS, open_sink
+from practice_bidding.analysis.simulation import deal_pbn, run_simulation
+from practice_bidding.analysis.simulation import simulate
+from practice_bidding.practice_bidding_main import DEFAULT_XML_SOURCE
+from practice_bidding.redeal.redeal import Deal
+from practice_bidding.scoring import contract_score, parse_contract
+
+_HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+def _record(board):
+    return BoardRecord(board, "N", "None", "N:...", "1c P P P", "1CN", 7,
+                       70, 12)
+
+
+class ResultsSinkTests(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self._directory.name, name)
+
+    def test_csv_chunks(self):
+        path = self._path("boards.csv")
+        with CsvSink(path, chunk_size=10) as sink:
+            for board in range(1, 10):
+                sink.write(_record(board))
+            # Nothing is written until a chunk is full.
+            self.assertEqual(sink.records_written, 0)
+            sink.write(_record(10))
+            self.assertEqual(sink.records_written, 10)
+            sink.write(_record(11))
+
+        self.assertEqual(sink.records_written, 11)
+        with open(path, newline="", encoding="utf-8") as file:
+            rows = list(csv.reader(file))
+
+        self.assertEqual(tuple(rows[0]), FIELDS)
+        self.assertEqual([int(row[0]) for row in rows[1:]],
+                         list(range(1, 12)))
+
+    def test_unknown_extension(self):
+        with self.assertRaises(ValueError):
+            open_sink(self._path("boards.txt"))
+
+    @unittest.skipUnless(_HAS_PYARROW, "pyarrow is not installed.")
+    def test_parquet(self):  # pragma: no cover
+        import pyarrow.parquet
+        path = self._path("boards.parquet")
+        records = [_record(board) for board in range(1, 26)]
+        records[3] = records[3]._replace(contract="P", tricks=None, score=0)
+        with open_sink(path, chunk_size=10) as sink:
+            for record in records:
+                sink.write(record)
+
+        table = pyarrow.parquet.read_table(path)
+        self.assertEqual(table.num_rows, 25)
+        self.assertEqual(table.column("tricks").to_pylist()[3], None)
+        self.assertEqual(pyarrow.parquet.ParquetFile(path).num_row_groups,
+                         3)
+
+
+class SimulationTests(unittest.TestCase):
+
+    def test_records(self):
+        records = list(simulate(DEFAULT_XML_SOURCE, 30, processes=0,
+                                shard_size=8, seed=2))
+        self.assertEqual([record.board for record in records],
+                         list(range(1, 31)))
+        for record in records:
+            calls = record.auction.split()
+            self.assertEqual(calls[-3:], ["P"] * 3)
+            self.assertGreater(record.nodes, 0)
+            if record.contract == "P":
+                self.assertIsNone(record.tricks)
+                self.assertEqual(record.score, 0)
+                continue
+
+            level, strain, doubled, declarer = parse_contract(
+                record.contract)
+            score = contract_score(level, strain, record.tricks,
+                                   record.vulnerability in {"All", "NS"}
+                                   if declarer in "NS" else
+                                   record.vulnerability in {"All", "EW"},
+                                   doubled)
+            self.assertEqual(record.score,
+                             score if declarer in "NS" else -score)
+
+        parallel = list(simulate(DEFAULT_XML_SOURCE, 30, processes=2,
+                                 shard_size=8, seed=2, max_pending=1))
+        self.assertEqual(parallel, records)
+
+    def test_run_simulation(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "boards.csv")
+            written = run_simulation(DEFAULT_XML_SOURCE, 12, path,
+                                     processes=0, seed=1,
+                                     east_west_source=DEFAULT_XML_SOURCE)
+            self.assertEqual(written, 12)
+            with open(path, newline="", encoding="utf-8") as file:
+                self.assertEqual(len(list(csv.DictReader(file))), 12)
+
+    def test_deal_pbn(self):
+        deal = Deal.prepare({})()
+        hands = deal_pbn(deal)[2:].split()
+        self.assertEqual(len(hands), 4)
+        self.assertEqual(sorted("".join(hands).replace(".", "")),
+                         sorted("AKQJT98765432" * 4))
+        for hand in hands:
+            self.assertEqual(len(hand.replace(".", "")), 13)
+
+
+if __name__ == "__main__":
+    unittest.main()
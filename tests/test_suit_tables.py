@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 10:02:17 2026
+"""
+
+__author__ = "Andrew I McClement"
+
+import unittest
+
+from practice_bidding.redeal.redeal import Deal, Evaluator, Hand
+from practice_bidding.suit_tables import SuitTable, HOLDING_COUNT
+from practice_bidding.suit_tables import hand_masks, playing_tricks
+from practice_bidding.xml_parsing.conditions import EvaluationCondition
+
+
+class SuitTableTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._hand = Hand.from_str("KQJ3 AK32 T5 J32")
+        dealer = Deal.prepare({})
+        cls._hands = [hand for _ in range(25) for hand in dealer()]
+
+    def test_matches_evaluator(self):
+        value_sets = [(4, 3, 2, 1), (4.5, 3, 1.5, 0.75, 0.25), (1,), (2, 1)]
+        for values in value_sets:
+            table = SuitTable.from_values(*values)
+            evaluator = Evaluator(*values)
+            for hand in self._hands:
+                with self.subTest(values=values, hand=str(hand)):
+                    self.assertAlmostEqual(table(hand), evaluator(hand))
+                    self.assertEqual(table.scaled(hand),
+                                     table(hand) * table.scale)
+
+    def test_chimaera_values_are_exact_integers(self):
+        table = SuitTable.from_values(4.5, 3, 1.5, 0.75, 0.25)
+        self.assertEqual(table.scale, 4)
+        # A + K + K + Q + J + J + T == 4.5 + 3*2 + 1.5 + 0.75*2 + 0.25
+        self.assertEqual(table.scaled(self._hand), 55)
+        self.assertEqual(table(self._hand), 13.75)
+
+    def test_masks_are_13_bit(self):
+        for hand in self._hands:
+            masks = hand_masks(hand)
+            self.assertEqual(len(masks), 4)
+            self.assertEqual(sum(bin(mask).count("1") for mask in masks), 13)
+            for mask in masks:
+                self.assertIn(mask, range(HOLDING_COUNT))
+
+    def test_playing_tricks(self):
+        for hand in self._hands:
+            with self.subTest(hand=str(hand)):
+                self.assertEqual(playing_tricks(hand), hand.pt)
+
+    def test_scaled_evaluation_condition_is_exact(self):
+        table = SuitTable.from_values(4.5, 3, 1.5, 0.75, 0.25)
+        self.assertTrue(EvaluationCondition(table, 13.75, 13.75)
+                        .accept(self._hand))
+        self.assertFalse(EvaluationCondition(table, 14, 20)
+                         .accept(self._hand))
+        self.assertFalse(EvaluationCondition(table, 0, 13.5)
+                         .accept(self._hand))
+
+
+if __name__ == "__main__":
+    unittest.main()
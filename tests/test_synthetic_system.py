@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 11:24:38 2026
+"""
+
+__author__ = "Andrew I McClement"
+
+import os
+import random
+import tempfile
+import unittest
+
+from practice_bidding.analysis.synthetic_system import CONDITION_TYPES
+from practice_bidding.analysis.synthetic_system import measure_scaling
+from practice_bidding.analysis.synthetic_system import write_system
+from practice_bidding.calls import call_code
+from practice_bidding.xml_parsing.xml_parser import XmlReaderForFile
+
+
+def _walk(bids, depth=1):
+    for bid in bids.values():
+        yield bid, depth
+        yield from _walk(bid.children, depth + 1)
+
+
+class SyntheticSystemTests(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self._directory.name, name)
+
+    def test_valid_system(self):
+        path = self._path("system.xml")
+        self.assertEqual(write_system(path, 500, depth=6, fan_out=3), 500)
+        bids = list(_walk(XmlReaderForFile(path).get_bids_from_xml()))
+        self.assertEqual(len(bids), 500)
+        self.assertEqual(max(depth for _, depth in bids), 6)
+        for bid, _ in bids:
+            self.assertLessEqual(len(bid.children), 3)
+            for child in bid.children.values():
+                # Every auction is legal.
+                self.assertGreater(call_code(child.value),
+                                   call_code(bid.value))
+
+    def test_condition_types(self):
+        elements = {"evaluation": "<evaluation>", "general": '"general"',
+                    "shape": '"shape"', "formula": "<formula>",
+                    "legacy": "<condition"}
+        for type_ in CONDITION_TYPES:
+            with self.subTest(type_=type_):
+                path = self._path(f"{type_}.xml")
+                write_system(path, 60, mix={type_: 1})
+                with open(path, encoding="utf-8") as file:
+                    self.assertIn(elements[type_], file.read())
+                self.assertEqual(
+                    len(list(_walk(XmlReaderForFile(
+                        path).get_bids_from_xml()))), 60)
+
+    def test_deterministic(self):
+        contents = []
+        for name in ("first.xml", "second.xml"):
+            write_system(self._path(name), 200, seed=3)
+            with open(self._path(name), encoding="utf-8") as file:
+                contents.append(file.read())
+
+        self.assertEqual(contents[0], contents[1])
+
+    def test_measure_scaling(self):
+        results = measure_scaling([20, 80], deals=5)
+        self.assertEqual([result.bids for result in results], [20, 80])
+        for result in results:
+            self.assertGreater(result.memory, 0)
+            self.assertGreater(result.bid_seconds, 0)
+
+    def test_caller_random_state_kept(self):
+        # The caller's random numbers do not depend on the seed given.
+        draws = []
+        for caller_seed in range(2):
+            random.seed(caller_seed)
+            measure_scaling([20], deals=2, seed=5)
+            draws.append(random.random())
+        self.assertNotEqual(draws[0], draws[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 04:10:46 2026
+"""
+
+__author__ = "Andrew I McClement"
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from practice_bidding.analysis.dd_corpus import build_dd_tables
+from practice_bidding.analysis.deal_corpus import write_corpus
+from practice_bidding.analysis.team_match import MatchResult, play_match
+from practice_bidding.analysis.team_match import normal_quantile
+from practice_bidding.practice_bidding_main import DEFAULT_XML_SOURCE
+from practice_bidding.redeal.redeal import Deal
+from practice_bidding.scoring import imps
+
+ACOL = os.path.join(os.path.dirname(DEFAULT_XML_SOURCE), "acol.xml")
+
+
+class TeamMatchTests(unittest.TestCase):
+
+    def test_match(self):
+        boards = list(play_match(DEFAULT_XML_SOURCE, ACOL, 20, processes=0,
+                                 chunk_size=6, seed=3))
+        self.assertEqual([board.board for board in boards],
+                         list(range(1, 21)))
+        for board in boards:
+            self.assertEqual(board.imps,
+                             imps(board.scores[0] - board.scores[1]))
+
+        parallel = list(play_match(DEFAULT_XML_SOURCE, ACOL, 20,
+                                   processes=2, chunk_size=6, seed=3))
+        self.assertEqual(parallel, boards)
+
+        result = MatchResult(boards)
+        self.assertEqual(result.total, sum(board.imps for board in boards))
+        low, high = result.confidence_interval()
+        self.assertLessEqual(low, result.mean)
+        self.assertLessEqual(result.mean, high)
+
+    def test_normal_quantile(self):
+        self.assertAlmostEqual(normal_quantile(0.975), 1.959964, places=6)
+        self.assertAlmostEqual(normal_quantile(0.5), 0)
+        self.assertAlmostEqual(normal_quantile(0.005), -2.575829, places=6)
+
+    def test_tricks_shared_between_tables(self):
+        with mock.patch.object(Deal, "dd_tricks", autospec=True,
+                               return_value=8) as dd_tricks:
+            boards = list(play_match(DEFAULT_XML_SOURCE, DEFAULT_XML_SOURCE,
+                                     12, processes=0, seed=5))
+
+        solved = sum(len({contract[1:] for contract in board.contracts
+                          if contract != "P"}) for board in boards)
+        self.assertEqual(dd_tricks.call_count, solved)
+
+    def test_corpus_with_tables(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "deals.corpus")
+            write_corpus(path, 5)
+            build_dd_tables(path, processes=0)
+            with mock.patch.object(
+                    Deal, "dd_tricks",
+                    side_effect=AssertionError("Solver called.")):
+                boards = list(play_match(DEFAULT_XML_SOURCE, ACOL, 10, path,
+                                         processes=0))
+
+        self.assertEqual(len(boards), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -20,6 +20,31 @@ try:
     from practice_bidding.tests import xml_parser_tests
     from practice_bidding.tests import test_robot_bidding
     from practice_bidding.tests import test_main
+    from practice_bidding.tests import test_suit_tables
+    from practice_bidding.tests import test_memoization
+    from practice_bidding.tests import test_recorded_auctions
+    from practice_bidding.tests import test_practice_server
+    from practice_bidding.tests import test_flat_tree
+    from practice_bidding.tests import test_compiled_conditions
+    from practice_bidding.tests import test_bid_map
+    from practice_bidding.tests import test_interning
+    from practice_bidding.tests import test_reachability
+    from practice_bidding.tests import test_deal_corpus
+    from practice_bidding.tests import test_bid_index
+    from practice_bidding.tests import test_scoring
+    from practice_bidding.tests import test_dd_corpus
+    from practice_bidding.tests import test_team_match
+    from practice_bidding.tests import test_hot_reload
+    from practice_bidding.tests import test_binary_system
+    from practice_bidding.tests import test_competitive
+    from practice_bidding.tests import test_auction
+    from practice_bidding.tests import test_selection
+    from practice_bidding.tests import test_simulation
+    from practice_bidding.tests import test_pipeline
+    from practice_bidding.tests import test_checkpoint
+    from practice_bidding.tests import test_distributed
+    from practice_bidding.tests import test_formulas
+    from practice_bidding.tests import test_synthetic_system
 except ImportError:
     # This is in place for Travis. It is expected that under normal
     # circumstances the practice_bidding package will be found on sys.path.
@@ -30,6 +55,31 @@ except ImportError:
     from practice_bidding.tests import xml_parser_tests
     from practice_bidding.tests import test_robot_bidding
     from practice_bidding.tests import test_main
+    from practice_bidding.tests import test_suit_tables
+    from practice_bidding.tests import test_memoization
+    from practice_bidding.tests import test_recorded_auctions
+    from practice_bidding.tests import test_practice_server
+    from practice_bidding.tests import test_flat_tree
+    from practice_bidding.tests import test_compiled_conditions
+    from practice_bidding.tests import test_bid_map
+    from practice_bidding.tests import test_interning
+    from practice_bidding.tests import test_reachability
+    from practice_bidding.tests import test_deal_corpus
+    from practice_bidding.tests import test_bid_index
+    from practice_bidding.tests import test_scoring
+    from practice_bidding.tests import test_dd_corpus
+    from practice_bidding.tests import test_team_match
+    from practice_bidding.tests import test_hot_reload
+    from practice_bidding.tests import test_binary_system
+    from practice_bidding.tests import test_competitive
+    from practice_bidding.tests import test_auction
+    from practice_bidding.tests import test_selection
+    from practice_bidding.tests import test_simulation
+    from practice_bidding.tests import test_pipeline
+    from practice_bidding.tests import test_checkpoint
+    from practice_bidding.tests import test_distributed
+    from practice_bidding.tests import test_formulas
+    from practice_bidding.tests import test_synthetic_system
 
 
 def main():
@@ -46,6 +96,31 @@ def main():
     suite.addTests(loader.loadTestsFromModule(xml_parser_tests))
     suite.addTests(loader.loadTestsFromModule(test_robot_bidding))
     suite.addTests(loader.loadTestsFromModule(test_main))
+    suite.addTests(loader.loadTestsFromModule(test_suit_tables))
+    suite.addTests(loader.loadTestsFromModule(test_memoization))
+    suite.addTests(loader.loadTestsFromModule(test_recorded_auctions))
+    suite.addTests(loader.loadTestsFromModule(test_practice_server))
+    suite.addTests(loader.loadTestsFromModule(test_flat_tree))
+    suite.addTests(loader.loadTestsFromModule(test_compiled_conditions))
+    suite.addTests(loader.loadTestsFromModule(test_bid_map))
+    suite.addTests(loader.loadTestsFromModule(test_interning))
+    suite.addTests(loader.loadTestsFromModule(test_reachability))
+    suite.addTests(loader.loadTestsFromModule(test_deal_corpus))
+    suite.addTests(loader.loadTestsFromModule(test_bid_index))
+    suite.addTests(loader.loadTestsFromModule(test_scoring))
+    suite.addTests(loader.loadTestsFromModule(test_dd_corpus))
+    suite.addTests(loader.loadTestsFromModule(test_team_match))
+    suite.addTests(loader.loadTestsFromModule(test_hot_reload))
+    suite.addTests(loader.loadTestsFromModule(test_binary_system))
+    suite.addTests(loader.loadTestsFromModule(test_competitive))
+    suite.addTests(loader.loadTestsFromModule(test_auction))
+    suite.addTests(loader.loadTestsFromModule(test_selection))
+    suite.addTests(loader.loadTestsFromModule(test_simulation))
+    suite.addTests(loader.loadTestsFromModule(test_pipeline))
+    suite.addTests(loader.loadTestsFromModule(test_checkpoint))
+    suite.addTests(loader.loadTestsFromModule(test_distributed))
+    suite.addTests(loader.loadTestsFromModule(test_formulas))
+    suite.addTests(loader.loadTestsFromModule(test_synthetic_system))
 
     runner = unittest.TextTestRunner(verbosity=verbosity)
     result = runner.run(suite)
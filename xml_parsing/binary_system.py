@@ -0,0 +1,429 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 05:41:26 2026
+
+A compact binary format for a whole system, converted from the XML.
+
+Unlike the flat tree (flat_tree.py), which is built for evaluating hands,
+this format holds everything XmlReaderForFile reads: it decodes to Bid
+objects with the same values, descriptions, ids and condition trees, and
+writing the decoded system again gives the same bytes. Loading parses no
+XML and imports no formula module: the formula module is stored as source
+and as compiled code, which is used when the Python version matches.
+
+Layout: a header (magic, version, section count), a table of (offset,
+length) per section, then the sections listed in SECTIONS, each 8 byte
+aligned. Integers are in the byte order named in the metadata.
+    metadata         utf-8 JSON: version, root attributes, directory,
+                     formula module name, Python cache tag.
+    string_offsets   uint32 x (strings + 1) into strings.
+    strings          utf-8 values, descriptions, ids and condition names.
+    shape_sets       SHAPE_SET_BYTES bitmap over SHAPES per shape set.
+    bounds           float64 (minimum, maximum) per evaluation condition.
+    condition_offsets  uint32 x (conditions + 1) into conditions.
+    conditions       int32 words per condition, children before parents:
+                         AND/OR     kind, count, condition...
+                         NOT        kind, condition
+                         CONDITION  kind, count, evaluation condition...,
+                                    count, shape condition...
+                         SHAPE      kind, info string, shape set
+                         EVALUATION kind, name string, bounds, flags
+                         FORMULA    kind, text string (from version 3)
+                     flags bit 0 (1) marks an integer minimum (maximum).
+    roots            int32 word offset into bids per opening bid.
+    bids             int32 words per bid, depth first, each followed by its
+                     descendants: value string, description string, id
+                     string, condition, child count, priority (from version
+                     2; -2**31 if none). -1 is a missing string.
+    formula_source   utf-8 source of the formula module, if any.
+    formula_code     marshal of the compiled formula module, if any.
+
+Each opening bid, with all its descendants, is decoded on first use.
+
+Convert a system with:
+    python -m practice_bidding.xml_parsing.binary_system system.xml
+        system.pbsy
+"""
+
+__author__ = "Andrew I McClement"
+
+from array import array
+from collections.abc import Mapping
+import json
+import marshal
+import struct
+import sys
+import types
+
+from practice_bidding.xml_parsing.conditions import AndCondition, Condition
+from practice_bidding.xml_parsing.conditions import EvaluationCondition
+from practice_bidding.xml_parsing.conditions import FormulaCondition
+from practice_bidding.xml_parsing.conditions import NotCondition, OrCondition
+from practice_bidding.xml_parsing.conditions import ShapeCondition
+from practice_bidding.xml_parsing.flat_tree import SHAPE_IDS, SHAPE_SET_BYTES
+from practice_bidding.xml_parsing.xml_parser import Bid, FormulaMethods
+from practice_bidding.xml_parsing.xml_parser import FormulaParser
+from practice_bidding.xml_parsing.xml_parser import XmlReaderForFile
+
+MAGIC = b"PBSY"
+VERSION = 3
+# Conventional file extension.
+EXTENSION = ".pbsy"
+SECTIONS = ("metadata", "string_offsets", "strings", "shape_sets", "bounds",
+            "condition_offsets", "conditions", "roots", "bids",
+            "formula_source", "formula_code")
+_HEADER = struct.Struct("<4sII")
+_SECTION = struct.Struct("<QQ")
+
+AND, OR, NOT, CONDITION, SHAPE, EVALUATION, FORMULA = range(7)
+BID_FIELDS = 6
+# Version -> words per bid. Version 1 had no priorities, and versions 1 and
+# 2 no formulas.
+_BID_FIELDS = {1: 5, 2: BID_FIELDS, 3: BID_FIELDS}
+_NO_PRIORITY = -2 ** 31
+_NO_STRING = -1
+_FORMULA_MODULE_NAME = "bridge_formulas"
+
+
+class _SystemWriter:
+    def __init__(self):
+        self.strings = []
+        self._string_indices = {}
+        self.shape_sets = bytearray()
+        self._shape_set_indices = {}
+        self.bounds = array("d")
+        self.condition_offsets = array("I", [0])
+        self.conditions = array("i")
+        # id(condition) -> (condition, index). Keeps conditions alive.
+        self._condition_indices = {}
+        self.roots = array("i")
+        self.bids = array("i")
+
+    def string(self, text):
+        if text is None:
+            return _NO_STRING
+
+        try:
+            return self._string_indices[text]
+        except KeyError:
+            self.strings.append(text)
+            index = self._string_indices[text] = len(self.strings) - 1
+            return index
+
+    def _shape_set(self, condition):
+        bitmap = condition.shape_mask().to_bytes(SHAPE_SET_BYTES, "little")
+        try:
+            return self._shape_set_indices[bitmap]
+        except KeyError:
+            index = self._shape_set_indices[bitmap] = len(
+                self._shape_set_indices)
+            self.shape_sets.extend(bitmap)
+            return index
+
+    def condition(self, condition) -> int:
+        """ The index of a condition, adding it and its children if new. """
+        try:
+            return self._condition_indices[id(condition)][1]
+        except KeyError:
+            pass
+
+        if isinstance(condition, Condition):
+            evaluations = [self.condition(child)
+                           for child in condition.evaluation_conditions]
+            shapes = [self.condition(child)
+                      for child in condition.shape_conditions]
+            words = ([CONDITION, len(evaluations)] + evaluations
+                     + [len(shapes)] + shapes)
+        elif isinstance(condition, (AndCondition, OrCondition)):
+            children = [self.condition(child)
+                        for child in condition.conditions]
+            kind = OR if isinstance(condition, OrCondition) else AND
+            words = [kind, len(children)] + children
+        elif isinstance(condition, NotCondition):
+            words = [NOT, self.condition(condition.condition)]
+        elif isinstance(condition, ShapeCondition):
+            words = [SHAPE, self.string(condition.info),
+                     self._shape_set(condition)]
+        elif (isinstance(condition, EvaluationCondition)
+              and condition.name is not None):
+            flags = (isinstance(condition.minimum, int)
+                     | isinstance(condition.maximum, int) << 1)
+            self.bounds.extend((condition.minimum, condition.maximum))
+            words = [EVALUATION, self.string(condition.name),
+                     len(self.bounds) // 2 - 1, flags]
+        elif isinstance(condition, FormulaCondition):
+            words = [FORMULA, self.string(condition.text)]
+        else:
+            raise ValueError(f"Cannot serialise {condition}.")
+
+        self.conditions.extend(words)
+        self.condition_offsets.append(len(self.conditions))
+        index = len(self.condition_offsets) - 2
+        self._condition_indices[id(condition)] = (condition, index)
+        return index
+
+    def bid(self, bid):
+        self.bids.extend((self.string(bid.value),
+                          self.string(bid.description), self.string(bid.id),
+                          self.condition(bid.condition), len(bid.children),
+                          _NO_PRIORITY if bid.priority is None
+                          else bid.priority))
+        for child in bid.children.values():
+            self.bid(child)
+
+
+def write_system(filepath, opening_bids, formulas: FormulaMethods,
+                 formula_source=None):
+    """
+    Write a system to filepath in the binary format.
+
+    formula_source defaults to the contents of the formula module file.
+    """
+    writer = _SystemWriter()
+    for bid in opening_bids.values():
+        writer.roots.append(len(writer.bids))
+        writer.bid(bid)
+
+    if formula_source is None and formulas.formula_module_path is not None:
+        with open(formulas.formula_module_path, encoding="utf-8") as file:
+            formula_source = file.read()
+
+    formula_code = b""
+    if formula_source is not None:
+        formula_code = marshal.dumps(compile(
+            formula_source, _FORMULA_MODULE_NAME, "exec"))
+
+    metadata = {"version": VERSION,
+                "attributes": formulas.attributes,
+                "directory": formulas.directory,
+                "has_formulas": formula_source is not None,
+                "cache_tag": sys.implementation.cache_tag,
+                "byteorder": sys.byteorder}
+    encoded = [text.encode("utf-8") for text in writer.strings]
+    string_offsets = array("I", [0])
+    for text in encoded:
+        string_offsets.append(string_offsets[-1] + len(text))
+
+    sections = [json.dumps(metadata, sort_keys=True).encode("utf-8"),
+                string_offsets.tobytes(), b"".join(encoded),
+                bytes(writer.shape_sets), writer.bounds.tobytes(),
+                writer.condition_offsets.tobytes(),
+                writer.conditions.tobytes(), writer.roots.tobytes(),
+                writer.bids.tobytes(),
+                (formula_source or "").encode("utf-8"), formula_code]
+
+    offset = _HEADER.size + _SECTION.size * len(sections)
+    table = []
+    for section in sections:
+        offset += -offset % 8
+        table.append((offset, len(section)))
+        offset += len(section)
+
+    with open(filepath, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, len(sections)))
+        for entry in table:
+            file.write(_SECTION.pack(*entry))
+        for (offset, _), section in zip(table, sections):
+            file.write(b"\0" * (offset - file.tell()))
+            file.write(section)
+
+
+def convert(xml_source, filepath):
+    """ Convert an XML system to the binary format. """
+    reader = XmlReaderForFile(xml_source)
+    write_system(filepath, reader.get_bids_from_xml(), reader.formulas)
+
+
+def _shape_accept(mask):
+    def accept(hand):
+        return bool(mask >> SHAPE_IDS[tuple(hand.shape)] & 1)
+
+    return accept
+
+
+class OpeningBids(Mapping):
+    """ The opening bids of a BinarySystem, each decoded on first use. """
+
+    def __init__(self, system):
+        self._system = system
+        self._bids = {}
+        self._roots = {system.string(system.bid_words[start]): start
+                       for start in system.roots}
+
+    def __getitem__(self, value):
+        try:
+            return self._bids[value]
+        except KeyError:
+            start = self._roots[value]
+
+        bid, _ = self._system.decode_bid(start)
+        self._bids[value] = bid
+        return bid
+
+    def __contains__(self, value):
+        return value in self._roots
+
+    def __iter__(self):
+        return iter(self._roots)
+
+    def __len__(self):
+        return len(self._roots)
+
+
+class BinarySystem:
+    """ A system read from the binary format. """
+
+    def __init__(self, data):
+        self._data = data
+        magic, version, section_count = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version not in _BID_FIELDS:
+            raise ValueError(f"Not a version {VERSION} binary system.")
+
+        self._bid_fields = _BID_FIELDS[version]
+
+        view = memoryview(data)
+        sections = {}
+        for i, name in enumerate(SECTIONS[:section_count]):
+            offset, length = _SECTION.unpack_from(
+                data, _HEADER.size + i * _SECTION.size)
+            sections[name] = view[offset:offset + length]
+
+        metadata = json.loads(bytes(sections["metadata"]))
+        if metadata["byteorder"] != sys.byteorder:  # pragma: no cover
+            raise ValueError("Binary system written with another byte order.")
+
+        self._string_offsets = sections["string_offsets"].cast("I")
+        self._strings = sections["strings"]
+        self._shape_sets = sections["shape_sets"]
+        self._bounds = sections["bounds"].cast("d")
+        self._condition_offsets = sections["condition_offsets"].cast("I")
+        self._conditions = sections["conditions"].cast("i")
+        self.roots = sections["roots"].cast("i")
+        self.bid_words = sections["bids"].cast("i")
+        # Condition index -> condition, so shared conditions stay shared.
+        self._decoded = {}
+        self._shape_accepts = {}
+
+        self.formula_source = None
+        formula_module = None
+        if metadata["has_formulas"]:
+            self.formula_source = bytes(sections["formula_source"]).decode(
+                "utf-8")
+            if metadata["cache_tag"] == sys.implementation.cache_tag:
+                code = marshal.loads(sections["formula_code"])
+            else:
+                code = compile(self.formula_source, _FORMULA_MODULE_NAME,
+                               "exec")
+            formula_module = types.ModuleType(_FORMULA_MODULE_NAME)
+            exec(code, formula_module.__dict__)
+
+        self.formulas = FormulaMethods(metadata["attributes"],
+                                       metadata["directory"], formula_module)
+        self._formula_parser = FormulaParser(self.formulas)
+        self.opening_bids = OpeningBids(self)
+
+    @classmethod
+    def load(cls, filepath):
+        """ Read a binary system. """
+        with open(filepath, "rb") as file:
+            return cls(file.read())
+
+    def string(self, index):
+        """ A string of the string table, or None. """
+        if index == _NO_STRING:
+            return None
+
+        start, end = self._string_offsets[index:index + 2]
+        return bytes(self._strings[start:end]).decode("utf-8")
+
+    def condition(self, index):
+        """ The condition with a given index, decoded once. """
+        try:
+            return self._decoded[index]
+        except KeyError:
+            pass
+
+        words = self._conditions[self._condition_offsets[index]:
+                                 self._condition_offsets[index + 1]]
+        kind = words[0]
+        if kind in {AND, OR}:
+            children = [self.condition(child) for child in words[2:]]
+            condition = (AndCondition if kind == AND
+                         else OrCondition)(children)
+        elif kind == NOT:
+            condition = NotCondition(self.condition(words[1]))
+        elif kind == CONDITION:
+            evaluation_count = words[1]
+            evaluations = words[2:2 + evaluation_count]
+            shapes = words[3 + evaluation_count:]
+            condition = Condition(map(self.condition, evaluations),
+                                  map(self.condition, shapes))
+        elif kind == SHAPE:
+            condition = self._shape_condition(self.string(words[1]),
+                                              words[2])
+        elif kind == EVALUATION:
+            name, flags = self.string(words[1]), words[3]
+            minimum, maximum = self._bounds[2 * words[2]:2 * words[2] + 2]
+            if flags & 1:
+                minimum = int(minimum)
+            if flags & 2:
+                maximum = int(maximum)
+            condition = EvaluationCondition(self.formulas.get(name), minimum,
+                                            maximum, name)
+        elif kind == FORMULA:
+            condition = self._formula_parser.parse(self.string(words[1]))
+        else:
+            raise ValueError(f"Unknown condition kind {kind}.")
+
+        self._decoded[index] = condition
+        return condition
+
+    def _shape_condition(self, info, shape_set):
+        mask = int.from_bytes(
+            self._shape_sets[shape_set * SHAPE_SET_BYTES:
+                             (shape_set + 1) * SHAPE_SET_BYTES], "little")
+        # Conditions on the same shapes share one accept function.
+        try:
+            accept = self._shape_accepts[shape_set]
+        except KeyError:
+            accept = self._shape_accepts[shape_set] = _shape_accept(mask)
+
+        return ShapeCondition(accept, info, mask)
+
+    def decode_bid(self, start, parent=None):
+        """
+        The bid whose record starts at a word offset, with all its
+        descendants, and the offset after them.
+        """
+        words = self.bid_words[start:start + self._bid_fields]
+        priority = words[5] if len(words) > 5 else _NO_PRIORITY
+        bid = Bid(self.string(words[0]), self.string(words[1]),
+                  self.condition(words[3]), self.string(words[2]),
+                  None if priority == _NO_PRIORITY else priority)
+        bid.parent = parent
+        position = start + self._bid_fields
+        for _ in range(words[4]):
+            child, position = self.decode_bid(position, bid)
+            bid.children[child.value] = child
+
+        return bid, position
+
+
+def load_opening_bids(source):
+    """
+    The opening bids of a system: a binary system if source ends with
+    EXTENSION, else an XML file.
+    """
+    if source.lower().endswith(EXTENSION):
+        return BinarySystem.load(source).opening_bids
+
+    return XmlReaderForFile(source).get_bids_from_xml()
+
+
+def main():
+    """ Convert the XML system given on the command line. """
+    convert(sys.argv[1], sys.argv[2])
+
+
+if __name__ == "__main__":
+    main()
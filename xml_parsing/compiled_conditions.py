@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 19:35:22 2026
+
+Compile a condition tree into a single generated Python function.
+
+Bid.accept would otherwise descend through several levels of accept calls
+(AndCondition -> OrCondition -> Condition -> EvaluationCondition -> the
+evaluation method). The generated function inlines the logic as one
+short-circuiting boolean expression whose only calls are to the evaluation
+methods and shape tests themselves. The condition objects are untouched and
+remain available for info and debugging.
+"""
+
+__author__ = "Andrew I McClement"
+
+import itertools
+import linecache
+import weakref
+
+from practice_bidding.xml_parsing.conditions import AndCondition, Condition
+from practice_bidding.xml_parsing.conditions import EvaluationCondition
+from practice_bidding.xml_parsing.conditions import FormulaCondition
+from practice_bidding.xml_parsing.conditions import NotCondition, OrCondition
+from practice_bidding.xml_parsing.conditions import SimpleCondition
+
+# Set to True to register generated source with linecache, so tracebacks
+# show it. Off by default, as each entry holds another copy of the source.
+REGISTER_SOURCE = False
+
+_counter = itertools.count()
+
+
+class ConditionCompiler:
+    """
+    Generates the source of a condition.
+
+    Subclasses may override evaluation_expression, formula_expression and
+    simple_expression to change how leaves are evaluated. Given a
+    ConditionInterner, conditions shared between bids are called through
+    their memoized accept.
+    """
+
+    # The arguments of the generated function.
+    arguments = ("hand",)
+
+    def __init__(self, interner=None):
+        self.interner = interner
+        # Name -> object, passed to the generated function as defaults so
+        # they are looked up as locals.
+        self.constants = {}
+        self._names = {}
+
+    def name(self, prefix, value):
+        """ A name under which value is available to the generated code. """
+        try:
+            return self._names[(prefix, id(value))]
+        except KeyError:
+            name = f"_{prefix}{len(self.constants)}"
+            self._names[(prefix, id(value))] = name
+            self.constants[name] = value
+            return name
+
+    def expression(self, condition, memoize=True) -> str:
+        """ Python source for the condition applied to `hand`. """
+        if (memoize and self.interner is not None
+                and self.interner.is_memoized(condition)):
+            accept = self.interner.memoized_accept(condition)
+            return f"{self.name('m', accept)}(hand)"
+
+        if isinstance(condition, (AndCondition, Condition)):
+            return self._join(condition.conditions, " and ", "True")
+        elif isinstance(condition, OrCondition):
+            return self._join(condition.conditions, " or ", "False")
+        elif isinstance(condition, NotCondition):
+            return f"(not {self.expression(condition.condition)})"
+        elif isinstance(condition, EvaluationCondition):
+            return self.evaluation_expression(condition)
+        elif isinstance(condition, FormulaCondition):
+            return self.formula_expression(condition)
+        elif isinstance(condition, SimpleCondition):
+            return self.simple_expression(condition)
+
+        # Unknown condition types keep their own accept method.
+        return f"{self.name('o', condition)}.accept(hand)"
+
+    def evaluation_expression(self, condition) -> str:
+        """ Source for an EvaluationCondition. """
+        lower, upper = condition.bounds
+        evaluate = self.name("f", condition.evaluation_function)
+        return (f"({self.name('c', lower)} <= {evaluate}(hand)"
+                f" <= {self.name('c', upper)})")
+
+    def formula_expression(self, condition) -> str:
+        """ Source for a FormulaCondition. """
+        return condition.source(
+            lambda method: f"{self.name('f', method)}(hand)")
+
+    def simple_expression(self, condition) -> str:
+        """ Source for a SimpleCondition. """
+        return f"{self.name('a', condition.accept_function)}(hand)"
+
+    def _join(self, conditions, operator, empty):
+        if not conditions:
+            return empty
+
+        expressions = [self.expression(condition) for condition in conditions]
+        return f"({operator.join(expressions)})"
+
+
+def compile_condition(condition, compiler=None, memoize_root=True):
+    """
+    Return a function equivalent to condition.accept, or taking
+    compiler.arguments if a compiler is given.
+
+    If memoize_root is False, condition itself is always compiled inline.
+
+    The generated source is kept in the function's `source` attribute. It
+    is also registered with linecache while the function lives, if
+    REGISTER_SOURCE is set.
+    """
+    compiler = compiler or ConditionCompiler()
+    expression = compiler.expression(condition, memoize_root)
+    parameters = ", ".join(compiler.arguments + tuple(
+        f"{name}={name}" for name in compiler.constants))
+    source = (f"def accept({parameters}):\n"
+              f"    return {expression}\n")
+
+    # A distinct name per function is only needed for linecache, and the
+    # interpreter keeps each name alive, so share one otherwise.
+    filename = (f"<condition {next(_counter)}>" if REGISTER_SOURCE
+                else "<condition>")
+    namespace = dict(compiler.constants)
+    exec(compile(source, filename, "exec"), namespace)
+    accept = namespace["accept"]
+    accept.source = source
+    if REGISTER_SOURCE:
+        linecache.cache[filename] = (len(source), None,
+                                     source.splitlines(True), filename)
+        weakref.finalize(accept, linecache.cache.pop, filename, None)
+
+    return accept
@@ -1,12 +1,30 @@
 # -*- coding: utf-8 -*-
 
+import ast
+import itertools
+import math
 import re
-from practice_bidding.redeal.redeal import Shape
+from fractions import Fraction
+
+from practice_bidding.redeal.redeal import Hand, Shape
+
+# Every (spades, hearts, diamonds, clubs) with 13 cards.
+SHAPES = tuple(shape for shape in itertools.product(range(14), repeat=4)
+               if sum(shape) == 13)
+_RANKS = "AKQJT98765432"
+_shape_hands = []
+
+
+def hand_of_shape(shape):
+    """ A hand with the given (spades, hearts, diamonds, clubs) lengths. """
+    return Hand.from_str(" ".join(_RANKS[:length] or "-" for length in shape))
 
 
 class BaseCondition:
     """ Base class for all condition classes. """
 
+    __slots__ = ()
+
     @property
     def info(self):
         """ Get a description of the condition. """
@@ -30,6 +48,8 @@ class BaseCondition:
 
 
 class SimpleCondition(BaseCondition):
+    __slots__ = ("_accept", "_info")
+
     def __init__(self, accept, info):
         self._accept = accept
         assert info
@@ -44,19 +64,64 @@ class SimpleCondition(BaseCondition):
     def condition_count(self):
         return 1
 
+    @property
+    def accept_function(self):
+        """ The function used to accept or reject a hand. """
+        return self._accept
+
     def accept(self, hand):
         """ Determine if the hand satisfies the condition or not. """
         return self._accept(hand)
 
 
+class ShapeCondition(SimpleCondition):
+    """ A simple condition which depends only on the shape of the hand. """
+
+    __slots__ = ("_shape_mask",)
+
+    def __init__(self, accept, info, shape_mask=None):
+        super().__init__(accept, info)
+        # Computed on first use unless known, see shape_mask().
+        self._shape_mask = shape_mask
+
+    def shape_mask(self) -> int:
+        """ The accepted shapes: bit i is set if SHAPES[i] is accepted. """
+        if self._shape_mask is None:
+            if not _shape_hands:
+                _shape_hands.extend(map(hand_of_shape, SHAPES))
+
+            self._shape_mask = sum(
+                1 << i for i, hand in enumerate(_shape_hands)
+                if self.accept(hand))
+
+        return self._shape_mask
+
+
 class EvaluationCondition(BaseCondition):
     """ A condition on how good the hand is, by some method of evaluation. """
 
-    def __init__(self, evaluation_method, minimum, maximum):
+    __slots__ = ("minimum", "maximum", "name", "_evaluation_method",
+                 "_evaluate", "_lower", "_upper")
+
+    def __init__(self, evaluation_method, minimum, maximum, name=None):
         self.minimum = minimum
         self.maximum = maximum
+        # The name of the method in the XML, e.g. "hcp", if known.
+        self.name = name
         self._evaluation_method = evaluation_method
 
+        # Table evaluators (see suit_tables.py) store values as integers
+        # multiplied by a scale. Scaling the bounds instead of the evaluation
+        # keeps the comparison exact and in integers.
+        scale = getattr(evaluation_method, "scale", None)
+        if scale is None:
+            self._evaluate = evaluation_method
+            self._lower, self._upper = minimum, maximum
+        else:
+            self._evaluate = evaluation_method.scaled
+            self._lower = _scale_bound(minimum, scale, math.ceil)
+            self._upper = _scale_bound(maximum, scale, math.floor)
+
     @property
     def condition_count(self):
         return 1
@@ -66,10 +131,162 @@ class EvaluationCondition(BaseCondition):
         return (f"Evaluation method: {self._evaluation_method}. Min: "
                 f"{self.minimum}. Max: {self.maximum}.")
 
+    @property
+    def evaluation_method(self):
+        """ The method of evaluation, e.g. HCP. """
+        return self._evaluation_method
+
+    @property
+    def integral(self):
+        """ Whether the evaluation (see bounds) is always an integer. """
+        return getattr(self._evaluation_method, "scale", None) is not None
+
+    @property
+    def evaluation_function(self):
+        """ The function compared against self.bounds. """
+        return self._evaluate
+
+    @property
+    def bounds(self):
+        """
+        (lower, upper) in the units of the evaluation actually performed,
+        i.e. multiplied by the scale of a table evaluator.
+        """
+        return self._lower, self._upper
+
     def accept(self, hand):
         """If the hand evaluates to within the specified range."""
-        evaluation = self._evaluation_method(hand)
-        return self.minimum <= evaluation <= self.maximum
+        return self._lower <= self._evaluate(hand) <= self._upper
+
+
+class FormulaCondition(BaseCondition):
+    """
+    A condition given by a formula over evaluation methods, e.g.
+    "top_three_h + controls >= 4".
+
+    The formula is a validated ast expression (see xml_parser.FormulaParser)
+    whose names are keys of methods. It is compiled to Python source once;
+    compilers generate the source with their own way of reading each
+    method's value (see source).
+    """
+
+    __slots__ = ("text", "expression", "methods", "_accept")
+
+    # Not division, which would raise ZeroDivisionError part way through
+    # an auction, e.g. for hcp / spades with a void.
+    _operators = {ast.Add: "+", ast.Sub: "-", ast.Mult: "*",
+                  ast.USub: "-", ast.UAdd: "+", ast.Not: "not ",
+                  ast.And: " and ", ast.Or: " or ", ast.Eq: "==",
+                  ast.NotEq: "!=", ast.Lt: "<", ast.LtE: "<=", ast.Gt: ">",
+                  ast.GtE: ">="}
+
+    def __init__(self, text, expression, methods):
+        self.text = text
+        self.expression = expression
+        # Name -> evaluation method.
+        self.methods = dict(methods)
+        arguments = {f"_f{i}": method
+                     for i, method in enumerate(self.methods.values())}
+        names = dict(zip(map(id, self.methods.values()), arguments))
+        source = self.source(lambda method: f"{names[id(method)]}(hand)")
+        parameters = "".join(f", {name}={name}" for name in arguments)
+        self._accept = eval(compile(f"lambda hand{parameters}: {source}",
+                                    f"<formula {text}>", "eval"), arguments)
+
+    @property
+    def condition_count(self):
+        return 1
+
+    @property
+    def info(self):
+        return f"Formula: {self.text}"
+
+    @property
+    def key(self):
+        """ Equal for formulas which are the same expression of methods. """
+        return (ast.dump(self.expression),
+                tuple((name, id(method))
+                      for name, method in sorted(self.methods.items())))
+
+    @staticmethod
+    def number(node):
+        """
+        The value of a number in a formula's ast, or None if node is not a
+        number. Python 3.8 parses numbers to ast.Constant, earlier versions
+        to ast.Num.
+        """
+        if isinstance(node, ast.Constant):
+            value = node.value
+        elif type(node).__name__ == "Num":
+            value = node.n
+        else:
+            return None
+
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None
+
+        return value
+
+    @classmethod
+    def subscript_index(cls, node):
+        """
+        The index of a subscript such as rkcb_s[0], or None if it is not a
+        whole number. Before Python 3.9 the index is wrapped in ast.Index.
+        """
+        index = node.slice
+        if type(index).__name__ == "Index":
+            index = index.value
+
+        value = cls.number(index)
+        return value if type(value) is int else None
+
+    def source(self, value_source) -> str:
+        """
+        Python source for the formula, where value_source(method) is the
+        source for the value of an evaluation method for the hand.
+        """
+        return self._source(self.expression, value_source)
+
+    def _source(self, node, value_source):
+        number = self.number(node)
+        if number is not None:
+            return repr(number)
+        elif isinstance(node, ast.Name):
+            return value_source(self.methods[node.id])
+        elif isinstance(node, ast.Subscript):
+            return (f"{self._source(node.value, value_source)}"
+                    f"[{self.subscript_index(node)!r}]")
+        elif isinstance(node, ast.BinOp):
+            return (f"({self._source(node.left, value_source)} "
+                    f"{self._operators[type(node.op)]} "
+                    f"{self._source(node.right, value_source)})")
+        elif isinstance(node, ast.UnaryOp):
+            return (f"({self._operators[type(node.op)]}"
+                    f"{self._source(node.operand, value_source)})")
+        elif isinstance(node, ast.BoolOp):
+            return "(" + self._operators[type(node.op)].join(
+                self._source(value, value_source)
+                for value in node.values) + ")"
+        elif isinstance(node, ast.Compare):
+            parts = [self._source(node.left, value_source)]
+            for op, comparator in zip(node.ops, node.comparators):
+                parts.append(self._operators[type(op)])
+                parts.append(self._source(comparator, value_source))
+            return f"({' '.join(parts)})"
+
+        raise ValueError(f"Cannot compile {ast.dump(node)}.")
+
+    def accept(self, hand):
+        """ Whether the formula is true for the hand. """
+        return self._accept(hand)
+
+
+def _scale_bound(bound, scale, rounding):
+    if math.isinf(bound):
+        return bound
+
+    # Bounds come from decimal text in the XML, so scale the decimal exactly.
+    return rounding(Fraction(repr(bound)) * scale)
 
 
 class ShapeConditionFactory:
@@ -88,7 +305,7 @@ class ShapeConditionFactory:
         """ Create a condition based on general shape types. """
         accept = cls.general_types[type_]
         info = f"Shape is {type_}."
-        return SimpleCondition(accept, info)
+        return ShapeCondition(accept, info)
 
     @classmethod
     def create_shape_condition(cls, shape_string):
@@ -99,8 +316,8 @@ class ShapeConditionFactory:
         converted_shapes = [shape if shape in {"+", "-"} else
                             f"Shape('{shape}')" for shape in shapes]
         overall_shape = eval("".join(converted_shapes))
-        return SimpleCondition(overall_shape,
-                               f"Shape: {' '.join(converted_shapes)}")
+        return ShapeCondition(overall_shape,
+                              f"Shape: {' '.join(converted_shapes)}")
 
     @staticmethod
     def create_suit_length_condition(suit, minimum, maximum):
@@ -111,11 +328,13 @@ class ShapeConditionFactory:
 
             return accept
 
-        return SimpleCondition(get_accept(suit),
-                               f"{minimum} <= {suit} <= {maximum}")
+        return ShapeCondition(get_accept(suit),
+                              f"{minimum} <= {suit} <= {maximum}")
 
 
 class MultiCondition(BaseCondition):
+    __slots__ = ("conditions",)
+
     def __init__(self, conditions=None):
         self.conditions = list(conditions or [])
 
@@ -128,6 +347,8 @@ class MultiCondition(BaseCondition):
 class Condition(MultiCondition):
     """ A set of conditions on a hand. """
 
+    __slots__ = ("evaluation_conditions", "shape_conditions")
+
     def __init__(self, evaluation_conditions, shape_conditions):
         self.evaluation_conditions = list(evaluation_conditions)
         self.shape_conditions = list(shape_conditions)
@@ -157,6 +378,9 @@ class AndCondition(MultiCondition):
     Collection of conditions which are all required to be true to accept a
     hand.
     """
+
+    __slots__ = ()
+
     @property
     def info(self):
         infos = (condition.info for condition in self.conditions)
@@ -175,6 +399,9 @@ class AndCondition(MultiCondition):
 
 class NotCondition(BaseCondition):
     """ An inverted condition """
+
+    __slots__ = ("condition",)
+
     def __init__(self, condition):
         assert condition
         self.condition = condition
@@ -198,6 +425,8 @@ class OrCondition(MultiCondition):
     accept a hand.
     """
 
+    __slots__ = ()
+
     @property
     def info(self):
         infos = (condition.info for condition in self.conditions)
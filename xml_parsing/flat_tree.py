@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 17:48:30 2026
+
+A bid tree flattened into arrays in a single file.
+
+Worker processes map the file read-only, so every process shares the same
+pages instead of parsing the XML or unpickling a graph of Bid objects.
+
+Layout: a header, then the sections listed in SECTIONS, each 8 byte aligned.
+    nodes              int32 x NODE_FIELDS per node, in breadth first order
+                       so the children of a node are contiguous.
+    codes              uint8 call code (see calls.py) per node.
+    program            int32 (op, arg) pairs: the postfix conditions of all
+                       nodes.
+    interval_features  int32 feature index per interval.
+    interval_bounds    float64 (lower, upper) per interval.
+    shape_sets         SHAPE_SET_BYTES bitmap over SHAPES per shape set.
+    text_offsets       int32 offsets into text, one per node plus one.
+    text               utf-8 descriptions.
+    metadata           utf-8 JSON: feature names and system attributes.
+
+Conditions which depend only on the shape of the hand become a bitmap over
+the 560 possible shapes; evaluation conditions become an interval over a
+named feature. Evaluating a node then needs only the shape id and the
+feature values of the hand, which are computed once per hand.
+"""
+
+__author__ = "Andrew I McClement"
+
+from array import array
+from collections.abc import Mapping
+import json
+import mmap
+import struct
+import sys
+
+from practice_bidding.calls import call_code, call_value, is_bid, strain
+from practice_bidding.memoization import HandMemo
+from practice_bidding.redeal.redeal.global_defs import Strain
+from practice_bidding.xml_parsing.conditions import AndCondition, Condition
+from practice_bidding.xml_parsing.conditions import EvaluationCondition
+from practice_bidding.xml_parsing.conditions import NotCondition, OrCondition
+from practice_bidding.xml_parsing.conditions import ShapeCondition, SHAPES
+from practice_bidding.xml_parsing.xml_parser import FormulaMethods
+
+MAGIC = b"PBFT"
+VERSION = 1
+SECTIONS = ("nodes", "codes", "program", "interval_features",
+            "interval_bounds", "shape_sets", "text_offsets", "text",
+            "metadata")
+_HEADER = struct.Struct("<4sII")
+_SECTION = struct.Struct("<QQ")
+
+# parent, first child, child count, program start, program length.
+NODE_FIELDS = 5
+OP_SHAPE, OP_INTERVAL, OP_AND, OP_OR, OP_NOT = range(1, 6)
+
+SHAPE_IDS = {shape: i for i, shape in enumerate(SHAPES)}
+SHAPE_SET_BYTES = (len(SHAPES) + 7) // 8
+
+_STRAINS = (Strain.C, Strain.D, Strain.H, Strain.S, Strain.N)
+
+
+class _FlatTreeWriter:
+    def __init__(self):
+        self.program = array("i")
+        self.features = []
+        self.interval_features = array("i")
+        self.interval_bounds = array("d")
+        self.shape_sets = bytearray()
+        self._shape_set_indices = {}
+
+    def _feature_index(self, name):
+        try:
+            return self.features.index(name)
+        except ValueError:
+            self.features.append(name)
+            return len(self.features) - 1
+
+    def _shape_set_index(self, condition):
+        bitmap = condition.shape_mask().to_bytes(SHAPE_SET_BYTES, "little")
+        try:
+            return self._shape_set_indices[bitmap]
+        except KeyError:
+            index = self._shape_set_indices[bitmap] = len(
+                self._shape_set_indices)
+            self.shape_sets.extend(bitmap)
+            return index
+
+    def add_condition(self, condition):
+        """ Append the postfix program of a condition. """
+        if isinstance(condition, (AndCondition, Condition, OrCondition)):
+            for child in condition.conditions:
+                self.add_condition(child)
+            op = OP_OR if isinstance(condition, OrCondition) else OP_AND
+            self.program.extend((op, len(condition.conditions)))
+        elif isinstance(condition, NotCondition):
+            self.add_condition(condition.condition)
+            self.program.extend((OP_NOT, 0))
+        elif isinstance(condition, ShapeCondition):
+            self.program.extend((OP_SHAPE, self._shape_set_index(condition)))
+        elif (isinstance(condition, EvaluationCondition)
+              and condition.name is not None):
+            self.interval_features.append(
+                self._feature_index(condition.name))
+            self.interval_bounds.extend(condition.bounds)
+            self.program.extend((OP_INTERVAL, len(self.interval_features) - 1))
+        else:
+            raise ValueError(f"Cannot flatten {condition}.")
+
+
+def write_flat_tree(filepath, opening_bids, formulas: FormulaMethods):
+    """ Write the bid tree to filepath in the flat format. """
+    writer = _FlatTreeWriter()
+    nodes = array("i")
+    codes = bytearray()
+    text_offsets = array("i", [0])
+    text = bytearray()
+
+    order = list(opening_bids.values())
+    parents = [-1] * len(order)
+    i = 0
+    while i < len(order):
+        bid = order[i]
+        children = list(bid.children.values())
+        program_start = len(writer.program) // 2
+        writer.add_condition(bid.condition)
+        nodes.extend((parents[i], len(order), len(children), program_start,
+                      len(writer.program) // 2 - program_start))
+        code = call_code(bid.value)
+        if call_value(code) != bid.value:
+            raise ValueError(f"Bid value {bid.value} is not canonical.")
+        codes.append(code)
+        text.extend((bid.description or "").encode("utf-8"))
+        text_offsets.append(len(text))
+
+        order.extend(children)
+        parents.extend([i] * len(children))
+        i += 1
+
+    metadata = {"features": writer.features,
+                "attributes": formulas.attributes,
+                "directory": formulas.directory,
+                "root_count": len(opening_bids),
+                "byteorder": sys.byteorder}
+    sections = [nodes.tobytes(), bytes(codes), writer.program.tobytes(),
+                writer.interval_features.tobytes(),
+                writer.interval_bounds.tobytes(), bytes(writer.shape_sets),
+                text_offsets.tobytes(), bytes(text),
+                json.dumps(metadata).encode("utf-8")]
+
+    offset = _HEADER.size + _SECTION.size * len(sections)
+    table = []
+    for section in sections:
+        offset += -offset % 8
+        table.append((offset, len(section)))
+        offset += len(section)
+
+    with open(filepath, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, len(sections)))
+        for entry in table:
+            file.write(_SECTION.pack(*entry))
+        for (offset, _), section in zip(table, sections):
+            file.write(b"\0" * (offset - file.tell()))
+            file.write(section)
+
+
+class FlatBidTree:
+    """ A bid tree read from the flat format, without copying. """
+
+    def __init__(self, buffer, formulas=None):
+        # Keep the buffer (e.g. an mmap) alive as long as the views.
+        self._buffer = buffer
+        view = memoryview(buffer)
+        magic, version, section_count = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a version {VERSION} flat bid tree.")
+
+        sections = {}
+        for i, name in enumerate(SECTIONS[:section_count]):
+            offset, length = _SECTION.unpack_from(
+                buffer, _HEADER.size + i * _SECTION.size)
+            sections[name] = view[offset:offset + length]
+
+        metadata = json.loads(bytes(sections["metadata"]).decode("utf-8"))
+        if metadata["byteorder"] != sys.byteorder:  # pragma: no cover
+            raise ValueError("Flat bid tree written with another byte order.")
+
+        self._nodes = sections["nodes"].cast("i")
+        self._codes = sections["codes"]
+        self._program = sections["program"].cast("i")
+        self._interval_features = sections["interval_features"].cast("i")
+        self._interval_bounds = sections["interval_bounds"].cast("d")
+        self._shape_sets = sections["shape_sets"]
+        self._text_offsets = sections["text_offsets"].cast("i")
+        self._text = sections["text"]
+        self.root_count = metadata["root_count"]
+
+        self.formulas = formulas or FormulaMethods(metadata["attributes"],
+                                                   metadata["directory"])
+        self._feature_methods = []
+        for name in metadata["features"]:
+            method = self.formulas.get(name)
+            if getattr(method, "scale", None) is not None:
+                # Interval bounds are stored in the scaled units.
+                method = method.scaled
+            self._feature_methods.append(method)
+
+        self.hand_features = HandMemo(self._hand_features)
+
+    @classmethod
+    def load(cls, filepath, formulas=None):
+        """ Map a flat bid tree file into memory, read only. """
+        with open(filepath, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return cls(buffer, formulas)
+
+    def __len__(self):
+        return len(self._codes)
+
+    def _hand_features(self, hand):
+        return (SHAPE_IDS[tuple(hand.shape)],
+                [method(hand) for method in self._feature_methods])
+
+    def parent(self, node):
+        """ The index of the parent node, or -1. """
+        return self._nodes[NODE_FIELDS * node]
+
+    def children(self, node) -> range:
+        """ The indices of the children of a node. """
+        first = self._nodes[NODE_FIELDS * node + 1]
+        return range(first, first + self._nodes[NODE_FIELDS * node + 2])
+
+    def code(self, node) -> int:
+        """ The call code of a node. """
+        return self._codes[node]
+
+    def description(self, node) -> str:
+        """ The description of a node. """
+        start, end = self._text_offsets[node], self._text_offsets[node + 1]
+        # ElementTree gives None rather than an empty description.
+        return bytes(self._text[start:end]).decode("utf-8") or None
+
+    def accept(self, node, hand) -> bool:
+        """ Whether the hand satisfies the condition of a node. """
+        shape_id, values = self.hand_features(hand)
+        shape_byte, shape_bit = shape_id >> 3, 1 << (shape_id & 7)
+        program = self._program
+        start = 2 * self._nodes[NODE_FIELDS * node + 3]
+        end = start + 2 * self._nodes[NODE_FIELDS * node + 4]
+        stack = []
+        for pc in range(start, end, 2):
+            op, arg = program[pc], program[pc + 1]
+            if op == OP_SHAPE:
+                stack.append(bool(self._shape_sets[arg * SHAPE_SET_BYTES
+                                                   + shape_byte]
+                                  & shape_bit))
+            elif op == OP_INTERVAL:
+                value = values[self._interval_features[arg]]
+                stack.append(self._interval_bounds[2 * arg] <= value
+                             <= self._interval_bounds[2 * arg + 1])
+            elif op == OP_NOT:
+                stack[-1] = not stack[-1]
+            else:
+                operands = stack[len(stack) - arg:]
+                del stack[len(stack) - arg:]
+                stack.append(all(operands) if op == OP_AND
+                             else any(operands))
+
+        return stack[-1]
+
+    @property
+    def opening_bids(self):
+        """ The opening bids, usable wherever a dict of Bids is expected. """
+        return FlatChildren(self, range(self.root_count))
+
+
+class FlatBid:
+    """ A lightweight view of one node, with the interface of Bid. """
+
+    __slots__ = ("_tree", "index")
+    # The flat format does not keep priorities.
+    priority = None
+
+    def __init__(self, tree, index):
+        self._tree = tree
+        self.index = index
+
+    @property
+    def value(self):
+        return call_value(self._tree.code(self.index))
+
+    @property
+    def description(self):
+        return self._tree.description(self.index)
+
+    @property
+    def suit(self):
+        code = self._tree.code(self.index)
+        return _STRAINS[strain(code)] if is_bid(code) else None
+
+    @property
+    def parent(self):
+        parent = self._tree.parent(self.index)
+        return None if parent < 0 else FlatBid(self._tree, parent)
+
+    @property
+    def children(self):
+        return FlatChildren(self._tree, self._tree.children(self.index))
+
+    def accept(self, hand) -> bool:
+        """ Whether the hand is valid for this bid or not. """
+        return self._tree.accept(self.index, hand)
+
+
+class FlatChildren(Mapping):
+    """ Bid value -> FlatBid for a contiguous range of nodes. """
+
+    __slots__ = ("_tree", "_nodes")
+
+    def __init__(self, tree, nodes):
+        self._tree = tree
+        self._nodes = nodes
+
+    def __getitem__(self, value):
+        code = call_code(value)
+        for node in self._nodes:
+            if self._tree.code(node) == code:
+                return FlatBid(self._tree, node)
+
+        raise KeyError(value)
+
+    def __iter__(self):
+        return (call_value(self._tree.code(node)) for node in self._nodes)
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def values(self):
+        tree = self._tree
+        return [FlatBid(tree, node) for node in self._nodes]
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 04:37:05 2026
+
+Reload a system while it is in use, recompiling only the bids which changed.
+
+Bids are matched between the old and the new XML by their id attribute and
+value, among their siblings. Each <bid> element has two hashes: one of the
+element without its child bids, and one of its whole subtree. An unchanged
+subtree is kept as it is, a bid whose own element changed is updated in
+place and a bid which is new (including one whose id or value changed) is
+defined from the XML with its descendants.
+
+The conditions of changed and removed bids are released from the
+interner, so shared conditions are counted as in a fresh read.
+
+The live Bid objects and children dicts are updated in place, so sessions
+part way through an auction carry on. Listeners are told which bids
+changed, so caches derived from them (e.g. BidMapper, BidIndex) can drop
+only what is stale.
+
+If the root element (and so the evaluation methods) or the formula module
+changes, the whole system is reloaded.
+"""
+
+__author__ = "Andrew I McClement"
+
+from collections import namedtuple
+import hashlib
+import os
+import xml.etree.ElementTree as ET
+
+from practice_bidding.xml_parsing.xml_parser import XmlReaderForFile
+
+# changed: bids updated in place. added: new bids, with their descendants.
+# removed: bids detached from the tree, with their descendants. full: the
+# whole system was reloaded, so every old bid was removed.
+ReloadResult = namedtuple("ReloadResult", ["changed", "added", "removed",
+                                           "full"])
+
+
+def _digest_element(element, digest):
+    digest.update(repr((element.tag, sorted(element.attrib.items()),
+                        (element.text or "").strip())).encode("utf-8"))
+    for child in element:
+        if child.tag != "bid":
+            _digest_element(child, digest)
+
+    digest.update(b")")
+
+
+def _bid_key(xml_bid):
+    return xml_bid.get("id"), xml_bid.find("value").text
+
+
+def bid_hashes(xml_bids):
+    """
+    (id, value) -> (hash of the bid, hash of its subtree, bid_hashes of its
+    children) for each of a list of <bid> elements.
+    """
+    hashes = {}
+    for xml_bid in xml_bids:
+        own = hashlib.sha1()
+        _digest_element(xml_bid, own)
+        children = bid_hashes(xml_bid.findall("bid"))
+        subtree = hashlib.sha1(own.digest())
+        for _, child_subtree, _ in children.values():
+            subtree.update(child_subtree)
+
+        hashes[_bid_key(xml_bid)] = (own.digest(), subtree.digest(), children)
+
+    return hashes
+
+
+def _subtrees(bids):
+    """ Each of bids, with all its descendants. """
+    stack = list(bids)
+    while stack:
+        bid = stack.pop()
+        yield bid
+        stack.extend(bid.children.values())
+
+
+def _file_state(filepath):
+    if filepath is None:
+        return None
+
+    stat = os.stat(filepath)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class SystemWatcher:
+    """
+    A system read from an XML file, reloaded when the file changes.
+
+    self.opening_bids is the same dict for the life of the watcher.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.opening_bids = {}
+        self._listeners = []
+        self._load()
+
+    def _load(self):
+        self._reader = XmlReaderForFile(self.filepath)
+        root = self._reader._root
+        self._root_attributes = dict(root.attrib)
+        self._file_states = self._current_file_states()
+        self._hashes = bid_hashes(root.findall("bid"))
+        self.opening_bids.clear()
+        self.opening_bids.update(self._reader.get_bids_from_xml())
+
+    def _current_file_states(self):
+        return (_file_state(self.filepath),
+                _file_state(self._reader.formulas.formula_module_path))
+
+    def add_listener(self, listener):
+        """ Call listener(ReloadResult) after each reload. """
+        self._listeners.append(listener)
+
+    def poll(self):
+        """
+        Reload the system if its files changed. Returns the ReloadResult,
+        or None if nothing changed.
+        """
+        if self._current_file_states() == self._file_states:
+            return None
+
+        return self.reload()
+
+    def reload(self) -> ReloadResult:
+        """ Reload the system, keeping every unchanged subtree. """
+        root = ET.parse(self.filepath,
+                        ET.XMLParser(encoding="utf-8")).getroot()
+        if (dict(root.attrib) != self._root_attributes
+                or self._current_file_states()[1] != self._file_states[1]):
+            removed = list(self.opening_bids.values())
+            self._load()
+            result = ReloadResult([], list(self.opening_bids.values()),
+                                  removed, True)
+        else:
+            result = ReloadResult([], [], [], False)
+            xml_bids = root.findall("bid")
+            hashes = bid_hashes(xml_bids)
+            conditions = self._reader.conditions
+            conditions.take_resharing(())
+            self._update(self.opening_bids, None, xml_bids, hashes,
+                         self._hashes, result)
+            for bid in _subtrees(result.removed):
+                conditions.release(bid.condition)
+
+            # As in get_bids_from_xml, compile only once every new
+            # condition has been interned. Unchanged bids are compiled
+            # again only if the sharing of their subconditions changed.
+            new = {id(bid) for bid in _subtrees(result.added)}
+            new.update(id(bid) for bid in result.changed)
+            bids = list(_subtrees(self.opening_bids.values()))
+            stale = conditions.take_resharing(bid.condition for bid in bids)
+            for bid in bids:
+                if id(bid) in new or id(bid.condition) in stale:
+                    bid.compile(conditions)
+
+            self._hashes = hashes
+            self._file_states = self._current_file_states()
+
+        for listener in self._listeners:
+            listener(result)
+
+        return result
+
+    def _update(self, children, parent, xml_bids, hashes, old_hashes,
+                result):
+        old_bids = {(bid.id, bid.value): bid for bid in children.values()}
+        new_children = {}
+        for xml_bid in xml_bids:
+            key = _bid_key(xml_bid)
+            own_hash, subtree_hash, child_hashes = hashes[key]
+            bid = old_bids.pop(key, None)
+            if bid is None:
+                bid = self._reader.define_bid_tree(xml_bid, parent)
+                result.added.append(bid)
+            elif old_hashes[key][1] != subtree_hash:
+                if old_hashes[key][0] != own_hash:
+                    replacement = self._reader._define_bid(xml_bid)
+                    self._reader.conditions.release(bid.condition)
+                    bid.description = replacement.description
+                    bid.priority = replacement.priority
+                    bid.condition = replacement.condition
+                    result.changed.append(bid)
+
+                self._update(bid.children, bid, xml_bid.findall("bid"),
+                             child_hashes, old_hashes[key][2], result)
+
+            new_children[bid.value] = bid
+
+        result.removed.extend(old_bids.values())
+        # Keep the dict, which sessions may hold, in the new XML order.
+        children.clear()
+        children.update(new_children)
+
+
+def reload_system(watcher):
+    """
+    Reload the system if its files changed, printing what changed. Returns
+    the ReloadResult, or None if nothing was reloaded.
+    """
+    try:
+        result = watcher.poll()
+    except Exception as ex:
+        # Keep the previous system until the file is fixed.
+        print(f"The system could not be reloaded: {ex}")
+        return None
+
+    if result is None:
+        return None
+
+    if result.full:
+        print("System reloaded.")
+    else:
+        print(f"System reloaded: {len(result.changed)} bids changed, "
+              f"{len(result.added)} added and {len(result.removed)} "
+              "removed (with their continuations).")
+
+    return result
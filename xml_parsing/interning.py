@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 22:05:17 2026
+
+Share structurally equal conditions between bids.
+
+A system repeats the same building blocks hundreds of times: "balanced",
+the same hcp ranges, the same suit length formulas. ConditionInterner keeps
+one instance of each distinct condition, so the tree holds each block once,
+and a block used by several bids can remember its result for the current
+hand (see memoized_accept).
+"""
+
+__author__ = "Andrew I McClement"
+
+from practice_bidding.memoization import HandMemo
+from practice_bidding.xml_parsing.compiled_conditions import compile_condition
+from practice_bidding.xml_parsing.compiled_conditions import ConditionCompiler
+from practice_bidding.xml_parsing.conditions import Condition
+from practice_bidding.xml_parsing.conditions import EvaluationCondition
+from practice_bidding.xml_parsing.conditions import FormulaCondition
+from practice_bidding.xml_parsing.conditions import MultiCondition
+from practice_bidding.xml_parsing.conditions import NotCondition
+from practice_bidding.xml_parsing.conditions import SimpleCondition
+
+
+def _children(condition):
+    if isinstance(condition, Condition):
+        return condition.evaluation_conditions + condition.shape_conditions
+    elif isinstance(condition, MultiCondition):
+        return condition.conditions
+    elif isinstance(condition, NotCondition):
+        return [condition.condition]
+
+    return []
+
+
+class ConditionInterner:
+    """ A table of distinct conditions. """
+
+    def __init__(self):
+        # Key -> the instance of the condition.
+        self._conditions = {}
+        # id(instance) -> its key.
+        self._keys = {}
+        # id(instance) -> number of uses.
+        self._uses = {}
+        # id(instance) -> whether it is worth remembering its results.
+        self._worth_memoizing = {}
+        # id(instance) -> HandMemo of its compiled accept.
+        self._memos = {}
+        # ids of the instances which became shared, or stopped being
+        # shared, since the last call of take_resharing.
+        self._reshared = set()
+
+    def __len__(self):
+        return len(self._conditions)
+
+    def _add(self, key, condition, worth_memoizing):
+        try:
+            condition = self._conditions[key]
+        except KeyError:
+            self._conditions[key] = condition
+            self._keys[id(condition)] = key
+            self._uses[id(condition)] = 0
+            self._worth_memoizing[id(condition)] = worth_memoizing
+
+        self._uses[id(condition)] += 1
+        if self._uses[id(condition)] == 2:
+            self._reshared.add(id(condition))
+        return condition
+
+    def leaf(self, key, create, worth_memoizing=False):
+        """
+        The condition for key, calling create() only if there is none yet.
+
+        Use worth_memoizing for leaves which are slower to evaluate than a
+        dictionary lookup.
+        """
+        try:
+            condition = self._conditions[key]
+        except KeyError:
+            condition = create()
+
+        return self._add(key, condition, worth_memoizing)
+
+    def intern(self, condition):
+        """
+        The shared instance of condition, interning its subconditions first.
+
+        Conditions must not be modified after they are interned.
+        """
+        if id(condition) in self._uses:
+            # Already interned, e.g. a leaf from self.leaf.
+            return condition
+
+        if isinstance(condition, Condition):
+            evaluation_conditions = [self.intern(child) for child
+                                     in condition.evaluation_conditions]
+            shape_conditions = [self.intern(child)
+                                for child in condition.shape_conditions]
+            key = (Condition, tuple(map(id, evaluation_conditions)),
+                   tuple(map(id, shape_conditions)))
+            if key not in self._conditions:
+                condition = Condition(evaluation_conditions, shape_conditions)
+            return self._add(key, condition, True)
+        elif isinstance(condition, MultiCondition):
+            conditions = [self.intern(child) for child in condition.conditions]
+            key = (type(condition), tuple(map(id, conditions)))
+            if key not in self._conditions:
+                condition = type(condition)(conditions)
+            return self._add(key, condition, True)
+        elif isinstance(condition, NotCondition):
+            child = self.intern(condition.condition)
+            key = (NotCondition, id(child))
+            if key not in self._conditions:
+                condition = NotCondition(child)
+            return self._add(key, condition, True)
+        elif isinstance(condition, EvaluationCondition):
+            key = (EvaluationCondition, id(condition.evaluation_method),
+                   condition.bounds)
+            # Evaluation methods are memoized themselves.
+            return self._add(key, condition, False)
+        elif isinstance(condition, FormulaCondition):
+            return self._add((FormulaCondition, condition.key), condition,
+                             False)
+        elif isinstance(condition, SimpleCondition):
+            key = (type(condition), id(condition.accept_function))
+            return self._add(key, condition, False)
+
+        # Unknown condition types are never shared.
+        return self._add((id(condition),), condition, False)
+
+    def release(self, condition):
+        """
+        Undo one intern of condition and its subconditions, e.g. when the
+        bid using it is removed. Conditions no longer used are dropped.
+        """
+        key = id(condition)
+        if key not in self._uses:
+            return
+
+        for child in _children(condition):
+            self.release(child)
+
+        self._uses[key] -= 1
+        if self._uses[key] == 1:
+            self._reshared.add(key)
+        elif not self._uses[key]:
+            del self._conditions[self._keys.pop(key)]
+            del self._uses[key], self._worth_memoizing[key]
+            self._memos.pop(key, None)
+            self._reshared.discard(key)
+
+    def take_resharing(self, conditions) -> set:
+        """
+        The ids of those of conditions (e.g. the conditions of every bid)
+        compiled before one of their subconditions became shared, or
+        stopped being shared, since the last call. They should be compiled
+        again: memoized accepts depending on them are forgotten.
+        """
+        reshared, self._reshared = self._reshared, set()
+        if not reshared:
+            return set()
+
+        # id(condition) -> whether it depends on a reshared condition.
+        stale = {}
+
+        def is_stale(condition):
+            key = id(condition)
+            if key not in stale:
+                children = [is_stale(child)
+                            for child in _children(condition)]
+                stale[key] = key in reshared or any(children)
+                if stale[key]:
+                    self._memos.pop(key, None)
+
+            return stale[key]
+
+        return {id(condition) for condition in conditions
+                if is_stale(condition)}
+
+    def uses(self, condition) -> int:
+        """ How many times condition has been interned. """
+        return self._uses.get(id(condition), 0)
+
+    def is_memoized(self, condition) -> bool:
+        """ Whether condition is shared and worth remembering results of. """
+        return (self._worth_memoizing.get(id(condition), False)
+                and self.uses(condition) > 1
+                and condition.condition_count > 0)
+
+    def memoized_accept(self, condition):
+        """ condition.accept remembering its results for the current hand. """
+        try:
+            return self._memos[id(condition)]
+        except KeyError:
+            accept = compile_condition(condition, ConditionCompiler(self),
+                                       memoize_root=False)
+            memo = self._memos[id(condition)] = HandMemo(accept)
+            return memo
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 23:10:34 2026
+
+Find bids which can never be chosen.
+
+A bid is unreachable if no hand satisfies both its condition and the
+conditions of the bidder's own earlier calls: for example "hcp >= 18" below
+an opening requiring "hcp <= 15", or a shape which contradicts itself.
+Conditions are approximated by a union of boxes, each a set of shapes and
+an interval per evaluation method. The approximation only ever includes too
+many hands, so a bid reported as unreachable is certainly unreachable.
+
+Usage:
+    python -m practice_bidding.xml_parsing.reachability system.xml
+"""
+
+__author__ = "Andrew I McClement"
+
+import math
+import sys
+
+from practice_bidding.xml_parsing.conditions import AndCondition, Condition
+from practice_bidding.xml_parsing.conditions import EvaluationCondition
+from practice_bidding.xml_parsing.conditions import NotCondition, OrCondition
+from practice_bidding.xml_parsing.conditions import ShapeCondition, SHAPES
+
+ALL_SHAPES = (1 << len(SHAPES)) - 1
+# Beyond this many boxes, a union is replaced by the box containing it.
+MAX_BOXES = 32
+# A box is (shape mask, ((evaluation id, lower, upper), ...)), sorted by id.
+_ANY_HAND = ((ALL_SHAPES, ()),)
+
+
+def _intersect_boxes(first, second):
+    shapes = first[0] & second[0]
+    if not shapes:
+        return None
+
+    intervals = dict((key, (lower, upper)) for key, lower, upper in first[1])
+    for key, lower, upper in second[1]:
+        try:
+            other_lower, other_upper = intervals[key]
+        except KeyError:
+            intervals[key] = (lower, upper)
+            continue
+
+        lower, upper = max(lower, other_lower), min(upper, other_upper)
+        if lower > upper:
+            return None
+        intervals[key] = (lower, upper)
+
+    return shapes, tuple(sorted((key, lower, upper)
+                                for key, (lower, upper) in intervals.items()))
+
+
+def _hull(boxes):
+    """ The smallest box containing all the boxes. """
+    shapes = 0
+    intervals = None
+    for box_shapes, box_intervals in boxes:
+        shapes |= box_shapes
+        box_intervals = {key: (lower, upper)
+                         for key, lower, upper in box_intervals}
+        if intervals is None:
+            intervals = box_intervals
+            continue
+
+        # An evaluation unconstrained in any box is unconstrained overall.
+        intervals = {key: (min(lower, box_intervals[key][0]),
+                           max(upper, box_intervals[key][1]))
+                     for key, (lower, upper) in intervals.items()
+                     if key in box_intervals}
+
+    return ((shapes, tuple(sorted((key, lower, upper) for key, (lower, upper)
+                                  in intervals.items()))),)
+
+
+def _union(boxes):
+    boxes = tuple(dict.fromkeys(boxes))
+    return _hull(boxes) if len(boxes) > MAX_BOXES else boxes
+
+
+def intersect(first, second):
+    """ The hands in both unions of boxes. """
+    boxes = (_intersect_boxes(a, b) for a in first for b in second)
+    return _union(box for box in boxes if box is not None)
+
+
+class ReachabilityAnalysis:
+    """ Approximates the hands accepted by conditions and bids. """
+
+    def __init__(self):
+        # (id(condition), negated) -> (condition, boxes).
+        self._boxes = {}
+
+    def condition_boxes(self, condition, negated=False):
+        """ A union of boxes containing every hand condition accepts. """
+        key = (id(condition), negated)
+        try:
+            return self._boxes[key][1]
+        except KeyError:
+            pass
+
+        boxes = self._condition_boxes(condition, negated)
+        # Keep the condition alive so its id is not reused.
+        self._boxes[key] = (condition, boxes)
+        return boxes
+
+    def _condition_boxes(self, condition, negated):
+        if isinstance(condition, (AndCondition, Condition, OrCondition)):
+            # De Morgan: a negated "and" is an "or" of negations.
+            is_and = not isinstance(condition, OrCondition)
+            if is_and != negated:
+                boxes = _ANY_HAND
+                for child in condition.conditions:
+                    boxes = intersect(boxes,
+                                      self.condition_boxes(child, negated))
+                return boxes
+
+            return _union(box for child in condition.conditions
+                          for box in self.condition_boxes(child, negated))
+        elif isinstance(condition, NotCondition):
+            return self.condition_boxes(condition.condition, not negated)
+        elif isinstance(condition, ShapeCondition):
+            shapes = condition.shape_mask()
+            shapes = ALL_SHAPES & ~shapes if negated else shapes
+            return ((shapes, ()),) if shapes else ()
+        elif isinstance(condition, EvaluationCondition):
+            return _evaluation_boxes(condition, negated)
+
+        # Anything else might accept any hand, or reject any hand.
+        return _ANY_HAND
+
+    def find_unreachable_bids(self, opening_bids):
+        """
+        The unreachable bids of a system, in depth first order.
+
+        Bids below an unreachable bid are not included.
+        """
+        unreachable = []
+        # Each entry is a bid and the boxes of its bidder before it.
+        stack = [(bid, _ANY_HAND)
+                 for bid in reversed(list(opening_bids.values()))]
+        own_boxes = {}
+        while stack:
+            bid, earlier_boxes = stack.pop()
+            boxes = intersect(earlier_boxes,
+                              self.condition_boxes(bid.condition))
+            if not boxes:
+                unreachable.append(bid)
+                continue
+
+            own_boxes[id(bid)] = boxes
+            # The children of bid are bid by the partner of its bidder, whose
+            # last call was the parent of bid.
+            partner_boxes = (own_boxes[id(bid.parent)] if bid.parent
+                             else _ANY_HAND)
+            stack.extend((child, partner_boxes)
+                         for child in reversed(list(bid.children.values())))
+
+        return unreachable
+
+
+def _evaluation_boxes(condition, negated):
+    key = id(condition.evaluation_method)
+    lower, upper = condition.bounds
+    if not negated:
+        return ((ALL_SHAPES, ((key, lower, upper),)),)
+
+    # Either side of [lower, upper]. Real valued evaluations keep the bound
+    # itself, which includes too many hands but never too few.
+    step = 1 if condition.integral else 0
+    boxes = []
+    if lower > -math.inf:
+        boxes.append((ALL_SHAPES, ((key, -math.inf, lower - step),)))
+    if upper < math.inf:
+        boxes.append((ALL_SHAPES, ((key, upper + step, math.inf),)))
+    return tuple(boxes)
+
+
+def find_unreachable_bids(opening_bids):
+    """ The bids of a system which no hand can reach. """
+    return ReachabilityAnalysis().find_unreachable_bids(opening_bids)
+
+
+def prune_unreachable_bids(opening_bids):
+    """ Remove unreachable bids from the system and return them. """
+    unreachable = find_unreachable_bids(opening_bids)
+    for bid in unreachable:
+        siblings = bid.parent.children if bid.parent else opening_bids
+        del siblings[bid.value]
+
+    return unreachable
+
+
+def bid_sequence(bid):
+    """ The calls leading to and including bid, e.g. "1c 1h 1n". """
+    values = []
+    while bid:
+        values.append(bid.value)
+        bid = bid.parent
+
+    return " ".join(reversed(values))
+
+
+def main():
+    """ Print the unreachable bids of the system given on the command line. """
+    # Imported here as xml_parser uses this module.
+    from practice_bidding.xml_parsing.xml_parser import XmlReaderForFile
+
+    reader = XmlReaderForFile(sys.argv[1])
+    reader.get_bids_from_xml(prune_unreachable=True)
+    unreachable = reader.unreachable_bids
+    for bid in unreachable:
+        print(f"{bid_sequence(bid)}: {bid.description}")
+
+    print(f"{len(unreachable)} unreachable bids.")
+
+
+if __name__ == "__main__":
+    main()
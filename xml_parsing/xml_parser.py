@@ -8,24 +8,32 @@ Created on Sun Dec 17 04:44:04 2017
 import os
 import ast
 import importlib.util
+import inspect
 import math
 import xml.etree.ElementTree as ET
 import re
 import operator
 
 from practice_bidding import standard_formulas
-from practice_bidding.redeal.redeal import Evaluator
+from practice_bidding.memoization import memoize_per_hand
+from practice_bidding.suit_tables import SuitTable
+from practice_bidding.redeal.redeal import Hand
 from practice_bidding.redeal.redeal.global_defs import Strain
-from practice_bidding.xml_parsing.conditions import SimpleCondition
+from practice_bidding.xml_parsing.conditions import ShapeCondition
 from practice_bidding.xml_parsing.conditions import ShapeConditionFactory
 from practice_bidding.xml_parsing.conditions import AndCondition, OrCondition
 from practice_bidding.xml_parsing.conditions import Condition, BaseCondition
 from practice_bidding.xml_parsing.conditions import NotCondition
 from practice_bidding.xml_parsing.conditions import EvaluationCondition
+from practice_bidding.xml_parsing.conditions import FormulaCondition
+from practice_bidding.xml_parsing.compiled_conditions import compile_condition
+from practice_bidding.xml_parsing.compiled_conditions import ConditionCompiler
+from practice_bidding.xml_parsing.interning import ConditionInterner
+from practice_bidding.xml_parsing.reachability import prune_unreachable_bids
 
 
-CHIMAERA_HCP = Evaluator(4.5, 3, 1.5, 0.75, 0.25)
-HCP = Evaluator(4, 3, 2, 1)
+CHIMAERA_HCP = SuitTable.from_values(4.5, 3, 1.5, 0.75, 0.25)
+HCP = standard_formulas.HCP
 OPERATOR = re.compile("([!<>=]=|[<>])")
 VALID_EXPRESSION = re.compile("^(-?([cdhs]|[0-9]+))([-+*]([cdhs]|[0-9]+))*$")
 SAFE_FORMULA = re.compile("^(-?([0-9]+)([-+*]([0-9]+))*([<>]|[!<>=]=))+"
@@ -86,9 +94,17 @@ class Bid:
     """
 
     _suits = {"c": Strain.C, "d": Strain.D, "h": Strain.H,
-              "s": Strain.S, "n": Strain.N, "p": None}
-
-    def __init__(self, value, desc, condition):
+              "s": Strain.S, "n": Strain.N, "p": None, "x": None}
+    # Systems may have hundreds of thousands of bids.
+    __slots__ = ("children", "description", "parent", "value", "condition",
+                 "suit", "_accept", "id", "priority")
+
+    def __init__(self, value, desc, condition, id_=None, priority=None):
+        # The id attribute of the <bid> element, e.g. "00".
+        self.id = id_
+        # The priority attribute: siblings are tried from priority 1 upwards
+        # when the program selects the first accepted bid.
+        self.priority = priority
         self.children = {}
         self.description = desc
         self.parent = None
@@ -96,6 +112,17 @@ class Bid:
 
         self.condition = condition
         self.suit = self._get_suit()
+        # Compiled from self.condition on first use, see compile().
+        self._accept = None
+
+    def compile(self, interner=None):
+        """
+        Compile the condition tree into a single function.
+
+        Subconditions shared through the interner remember their results.
+        """
+        self._accept = compile_condition(self.condition,
+                                         ConditionCompiler(interner))
 
     def accept(self, hand) -> bool:
         """
@@ -104,7 +131,10 @@ class Bid:
         Note if there are no include conditions, a hand will always be
         rejected.
         """
-        return self.condition.accept(hand)
+        if self._accept is None:
+            self.compile()
+
+        return self._accept(hand)
 
     def _get_suit(self) -> str:
         try:
@@ -115,34 +145,106 @@ class Bid:
         return self._suits[suit_text]
 
 
-class FormulaParser:  # pragma: no cover
-    _VALID_EXPRESSION = re.compile("^([cdhs]|[0-9]+)([-+*]([cdhs]|[0-9]+))*$")
-    _BINARY_OPERATOR = re.compile("[-+*]")
-
-    def __init__(self, formula_module):
-        self._valid_formula_regex = self._get_formula_regex(formula_module)
-
-    @staticmethod
-    def _get_formula_regex(formula_module):
-        raise NotImplementedError
+class FormulaParser:
+    """
+    Parses the text of <formula> elements into FormulaConditions.
+
+    A formula is a test, e.g. "top_three_h + controls >= 4" or
+    "(rkcb_s[0] == 1 or rkcb_s[0] == 4) and not hcp < 10", built from
+    numbers, brackets, + - *, comparisons (which may be chained), and, or
+    and not. Each name is an evaluation method of the system (see
+    FormulaMethods.get: hcp, points, suit lengths such as spades, or a
+    function of the formula module), called on the hand. Methods returning
+    tuples must be indexed, and others must not be. Formulas are validated
+    and compiled once, when the system is read.
+    """
 
-    @staticmethod
-    def _validate_formula_expression(formula_module):
-        raise NotImplementedError
+    _arithmetic = (ast.Add, ast.Sub, ast.Mult)
+    _signs = (ast.USub, ast.UAdd)
+    # Which methods return tuples is found by evaluating them for this hand.
+    _sample_hand = "AKJ2 Q54 T93 K87"
 
+    def __init__(self, formulas):
+        self._formulas = formulas
+        # id(method) -> its value for the sample hand.
+        self._sample_values = {}
 
-def _parse_formula(formula, formula_module):  # pragma: no cover
-    raise NotImplementedError
-    formula = "".join(formula.split()).lower()
-    assert OPERATOR.findall(formula)
+    def parse(self, text) -> FormulaCondition:
+        """ The condition given by the text of a formula. """
+        try:
+            expression = ast.parse(text.strip(), mode="eval").body
+        except SyntaxError as error:
+            raise ValueError(f"Invalid formula {text!r}: {error.msg}.") \
+                from None
 
-    def _get_accept(formula_text):
-        def accept(hand):
-            return eval_expression(formula_text)
+        methods = {}
+        self._check_test(expression, text, methods)
+        return FormulaCondition(text.strip(), expression, methods)
 
-        return accept
+    def _sample_value(self, method):
+        try:
+            return self._sample_values[id(method)]
+        except KeyError:
+            value = method(Hand.from_str(self._sample_hand))
+            self._sample_values[id(method)] = value
+            return value
+
+    def _check_test(self, node, text, methods):
+        if isinstance(node, ast.BoolOp):
+            for value in node.values:
+                self._check_test(value, text, methods)
+        elif isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            self._check_test(node.operand, text, methods)
+        elif isinstance(node, ast.Compare):
+            if not all(type(op) in FormulaCondition._operators
+                       for op in node.ops):
+                raise ValueError(f"Unsupported comparison in formula "
+                                 f"{text!r}.")
+            for value in [node.left] + node.comparators:
+                self._check_value(value, text, methods)
+        else:
+            raise ValueError(f"Formula {text!r} is not a comparison.")
 
-    return _get_accept(formula)
+    def _check_value(self, node, text, methods, index=None):
+        if FormulaCondition.number(node) is not None:
+            return
+        elif isinstance(node, ast.Name):
+            if node.id not in methods:
+                try:
+                    methods[node.id] = self._formulas.get(node.id)
+                except (AttributeError, NotImplementedError):
+                    raise ValueError(f"Unknown evaluation method {node.id} "
+                                     f"in formula {text!r}.") from None
+
+            # Otherwise each hand would raise TypeError or IndexError.
+            value = self._sample_value(methods[node.id])
+            if not isinstance(value, tuple):
+                if index is not None:
+                    raise ValueError(f"{node.id} does not return a tuple, "
+                                     f"so cannot be indexed in formula "
+                                     f"{text!r}.")
+            elif index is None:
+                raise ValueError(f"{node.id} returns a tuple, so must be "
+                                 f"indexed in formula {text!r}.")
+            elif index >= len(value):
+                raise ValueError(f"{node.id} has no item {index} in formula "
+                                 f"{text!r}.")
+        elif (isinstance(node, ast.Subscript)
+              and isinstance(node.value, ast.Name)
+              and FormulaCondition.subscript_index(node) is not None):
+            # An item of a method returning a tuple, e.g. rkcb_s[0].
+            self._check_value(node.value, text, methods,
+                              FormulaCondition.subscript_index(node))
+        elif (isinstance(node, ast.BinOp)
+              and isinstance(node.op, self._arithmetic)):
+            self._check_value(node.left, text, methods)
+            self._check_value(node.right, text, methods)
+        elif (isinstance(node, ast.UnaryOp)
+              and isinstance(node.op, self._signs)):
+            self._check_value(node.operand, text, methods)
+        else:
+            raise ValueError(f"Unsupported expression {ast.dump(node)} in "
+                             f"formula {text!r}.")
 
 
 def _get_min_max_for_method(xml_method,
@@ -247,9 +349,37 @@ def _parse_formula_for_condition(formula):
     return _accept
 
 
-def _get_formula_module(xml_root, current_directory):
+def priority_order(bid):
+    """
+    Sort key for trying sibling bids in priority order. Bids without a
+    priority come after those with one, in their original order.
+    """
+    return (bid.priority is None, bid.priority or 0)
+
+
+def compile_bid_trees(bids, interner=None):
+    """
+    Compile each of the bids, with all their descendants.
+
+    Compile only once every bid has been interned, as until then the first
+    use of a shared subcondition looks unshared (see
+    ConditionInterner.is_memoized).
+    """
+    stack = list(bids)
+    while stack:
+        bid = stack.pop()
+        bid.compile(interner)
+        stack.extend(bid.children.values())
+
+
+def _get_priority(xml_bid):
+    priority = xml_bid.get("priority")
+    return None if priority is None else int(priority)
+
+
+def _get_formula_module(attributes, current_directory):
     try:
-        formula_module_name = xml_root.attrib["formulas"]
+        formula_module_name = attributes["formulas"]
         formula_module_location = os.path.join(current_directory,
                                                formula_module_name)
         spec = importlib.util.spec_from_file_location("bridge_formulas",
@@ -266,40 +396,59 @@ def _get_formula_module(xml_root, current_directory):
     return formula_module
 
 
-def _get_shape_conditions(xml_condition):
+def _formula_shape_condition(formula, info):
+    return ShapeCondition(_parse_formula_for_condition(formula), info)
+
+
+def _get_shape_conditions(xml_condition, interner=None):
+    """
+    The shape conditions of xml_condition, shared through the interner.
+    """
+    if interner is None:
+        interner = ConditionInterner()
+
     shapes = xml_condition.findall("shape")
     shape_conditions = []
     for shape in shapes:
         type_ = shape.attrib["type"]
 
         if type_ == "shape":
-            shape_condition = \
-                ShapeConditionFactory.create_shape_condition(shape.text)
+            shape_condition = interner.leaf(
+                (type_, "".join(shape.text.split()).lower()),
+                lambda: ShapeConditionFactory.create_shape_condition(
+                    shape.text))
         elif type_ == "general":
-            shape_condition = \
-                ShapeConditionFactory.create_general_shape_condition(
-                    shape.text)
+            shape_condition = interner.leaf(
+                (type_, shape.text),
+                lambda: ShapeConditionFactory.create_general_shape_condition(
+                    shape.text))
         elif type_ == "formula":
             formula = shape.text
-            accept = _parse_formula_for_condition(formula)
-            shape_condition = SimpleCondition(accept, formula)
+            # Formulas are evaluated from their text, so are slow.
+            shape_condition = interner.leaf(
+                (type_, formula), lambda: _formula_shape_condition(formula,
+                                                                   formula),
+                worth_memoizing=True)
         elif type_ in {"clubs", "diamonds", "hearts", "spades"}:
             minimum, maximum = _get_min_max_for_method(
                 shape,
                 absolute_min=0,
                 absolute_max=13)
 
-            shape_condition = \
-                ShapeConditionFactory.create_suit_length_condition(
-                    type_, minimum, maximum)
+            shape_condition = interner.leaf(
+                (type_, minimum, maximum),
+                lambda: ShapeConditionFactory.create_suit_length_condition(
+                    type_, minimum, maximum))
         elif type_ in {"longer_than", "strictly_longer_than"}:
             longer_suit = shape.find("longer_suit").text
             shorter_suit = shape.find("shorter_suit").text
             cmp_operator = "<=" if type_ == "longer_than" else "<"
             formula = f"{shorter_suit} {cmp_operator} {longer_suit}"
-            accept = _parse_formula_for_condition(formula)
-            shape_condition = SimpleCondition(accept,
-                                              f"Formula: {formula}")
+            shape_condition = interner.leaf(
+                (type_, formula),
+                lambda: _formula_shape_condition(formula,
+                                                 f"Formula: {formula}"),
+                worth_memoizing=True)
         else:
             raise NotImplementedError(type_)
 
@@ -308,35 +457,72 @@ def _get_shape_conditions(xml_condition):
     return shape_conditions
 
 
-class XmlReaderForFile:
-    """ Reads bids from XML for a specific file. """
+class FormulaMethods:
+    """
+    The evaluation methods of a system.
 
-    def __init__(self, filepath: str):
-        tree = ET.parse(filepath, ET.XMLParser(encoding="utf-8"))
-        self._root = tree.getroot()
+    These are defined by the attributes of the root element of the system,
+    which may reference a formula module in the same directory. A formula
+    module already loaded (e.g. from a binary system) may be given instead.
+    """
 
-        directory = os.path.dirname(filepath)
-        self._formula_module = _get_formula_module(self._root, directory)
+    def __init__(self, attributes, directory, formula_module=None):
+        self.attributes = dict(attributes)
+        self.directory = directory
+        if formula_module is None:
+            formula_module = _get_formula_module(self.attributes, directory)
+
+        self._formula_module = formula_module
+        # Method name -> function, so each formula is wrapped only once.
+        self._formulas = {}
 
         self.hcp = self._get_hcp_method()
         # Requires self._hcp to be defined, usually.
         self.points = self._get_points_method()
 
-    def _get_formula(self, method_name):
+    @property
+    def formula_module_path(self):
+        """ The path of the formula module, or None if there is none. """
+        return getattr(self._formula_module, "__file__", None)
+
+    def get(self, method_name):
+        """ Get an evaluation method by the name used in the XML. """
+        if method_name == "hcp":
+            return self.hcp
+        elif method_name == "points":
+            return self.points
+
+        return self.get_formula(method_name)
+
+    def get_formula(self, method_name):
+        """ Get a function from the formula module or standard_formulas. """
         try:
-            return getattr(self.formula_module, method_name)
+            return self._formulas[method_name]
+        except KeyError:
+            pass
+
+        try:
+            formula = getattr(self._formula_module, method_name)
         except AttributeError:
             try:
-                return getattr(standard_formulas, method_name)
+                formula = getattr(standard_formulas, method_name)
             except AttributeError:  # pragma: no cover
                 location = os.path.realpath(self._formula_module.__file__)
                 raise NotImplementedError(f"{method_name} not defined in "
                                           f"{location}.")
+        else:
+            # Formula module functions are assumed to be pure functions of
+            # the hand unless marked with @impure.
+            if inspect.isfunction(formula):
+                formula = memoize_per_hand(formula)
+
+        self._formulas[method_name] = formula
+        return formula
 
     def _get_hcp_method(self):
         try:
             # HCP not defined in formula_module.
-            hcp_style = self._root.attrib["hcp"]
+            hcp_style = self.attributes["hcp"]
         except KeyError:
             hcp_style = None
 
@@ -346,11 +532,11 @@ class XmlReaderForFile:
             return CHIMAERA_HCP
 
         # Default.
-        return self._get_formula("hcp")
+        return self.get_formula("hcp")
 
     def _get_points_method(self):
         try:
-            shape_style = self._root.attrib["shape"]
+            shape_style = self.attributes["shape"]
             if shape_style == "standard":
                 shape_points = standard_shape_points
             elif shape_style == "freakiness":
@@ -359,10 +545,31 @@ class XmlReaderForFile:
             def _points(hand):
                 return self.hcp(hand) + shape_points(hand)
         except KeyError:
-            _points = self._get_formula("points")
+            _points = self.get_formula("points")
 
         return _points
 
+
+class XmlReaderForFile:
+    """ Reads bids from XML for a specific file. """
+
+    def __init__(self, filepath: str):
+        tree = ET.parse(filepath, ET.XMLParser(encoding="utf-8"))
+        self._root = tree.getroot()
+
+        directory = os.path.dirname(filepath)
+        self.formulas = FormulaMethods(self._root.attrib, directory)
+        self._formula_module = self.formulas._formula_module
+        self.hcp = self.formulas.hcp
+        self.points = self.formulas.points
+        # Structurally equal conditions are shared between bids.
+        self.conditions = ConditionInterner()
+        self.formula_parser = FormulaParser(self.formulas)
+        self.unreachable_bids = []
+
+    def _get_formula(self, method_name):
+        return self.formulas.get_formula(method_name)
+
     def _get_evaluation_conditions(self, xml_condition):
         evaluation_conditions = []
         evaluation = xml_condition.find("evaluation")
@@ -372,20 +579,14 @@ class XmlReaderForFile:
         for method in evaluation:
             minimum, maximum = _get_min_max_for_method(method)
 
-            if method.tag == "hcp":
-                evaluation_condition = EvaluationCondition(
-                    self.hcp, minimum, maximum)
-            elif method.tag == "tricks":
-                tricks = self._get_formula("tricks")
-
-                evaluation_condition = EvaluationCondition(
-                    tricks, minimum, maximum)
-            elif method.tag == "points":
-                evaluation_condition = EvaluationCondition(
-                    self.points, minimum, maximum)
-            else:
+            if method.tag not in {"hcp", "tricks", "points"}:
                 raise NotImplementedError(method.tag)
 
+            evaluation_condition = self.conditions.leaf(
+                ("evaluation", method.tag, minimum, maximum),
+                lambda: EvaluationCondition(self.formulas.get(method.tag),
+                                            minimum, maximum, method.tag))
+
             evaluation_conditions.append(evaluation_condition)
 
         return evaluation_conditions
@@ -406,7 +607,8 @@ class XmlReaderForFile:
         child_conditions.extend(
             self._get_evaluation_conditions(xml_condition))
         child_conditions.extend(self._get_formulas(xml_condition))
-        child_conditions.extend(_get_shape_conditions(xml_condition))
+        child_conditions.extend(
+            _get_shape_conditions(xml_condition, self.conditions))
 
         if tag == "and":
             base_condition = AndCondition(child_conditions)
@@ -420,14 +622,13 @@ class XmlReaderForFile:
 
         return base_condition
 
-    # Using no cover since _parse_formula not implemented yet.
-    # TODO: Remove this when it gets implemented.
-    def _get_formulas(self, xml_condition):  # pragma: no cover
+    def _get_formulas(self, xml_condition):
         formulas = []
         for xml_formula in xml_condition.findall("formula"):
-            formula_text = xml_formula.text
-            formula = _parse_formula(formula_text, self._formula_module)
-            formulas.append(formula)
+            text = xml_formula.text.strip()
+            formulas.append(self.conditions.leaf(
+                ("formula", text),
+                lambda: self.formula_parser.parse(text)))
 
         return formulas
 
@@ -443,7 +644,8 @@ class XmlReaderForFile:
             # In new style should have exactly one condition for a bid.
             assert bool(and_) + bool(or_) + bool(not_) == 1
             condition = self._define_logical_condition(xml_condition)
-            return Bid(value, desc, condition)
+            return Bid(value, desc, self.conditions.intern(condition),
+                       xml_bid.get("id"), _get_priority(xml_bid))
 
         # New style and/or not defined. Take legacy path.
         xml_conditions = xml_bid.findall("condition")
@@ -458,7 +660,8 @@ class XmlReaderForFile:
                 self._get_evaluation_conditions(xml_condition)
 
             evaluation_conditions.extend(self._get_formulas(xml_condition))
-            shape_conditions = _get_shape_conditions(xml_condition)
+            shape_conditions = _get_shape_conditions(xml_condition,
+                                                     self.conditions)
             # We do not allow new style formulas in old style conditions.
 
             type_ = xml_condition.attrib["type"]
@@ -474,7 +677,8 @@ class XmlReaderForFile:
                 raise NotImplementedError(
                     type_, "Expected 'include' or 'exclude'")
 
-        return Bid(value, desc, and_)
+        return Bid(value, desc, self.conditions.intern(and_),
+                   xml_bid.get("id"), _get_priority(xml_bid))
 
     def _find_all_children_bids(self, bid, xml_bid):
         for child_xml_bid in xml_bid.findall("bid"):
@@ -506,7 +710,24 @@ class XmlReaderForFile:
             bid.children[child_bid.value] = child_bid
             self._find_all_children_bids(child_bid, child_xml_bid)
 
-    def get_bids_from_xml(self):
+    def define_bid_tree(self, xml_bid, parent=None) -> Bid:
+        """
+        Define a bid, with all its descendants, from a <bid> element.
+
+        The bids are not compiled: see compile_bid_trees.
+        """
+        bid = self._define_bid(xml_bid)
+        bid.parent = parent
+        self._find_all_children_bids(bid, xml_bid)
+        return bid
+
+    def get_bids_from_xml(self, prune_unreachable=False):
+        """
+        The opening bids of the system, with all later bids as descendants.
+
+        If prune_unreachable, bids which no hand can reach are removed and
+        listed in self.unreachable_bids.
+        """
         result = {}
         for xml_bid in self._root:
             try:
@@ -528,4 +749,10 @@ class XmlReaderForFile:
             result[bid.value] = bid
             self._find_all_children_bids(bid, xml_bid)
 
+        # Only now is it known which conditions are shared.
+        compile_bid_trees(result.values(), self.conditions)
+
+        if prune_unreachable:
+            self.unreachable_bids = prune_unreachable_bids(result)
+
         return result